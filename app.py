@@ -1,20 +1,46 @@
 import streamlit as st
 import time
 import json
+import uuid
+import threading
 import pandas as pd
 from memgraph_core import MemGraphCore
 from llm_interface import llm_client
+from supabase_config import get_supabase_client
 
 # Page Config
 st.set_page_config(layout="wide", page_title="MemGraph: Nuclear Memory Architecture")
 
-# Initialize Session State
-if "memgraph" not in st.session_state:
-    st.session_state.memgraph = MemGraphCore()
+INSPECTOR_PAGE_SIZE = 25
+TIER_CHOICES = ["L1_Redis_Cache", "L2_Episodic_Log", "L3_Vector_Store"]
+
+@st.cache_resource
+def get_engine():
+    """
+    One MemGraphCore per process, shared by every browser session (Streamlit reruns reuse it).
+    The engine is a single tenant: retrieval, dedup and consolidation see every session's memories.
+    """
+    engine = MemGraphCore(db=get_supabase_client())
     # Seed with some initial data for demo
-    st.session_state.memgraph.add_memory("My name is Priranshu.", role="user", entities=["Priranshu"])
-    st.session_state.memgraph.add_memory("I am participating in an IIT Guwahati Hackathon.", role="user", entities=["IIT Guwahati", "Hackathon"])
-    st.session_state.memgraph.add_memory("I need a memory system that scales to 1,000 turns.", role="user", entities=["Memory System"])
+    engine.add_memory("My name is Priranshu.", role="user", entities=["Priranshu"])
+    engine.add_memory("I am participating in an IIT Guwahati Hackathon.", role="user", entities=["IIT Guwahati", "Hackathon"])
+    engine.add_memory("I need a memory system that scales to 1,000 turns.", role="user", entities=["Memory System"])
+    return engine
+
+@st.cache_resource
+def get_engine_lock():
+    # Sessions run on separate script threads; the engine itself is not thread-safe
+    return threading.RLock()
+
+memgraph = get_engine()
+engine_lock = get_engine_lock()
+
+# Initialize Session State (per-browser view over the shared engine)
+if "session_id" not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex[:8]
+
+if "session_codes" not in st.session_state:
+    st.session_state.session_codes = []   # IDs of memories this session created
 
 if "chat_history" not in st.session_state:
     st.session_state.chat_history = []
@@ -23,7 +49,15 @@ if "last_active_memories" not in st.session_state:
     st.session_state.last_active_memories = []
 
 if "metrics" not in st.session_state:
-    st.session_state.metrics = {"latency": 0, "cache_hit": False}
+    st.session_state.metrics = {"latency": 0, "cache_hit": False, "first_turn_latency": None}
+
+if "warmup_started" not in st.session_state:
+    # New browser session: prefetch the likely working set into L1 while the page renders
+    st.session_state.warmup_started = True
+    def _warm_up():
+        with engine_lock:
+            memgraph.warm_up()
+    threading.Thread(target=_warm_up, daemon=True).start()
 
 # Styles - CYBER-MINIMALIST / INDUSTRIAL TECH
 st.markdown("""
@@ -232,6 +266,8 @@ with col2:
     m1, m2 = st.columns(2)
     with m1:
         st.metric("Latency", f"{st.session_state.metrics['latency']:.1f}ms")
+        if st.session_state.metrics["first_turn_latency"] is not None:
+            st.caption(f"First turn: {st.session_state.metrics['first_turn_latency']:.1f}ms")
     st.markdown("---")
     
     # Metrics
@@ -246,6 +282,8 @@ with col2:
 with col1:
     st.title("🧠 MemGraph Core")
     st.caption("Real-Time Long-Form Memory System | L1-L4 Hierarchy | ACAN Retrieval")
+    st.info("Shared memory: every open browser session talks to the same engine, so replies can draw on "
+            "(and near-duplicates merge into) memories from other sessions.", icon="ℹ️")
 
     # Display Chat History
     for msg in st.session_state.chat_history:
@@ -261,37 +299,43 @@ with col1:
         with st.chat_message("user"):
             st.markdown(user_input)
 
-        # 2. Process with MemGraph
+        # 2. Process with MemGraph (engine calls hold the shared lock; the LLM call does not)
         start_time = time.time()
-        st.session_state.memgraph.increment_turn()
-        
-        # Step A: Ingest User Memory & ANIMATE
-        mem = st.session_state.memgraph.add_memory(user_input, role="user")
-        
+        with engine_lock:
+            memgraph.increment_turn()
+
+            # Step A: Ingest User Memory
+            mem = memgraph.add_memory(user_input, role="user")
+            st.session_state.session_codes.append(mem.internal_code)
+
+            # Step B: Retrieve Context (ACAN)
+            active_memories = memgraph.retrieve(user_input)
+        st.session_state.last_active_memories = active_memories
+
         # TRIGGER ANIMATION: Update the placeholder with the active tier
         viz_placeholder.markdown(render_engine_room(mem.tier.value), unsafe_allow_html=True)
         time.sleep(0.3) # Artificial delay to let user see the flash
-        
-        # Step B: Retrieve Context (ACAN)
-        active_memories = st.session_state.memgraph.retrieve(user_input)
-        st.session_state.last_active_memories = active_memories
-        
+
         # Step C: Generate Response (LLM)
         response = llm_client.generate_memgraph_response(user_input, active_memories)
-        
-        # Step D: Store Assistant Response
-        st.session_state.memgraph.add_memory(response, role="assistant")
-        
-        # Step E: Periodic Maintenance
-        st.session_state.memgraph.run_pruning_cycle()
-        st.session_state.memgraph.consolidate_memories()
+
+        with engine_lock:
+            # Step D: Store Assistant Response
+            reply = memgraph.add_memory(response, role="assistant")
+            st.session_state.session_codes.append(reply.internal_code)
+
+            # Step E: Periodic Maintenance
+            memgraph.run_pruning_cycle()
+            memgraph.consolidate_memories()
 
         end_time = time.time()
         latency_ms = (end_time - start_time) * 1000
         
         # Update Metrics
         st.session_state.metrics["latency"] = latency_ms
-        st.session_state.metrics["cache_hit"] = st.session_state.memgraph.neural_cache_hits > 0
+        if st.session_state.metrics["first_turn_latency"] is None:
+            st.session_state.metrics["first_turn_latency"] = latency_ms
+        st.session_state.metrics["cache_hit"] = memgraph.neural_cache_hits > 0
 
         # Display Assistant Message
         st.session_state.chat_history.append({"role": "assistant", "content": response})
@@ -319,21 +363,58 @@ with col1:
         
         st.table(pd.DataFrame(memory_data))
         
-        st.caption("Detailed Dump:")
-        st.json([m.to_dict() for m in st.session_state.last_active_memories])
+        with st.expander("Detailed Dump"):
+            st.json([m.to_dict() for m in st.session_state.last_active_memories])
     else:
         st.info("No active memories injected for this turn.")
 
     st.markdown("---")
-    
+
     # Storage Stats
     st.subheader("`STORAGE_METRICS`")
-    st.text(f"L1 (Cache): {len(st.session_state.memgraph.l1_cache)} items")
-    st.text(f"L2 (Episodic): {len(st.session_state.memgraph.l2_episodic)} items")
-    st.text(f"L3 (Semantic): {len(st.session_state.memgraph.l3_semantic)} items")
-    
-    if st.button("Clear Memory"):
-        st.session_state.memgraph = MemGraphCore()
+    st.text(f"L1 (Cache): {len(memgraph.l1_cache)} items")
+    st.text(f"L2 (Episodic): {len(memgraph.l2_episodic)} items")
+    st.text(f"L3 (Semantic): {len(memgraph.l3_semantic)} items")
+
+    # Memory Inspector: one page at a time, never the whole tier
+    st.subheader("`MEMORY_INSPECTOR`")
+    scope = st.radio("Scope", ["This session", "All sessions"], horizontal=True, key="inspector_scope")
+    tier = st.selectbox("Tier", TIER_CHOICES, index=1, key="inspector_tier")
+    if scope == "This session":
+        with engine_lock:
+            # Session IDs can outlive their memory (consolidated or pruned); keep the selected tier only
+            codes = [c for c in st.session_state.session_codes
+                     if c in memgraph.memory_lookup and memgraph.memory_lookup[c].tier.value == tier]
+        total = len(codes)
+    else:
+        with engine_lock:
+            total = memgraph.tier_page(tier, 0, 0)[1]
+    pages = max(1, -(-total // INSPECTOR_PAGE_SIZE))
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, key="inspector_page")
+    offset = (page - 1) * INSPECTOR_PAGE_SIZE
+
+    with engine_lock:
+        if scope == "This session":
+            window = codes[offset:offset + INSPECTOR_PAGE_SIZE]
+            rows = [memgraph.memory_lookup[c] for c in window if c in memgraph.memory_lookup]
+        else:
+            rows = memgraph.tier_page(tier, offset, INSPECTOR_PAGE_SIZE)[0]
+        page_data = [{
+            "ID": m.internal_code,
+            "Tier": m.tier.value,
+            "Role": m.role,
+            "Score": f"{m.half_life_score:.2f}",
+            "Content": m.content[:120],
+        } for m in rows]
+    st.caption(f"session {st.session_state.session_id} · {total} items")
+    if page_data:
+        st.dataframe(pd.DataFrame(page_data), hide_index=True, use_container_width=True)
+    else:
+        st.info("Nothing stored here yet.")
+
+    if st.button("Clear Session", help="Resets this session's chat and inspector view; stored memories are kept"):
+        # The engine is shared with other sessions; only this session's view is reset
         st.session_state.chat_history = []
         st.session_state.last_active_memories = []
+        st.session_state.session_codes = []
         st.rerun()
@@ -0,0 +1,110 @@
+"""
+Per-message overhead of the API encodings and transports.
+
+1. Encoding: a ChatResponse with N memories built the previous way (Pydantic models, then the
+   model dumped to JSON-able data and json-encoded) vs a plain dict through orjson / msgpack.
+2. Transport: M chat turns as separate HTTP requests vs one WebSocket session, both in-process
+   (ASGI TestClient, mock LLM), so the numbers are framework overhead without network latency.
+
+    python bench_api.py --memories 20 --content-bytes 400 --turns 200
+"""
+import os
+import json
+import time
+import argparse
+import serialization
+from profiler import percentile
+
+
+def _payload(memories, content_bytes):
+    return {
+        "response": "x" * content_bytes,
+        "active_memories": [{"id": f"MEM_{i:08X}", "tier": "L2_Episodic_Log", "content": "y" * content_bytes,
+                             "score": 0.75} for i in range(memories)],
+        "latency_ms": 12.5,
+        "cache_hit": False,
+        "context_tokens": 512,
+        "tokens_saved": 128,
+    }
+
+
+def _per_call_us(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def bench_encoding(memories=20, content_bytes=400, iterations=2000):
+    from server import ChatResponse, MemoryResponse
+    payload = _payload(memories, content_bytes)
+
+    def pydantic_json():
+        model = ChatResponse(**{**payload, "active_memories": [MemoryResponse(**m) for m in payload["active_memories"]]})
+        return json.dumps(model.model_dump(mode="json")).encode()
+
+    results = {"pydantic+json": {"us_per_msg": _per_call_us(pydantic_json, iterations), "bytes": len(pydantic_json())}}
+    encoded = serialization.dumps(payload)
+    results[f"dict+{serialization.available()['json']}"] = {
+        "us_per_msg": _per_call_us(lambda: serialization.dumps(payload), iterations), "bytes": len(encoded)}
+    if serialization.msgpack is not None:
+        results["dict+msgpack"] = {
+            "us_per_msg": _per_call_us(lambda: serialization.dumps(payload, serialization.MSGPACK), iterations),
+            "bytes": len(serialization.dumps(payload, serialization.MSGPACK))}
+    return {k: {"us_per_msg": round(v["us_per_msg"], 2), "bytes": v["bytes"]} for k, v in results.items()}
+
+
+def bench_transport(turns=200):
+    os.environ.setdefault("MEMGRAPH_STORAGE", "none")
+    from fastapi.testclient import TestClient
+    import server
+
+    client = TestClient(server.app)
+    messages = [f"benchmark message {i}" for i in range(turns)]
+
+    # Turns alternate between the transports so both see the same store size; overhead is the
+    # round trip minus the server's own handler time (latency_ms in every reply)
+    overhead = {"http": [], "ws": []}
+    with client.websocket_connect("/ws/chat?session_id=bench-ws") as ws:
+        ws.receive_json()                       # session frame
+        for message in messages:
+            start = time.perf_counter()
+            reply = client.post("/chat", json={"message": message, "session_id": "bench-http"}).json()
+            overhead["http"].append((time.perf_counter() - start) * 1000 - reply["latency_ms"])
+
+            start = time.perf_counter()
+            ws.send_text(json.dumps({"message": message}))
+            reply = ws.receive_json()
+            overhead["ws"].append((time.perf_counter() - start) * 1000 - reply["latency_ms"])
+            ws.receive_json()                   # memory_update push (after the reply; not on the critical path)
+
+    return {f"{name}_overhead_ms_p50": round(percentile(sorted(values), 50), 3) for name, values in overhead.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark API serialization and transport overhead.")
+    parser.add_argument("--memories", type=int, default=20, help="Active memories per response")
+    parser.add_argument("--content-bytes", type=int, default=400, help="Characters per memory")
+    parser.add_argument("--iterations", type=int, default=2000, help="Encodings per variant")
+    parser.add_argument("--turns", type=int, default=200, help="Chat turns per transport (0 skips)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = {"encoding": bench_encoding(args.memories, args.content_bytes, args.iterations)}
+    if args.turns:
+        report["transport"] = bench_transport(args.turns)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"\n[BENCH] {args.memories} memories x {args.content_bytes} chars")
+        for name, row in report["encoding"].items():
+            print(f"  {name:18s} {row['us_per_msg']:10.2f} us/msg  {row['bytes']:8d} bytes")
+        if "transport" in report:
+            t = report["transport"]
+            print(f"  per-turn transport overhead p50: HTTP /chat {t['http_overhead_ms_p50']:.3f} ms"
+                  f" | WebSocket {t['ws_overhead_ms_p50']:.3f} ms")
+    return report
+
+
+if __name__ == "__main__":
+    main()
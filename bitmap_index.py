@@ -0,0 +1,148 @@
+class Bitmap:
+    """
+    Roaring-style compressed bitset over non-negative ints: values are split into 2^16-wide chunks
+    keyed by their high bits, each chunk one int bitmask, so AND/OR work chunk by chunk in C and
+    empty ranges cost nothing.
+    """
+    __slots__ = ("_chunks",)
+    CHUNK_BITS = 16
+
+    def __init__(self, values=()):
+        self._chunks = {}
+        for v in values:
+            self.add(v)
+
+    def add(self, value):
+        hi, lo = value >> self.CHUNK_BITS, value & 0xFFFF
+        self._chunks[hi] = self._chunks.get(hi, 0) | (1 << lo)
+
+    def discard(self, value):
+        hi, lo = value >> self.CHUNK_BITS, value & 0xFFFF
+        bits = self._chunks.get(hi, 0) & ~(1 << lo)
+        if bits:
+            self._chunks[hi] = bits
+        else:
+            self._chunks.pop(hi, None)
+
+    def __contains__(self, value):
+        return bool(self._chunks.get(value >> self.CHUNK_BITS, 0) >> (value & 0xFFFF) & 1)
+
+    def __len__(self):
+        return sum(bits.bit_count() for bits in self._chunks.values())
+
+    def __bool__(self):
+        return bool(self._chunks)
+
+    def __and__(self, other):
+        out = Bitmap()
+        small, large = (self, other) if len(self._chunks) <= len(other._chunks) else (other, self)
+        for hi, bits in small._chunks.items():
+            both = bits & large._chunks.get(hi, 0)
+            if both:
+                out._chunks[hi] = both
+        return out
+
+    def __or__(self, other):
+        out = Bitmap()
+        out._chunks = dict(self._chunks)
+        for hi, bits in other._chunks.items():
+            out._chunks[hi] = out._chunks.get(hi, 0) | bits
+        return out
+
+    def __iter__(self):
+        for hi in sorted(self._chunks):
+            base, bits = hi << self.CHUNK_BITS, self._chunks[hi]
+            while bits:
+                low = bits & -bits
+                yield base + low.bit_length() - 1
+                bits ^= low
+
+
+class BitmapIndex:
+    """
+    Predicate bitmaps for filtered retrieval. Every live memory gets a dense slot; each
+    (field, value) pair over role, tier, entity and HIAGENT type keeps a Bitmap of slots.
+    A filter is OR within a field and AND across fields, evaluated smallest bitmap first.
+    """
+    FIELDS = ("role", "tier", "entity", "type")
+
+    def __init__(self):
+        self._bitmaps = {}       # (field, value) -> Bitmap
+        self._slots = {}         # code -> slot
+        self._codes = []         # slot -> code (None when free)
+        self._keys = {}          # slot -> [(field, value)] it is indexed under
+        self._free = []
+
+    @staticmethod
+    def _keys_of(mem):
+        keys = [("role", mem.role), ("tier", mem.tier.value), ("type", mem.metadata.get("type", "memory"))]
+        keys += [("entity", e) for e in mem.metadata.get("entities") or ()]
+        return keys
+
+    def add(self, mem):
+        """Indexes `mem`; re-adding a code re-indexes it in place (tier moves, new entities)."""
+        slot = self._slots.get(mem.internal_code)
+        if slot is None:
+            slot = self._free.pop() if self._free else len(self._codes)
+            if slot == len(self._codes):
+                self._codes.append(None)
+            self._codes[slot] = mem.internal_code
+            self._slots[mem.internal_code] = slot
+        else:
+            self._unindex(slot)
+        keys = self._keys_of(mem)
+        for key in keys:
+            bitmap = self._bitmaps.get(key)
+            if bitmap is None:
+                bitmap = self._bitmaps[key] = Bitmap()
+            bitmap.add(slot)
+        self._keys[slot] = keys
+
+    def _unindex(self, slot):
+        for key in self._keys.pop(slot, ()):
+            bitmap = self._bitmaps.get(key)
+            if bitmap is not None:
+                bitmap.discard(slot)
+                if not bitmap:
+                    del self._bitmaps[key]
+
+    def remove(self, code):
+        slot = self._slots.pop(code, None)
+        if slot is not None:
+            self._unindex(slot)
+            self._codes[slot] = None
+            self._free.append(slot)
+
+    def select(self, role=None, tier=None, entity=None, memory_type=None):
+        """Bitmap of slots matching every given predicate (a value or a list of values), or None if none given."""
+        per_field = []
+        for field, wanted in (("role", role), ("tier", tier), ("entity", entity), ("type", memory_type)):
+            if wanted is None:
+                continue
+            values = [wanted] if isinstance(wanted, str) else wanted
+            union = Bitmap()
+            for value in values:
+                union = union | self._bitmaps.get((field, value), Bitmap())
+            per_field.append(union)
+        if not per_field:
+            return None
+        per_field.sort(key=len)
+        result = per_field[0]
+        for bitmap in per_field[1:]:
+            if not result:
+                break
+            result = result & bitmap
+        return result
+
+    def slot_of(self, code):
+        return self._slots.get(code)
+
+    def codes(self, bitmap):
+        codes = self._codes
+        return [codes[slot] for slot in bitmap]
+
+    def __len__(self):
+        return len(self._slots)
+
+    def stats(self):
+        return {"memories": len(self._slots), "bitmaps": len(self._bitmaps), "free_slots": len(self._free)}
@@ -0,0 +1,13 @@
+import pytest
+
+
+class EchoLLM:
+    """Deterministic stand-in for the summarizer: a cluster's goal is its first text."""
+
+    def summarize_clusters(self, clusters):
+        return [f"Goal: {texts[0]}" for texts in clusters]
+
+
+@pytest.fixture
+def echo_llm():
+    return EchoLLM()
@@ -0,0 +1,124 @@
+import re
+from vector_ops import cosine_similarity, centroid
+
+_WORD_RE = re.compile(r"\w+")
+_STOPWORDS = {"the", "a", "an", "is", "are", "i", "you", "my", "your", "to", "of", "and", "in", "it", "that", "this", "for", "on", "me", "what"}
+
+
+def _terms(mem):
+    return {w for w in _WORD_RE.findall(mem.content.lower()) if w not in _STOPWORDS}
+
+
+def _jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class _Cluster:
+    def __init__(self, mem):
+        self.members = [mem]
+        self.vectors = [mem.embedding]
+        self.centroid = list(mem.embedding)
+        self.entities = set(mem.metadata.get("entities") or [])
+        self.terms = _terms(mem)
+
+    def add(self, mem, terms):
+        self.members.append(mem)
+        self.vectors.append(mem.embedding)
+        self.centroid = centroid(self.vectors)
+        self.entities |= set(mem.metadata.get("entities") or [])
+        self.terms |= terms
+
+
+class ConsolidationEngine:
+    """
+    Topic-clustered, batched HIAGENT consolidation.
+
+    Instead of chunking the 3 oldest L2 memories per LLM call, wait until `trigger` memories are
+    pending, keep the `keep_recent` newest in L2 as working context, cluster the rest by
+    embedding similarity + entity/keyword overlap, and summarize every multi-member cluster in a
+    single batched LLM request. Singletons move to L3 unchanged (no LLM cost).
+    """
+
+    def __init__(self, llm, trigger=40, keep_recent=4, similarity_threshold=0.55,
+                 max_cluster_size=8, vector_weight=0.4):
+        self.llm = llm
+        self.trigger = trigger
+        self.keep_recent = keep_recent
+        self.similarity_threshold = similarity_threshold
+        self.max_cluster_size = max_cluster_size
+        self.vector_weight = vector_weight
+
+        # Metrics
+        self.summarization_calls = 0
+        self.clusters_summarized = 0
+        self.memories_consolidated = 0
+
+    def should_run(self, pending_count):
+        return pending_count >= self.trigger
+
+    def _affinity(self, cluster, mem, terms):
+        vec_sim = cosine_similarity(cluster.centroid, mem.embedding)
+        entities = set(mem.metadata.get("entities") or [])
+        lexical = max(_jaccard(cluster.entities, entities), _jaccard(cluster.terms, terms))
+        return self.vector_weight * vec_sim + (1 - self.vector_weight) * lexical
+
+    def cluster(self, memories):
+        """Greedy single-pass clustering, oldest first."""
+        clusters = []
+        for mem in memories:
+            terms = _terms(mem)
+            best, best_score = None, self.similarity_threshold
+            for c in clusters:
+                if len(c.members) >= self.max_cluster_size:
+                    continue
+                score = self._affinity(c, mem, terms)
+                if score >= best_score:
+                    best, best_score = c, score
+            if best is None:
+                clusters.append(_Cluster(mem))
+            else:
+                best.add(mem, terms)
+        return clusters
+
+    def run(self, pending, force=False):
+        """
+        Consolidates `pending` (oldest first). Returns (consumed_memories, goal_specs) where each
+        goal spec is a dict with summary, constituents, entities and centroid embedding.
+        `force` ignores the trigger and flushes everything, including the recent window.
+        """
+        if not force and not self.should_run(len(pending)):
+            return [], []
+
+        keep = 0 if force else self.keep_recent
+        batch = list(pending[:len(pending) - keep]) if keep else list(pending)
+        if not batch:
+            return [], []
+
+        clusters = self.cluster(batch)
+        multi = [c for c in clusters if len(c.members) > 1]
+        summaries = []
+        if multi:
+            summaries = self.llm.summarize_clusters([[m.content for m in c.members] for c in multi])
+            self.summarization_calls += 1
+            self.clusters_summarized += len(multi)
+
+        goals = []
+        summary_iter = iter(summaries)
+        for c in clusters:
+            goals.append({
+                "summary": next(summary_iter) if len(c.members) > 1 else None,
+                "constituents": c.members,
+                "entities": sorted(c.entities),
+                "embedding": c.centroid,
+            })
+        self.memories_consolidated += len(batch)
+        return batch, goals
+
+    def stats(self):
+        return {
+            "summarization_calls": self.summarization_calls,
+            "clusters_summarized": self.clusters_summarized,
+            "memories_consolidated": self.memories_consolidated,
+        }
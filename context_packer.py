@@ -0,0 +1,137 @@
+import re
+import math
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def estimate_tokens(text):
+    """
+    Local token estimate (no tokenizer download).
+    BPE tokenizers average ~4 chars/token on English and ~0.75 words/token;
+    taking the larger of the two keeps the estimate conservative for short words and code.
+    """
+    if not text:
+        return 0
+    by_chars = len(text) / 4
+    by_words = len(text.split()) * 4 / 3
+    return int(math.ceil(max(by_chars, by_words)))
+
+
+def _shingles(text):
+    return set(_WORD_RE.findall(text.lower()))
+
+
+def _jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _truncate(text, max_tokens):
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    # Cut on a word boundary at roughly max_tokens worth of characters
+    words = text.split()
+    kept = []
+    for word in words:
+        kept.append(word)
+        if estimate_tokens(" ".join(kept)) > max_tokens - 1:
+            kept.pop()
+            break
+    return " ".join(kept) + " …"
+
+
+class PackedContext:
+    def __init__(self, memories, lines, tokens_original, tokens_used, deduped, truncated, dropped):
+        self.memories = memories            # Memories that made it into the prompt, in prompt order
+        self.lines = lines
+        self.tokens_original = tokens_original
+        self.tokens_used = tokens_used
+        self.deduped = deduped
+        self.truncated = truncated
+        self.dropped = dropped
+
+    @property
+    def text(self):
+        return "\n".join(self.lines)
+
+    @property
+    def tokens_saved(self):
+        return self.tokens_original - self.tokens_used
+
+    def stats(self):
+        return {
+            "tokens_original": self.tokens_original,
+            "tokens_used": self.tokens_used,
+            "tokens_saved": self.tokens_saved,
+            "memories_packed": len(self.memories),
+            "deduped": self.deduped,
+            "truncated": self.truncated,
+            "dropped": self.dropped,
+        }
+
+
+class ContextPacker:
+    """
+    Packs retrieved memories into a token-bounded context block.
+
+    1. Dedupe: drop memories whose word set is >= dedupe_threshold Jaccard-similar to one already kept
+       (input is relevance-ordered, so the most relevant copy wins).
+    2. Truncate: cap each memory at max_memory_tokens.
+    3. Budget: keep memories in relevance order until token_budget is spent.
+    4. Order: emit the survivors chronologically (creation_turn, internal_code) so memories that persist
+       across turns keep the same position and the prompt prefix stays cacheable provider-side.
+    """
+
+    def __init__(self, token_budget=1500, max_memory_tokens=200, dedupe_threshold=0.85):
+        self.token_budget = token_budget
+        self.max_memory_tokens = max_memory_tokens
+        self.dedupe_threshold = dedupe_threshold
+
+    @staticmethod
+    def format_memory(mem, content=None):
+        return f"[{mem.internal_code}] (Turn {mem.metadata.get('creation_turn', '?')}): {content if content is not None else mem.content}"
+
+    def pack(self, memories, token_budget=None):
+        budget = self.token_budget if token_budget is None else token_budget
+
+        tokens_original = 0
+        kept_shingles = []
+        selected = []   # (mem, line, tokens)
+        used = 0
+        deduped = truncated = dropped = 0
+
+        for mem in memories:
+            full_line = self.format_memory(mem)
+            full_tokens = estimate_tokens(full_line)
+            tokens_original += full_tokens
+
+            shingles = _shingles(mem.content)
+            if any(_jaccard(shingles, seen) >= self.dedupe_threshold for seen in kept_shingles):
+                deduped += 1
+                continue
+
+            line, tokens = full_line, full_tokens
+            if estimate_tokens(mem.content) > self.max_memory_tokens:
+                line = self.format_memory(mem, _truncate(mem.content, self.max_memory_tokens))
+                tokens = estimate_tokens(line)
+                truncated += 1
+
+            if used + tokens > budget:
+                dropped += 1
+                continue
+
+            kept_shingles.append(shingles)
+            selected.append((mem, line, tokens))
+            used += tokens
+
+        selected.sort(key=lambda x: (x[0].metadata.get("creation_turn", 0), x[0].internal_code))
+        return PackedContext(
+            memories=[s[0] for s in selected],
+            lines=[s[1] for s in selected],
+            tokens_original=tokens_original,
+            tokens_used=used,
+            deduped=deduped,
+            truncated=truncated,
+            dropped=dropped,
+        )
@@ -0,0 +1,126 @@
+import re
+import hashlib
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def _features(text):
+    """Unigrams + bigrams of the normalized text (case and punctuation insensitive)."""
+    words = _WORD_RE.findall(text.lower())
+    return set(words) | {f"{a} {b}" for a, b in zip(words, words[1:])}
+
+
+def _hash64(feature):
+    return int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "big")
+
+
+def simhash(features, bits=64):
+    weights = [0] * bits
+    for feature in features:
+        h = _hash64(feature)
+        for i in range(bits):
+            weights[i] += 1 if (h >> i) & 1 else -1
+    fingerprint = 0
+    for i, w in enumerate(weights):
+        if w > 0:
+            fingerprint |= 1 << i
+    return fingerprint
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+class NearDuplicateIndex:
+    """
+    SimHash fingerprints bucketed with banded LSH.
+
+    The 64-bit fingerprint is split into (max_distance + 1) bands; by the pigeonhole principle any
+    two fingerprints within max_distance bits agree exactly on at least one band, so only memories
+    sharing a band bucket are compared. Candidates are then verified with feature-set Jaccard
+    >= min_similarity, which keeps "my name is Bob" from merging into "my name is Alice".
+    """
+
+    def __init__(self, min_similarity=0.9, max_distance=3, bits=64):
+        self.min_similarity = min_similarity
+        self.max_distance = max_distance
+        self.bits = bits
+        self.bands = max_distance + 1
+        self._band_width = bits // self.bands
+        self._buckets = {}     # (scope, band_no, band_value) -> set(keys)
+        self._entries = {}     # key -> (scope, fingerprint, features)
+
+        # Metrics
+        self.lookups = 0
+        self.hits = 0
+
+    def _band_keys(self, scope, fingerprint):
+        mask = (1 << self._band_width) - 1
+        for band in range(self.bands):
+            yield (scope, band, (fingerprint >> (band * self._band_width)) & mask)
+
+    def find(self, text, scope=None):
+        """Returns the key of a stored near-duplicate of `text`, or None."""
+        self.lookups += 1
+        features = _features(text)
+        if not features:
+            return None
+        fingerprint = simhash(features, self.bits)
+
+        candidates = set()
+        for band_key in self._band_keys(scope, fingerprint):
+            candidates |= self._buckets.get(band_key, set())
+
+        best_key, best_sim = None, self.min_similarity
+        for key in candidates:
+            _, other_fp, other_features = self._entries[key]
+            if hamming(fingerprint, other_fp) > self.max_distance:
+                continue
+            sim = len(features & other_features) / len(features | other_features)
+            if sim >= best_sim:
+                best_key, best_sim = key, sim
+        if best_key is not None:
+            self.hits += 1
+        return best_key
+
+    def add(self, key, text, scope=None, fingerprint=None):
+        """Indexes `text`; a previously computed `fingerprint` (e.g. from a snapshot) skips re-hashing."""
+        features = _features(text)
+        if not features:
+            return
+        if fingerprint is None:
+            fingerprint = simhash(features, self.bits)
+        self._entries[key] = (scope, fingerprint, features)
+        for band_key in self._band_keys(scope, fingerprint):
+            self._buckets.setdefault(band_key, set()).add(key)
+
+    def fingerprint(self, key):
+        entry = self._entries.get(key)
+        return entry[1] if entry else None
+
+    def remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        scope, fingerprint, _ = entry
+        for band_key in self._band_keys(scope, fingerprint):
+            bucket = self._buckets.get(band_key)
+            if bucket:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band_key]
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def dedup_rate(self):
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def stats(self):
+        return {
+            "lookups": self.lookups,
+            "merged": self.hits,
+            "dedup_rate": round(self.dedup_rate, 4),
+            "fingerprints": len(self._entries),
+        }
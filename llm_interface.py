@@ -1,49 +1,97 @@
 import os
 import json
-<<<<<<< HEAD
-import requests
+import time
 from typing import List, Optional
+from llm_transport import ProviderTransport, TransportError
+from context_packer import ContextPacker
+from mock_llm import LatencyModel
+
+MEMORY_SYSTEM_PROMPT = """You are MemGraph AI, an advanced interactive assistant powered by a four-tier memory architecture. 
+You have access to relevant memories that inform your responses. Use this context naturally without explicitly mentioning memory codes.
+Your task is to provide helpful, conversational responses that demonstrate understanding of the context while being engaging and informative. Ask follow-up questions when appropriate, and make the conversation feel natural and interactive."""
+
+BASE_SYSTEM_PROMPT = """You are MemGraph AI, an advanced interactive assistant. 
+You're designed to be helpful, engaging, and conversational. Ask questions, provide detailed explanations, and make the interaction feel natural and interesting."""
+
+# Provider SDKs (openai, google.generativeai, requests) are imported on first use
+# so that `import llm_interface` stays cheap and free of side effects.
 
 class LLMInterface:
-    def __init__(self, provider="openai", model="gpt-3.5-turbo"):
+    def __init__(self, provider="openai", model="gpt-3.5-turbo", gemini_model="gemini-2.0-flash"):
         self.provider = provider.lower()
         self.model = model
         self.api_key = os.getenv("OPENAI_API_KEY", "")
-        
-        # Provider-specific configurations
-        if self.provider == "openai":
+        self.ollama_url = os.getenv("OLLAMA_URL", "http://localhost:11434")
+        self.hf_api_key = os.getenv("HUGGINGFACE_API_KEY", "")
+
+        # Gemini (configured explicitly via set_api_key)
+        self.gemini_model_name = gemini_model
+        self.gemini_model = None
+        self._gemini_key = None
+
+        self._client = None
+        self._client_failed = False
+
+        # Token-budgeted prompt context
+        self.context_packer = ContextPacker(token_budget=int(os.getenv("LLM_CONTEXT_TOKENS", "1500")))
+        self.last_context_stats = {}
+        self.total_tokens_saved = 0
+
+        # Pooled HTTP transports for the REST providers, built on first call
+        self._transports = {}
+
+        # Simulated generation delay for mock responses (load testing), e.g. LLM_MOCK_LATENCY=lognormal:200:0.5
+        self.mock_latency = LatencyModel.from_spec(os.getenv("LLM_MOCK_LATENCY"))
+
+    def _transport(self, name):
+        if name not in self._transports:
+            self._transports[name] = ProviderTransport.from_env(name)
+        return self._transports[name]
+
+    def transport_stats(self):
+        return [t.stats() for t in self._transports.values()]
+
+    @property
+    def client(self):
+        """Lazily builds the OpenAI client on first use."""
+        if self._client is None and not self._client_failed:
             try:
                 import openai
-                self.client = openai.OpenAI(api_key=self.api_key)
-                print(f"[LLM] Initialized OpenAI with model={model}")
+                self._client = openai.OpenAI(api_key=self.api_key)
+                print(f"[LLM] Initialized OpenAI with model={self.model}")
             except ImportError:
-                print("[LLM] OpenAI package not installed. Installing...")
-                self._install_openai()
-                import openai
-                self.client = openai.OpenAI(api_key=self.api_key)
-                print(f"[LLM] Initialized OpenAI with model={model}")
-                
-        elif self.provider == "ollama":
-            self.ollama_url = os.getenv("OLLAMA_URL", "http://localhost:11434")
-            print(f"[LLM] Initialized Ollama with model={model} at {self.ollama_url}")
-            
-        elif self.provider == "huggingface":
-            self.hf_api_key = os.getenv("HUGGINGFACE_API_KEY", "")
-            print(f"[LLM] Initialized Hugging Face with model={model}")
-            
-        else:
-            print(f"[LLM] Using mock provider with model={model}")
-            
-    def _install_openai(self):
-        """Install openai package if not available"""
-        import subprocess
-        import sys
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "openai"])
-        
+                print("[LLM] OpenAI package not installed. Falling back to mock responses.")
+                self._client_failed = True
+        return self._client
+
+    def set_api_key(self, api_key):
+        """Sets the Gemini API Key and initializes the model."""
+        if not api_key:
+            api_key = os.environ.get("GEMINI_API_KEY")
+        if not api_key:
+            print("[LLM] No API Key provided or found in environment.")
+            return
+        if api_key == self._gemini_key and self.gemini_model is not None:
+            return  # Already configured; avoid re-initializing on every request
+
+        try:
+            import google.generativeai as genai
+            genai.configure(api_key=api_key)
+            self.gemini_model = genai.GenerativeModel(self.gemini_model_name)
+            self._gemini_key = api_key
+            self.provider = "gemini"
+            print(f"[LLM] Gemini API Key set. Model: {self.gemini_model_name}")
+        except Exception as e:
+            print(f"[LLM] Failed to configure Gemini: {e}")
+            self.gemini_model = None
+
     def _call_openai(self, messages: List[dict], temperature: float = 0.7) -> str:
         """Call OpenAI API"""
+        client = self.client
+        if client is None:
+            return self._get_mock_response(messages)
         try:
-            response = self.client.chat.completions.create(
+            response = client.chat.completions.create(
                 model=self.model,
                 messages=messages,
                 temperature=temperature,
@@ -53,35 +101,39 @@ class LLMInterface:
         except Exception as e:
             print(f"[LLM] OpenAI API error: {e}")
             return self._get_mock_response(messages)
-            
+
+    def _call_gemini(self, prompt: str) -> str:
+        """Call Gemini API"""
+        try:
+            response = self.gemini_model.generate_content(prompt)
+            return response.text
+        except Exception as e:
+            print(f"[LLM] Gemini API error: {e}")
+            return self._get_mock_response_from_prompt(prompt)
+
     def _call_ollama(self, prompt: str, temperature: float = 0.7) -> str:
         """Call Ollama API"""
         try:
-            response = requests.post(
+            result = self._transport("ollama").post_json(
                 f"{self.ollama_url}/api/generate",
-                json={
+                {
                     "model": self.model,
                     "prompt": prompt,
                     "stream": False,
                     "temperature": temperature
-                },
-                timeout=30
+                }
             )
-            if response.status_code == 200:
-                return response.json()["response"].strip()
-            else:
-                print(f"[LLM] Ollama API error: {response.status_code}")
-                return self._get_mock_response_from_prompt(prompt)
-        except Exception as e:
+            return result["response"].strip()
+        except (TransportError, KeyError, TypeError, AttributeError) as e:
             print(f"[LLM] Ollama API error: {e}")
             return self._get_mock_response_from_prompt(prompt)
-            
+
     def _call_huggingface(self, prompt: str, temperature: float = 0.7) -> str:
         """Call Hugging Face Inference API"""
         try:
             headers = {"Authorization": f"Bearer {self.hf_api_key}"}
             API_URL = f"https://api-inference.huggingface.co/models/{self.model}"
-            
+
             payload = {
                 "inputs": prompt,
                 "parameters": {
@@ -89,20 +141,18 @@ class LLMInterface:
                     "max_new_tokens": 300
                 }
             }
-            
-            response = requests.post(API_URL, headers=headers, json=payload, timeout=30)
-            if response.status_code == 200:
-                result = response.json()
-                if isinstance(result, list) and len(result) > 0:
-                    return result[0]["generated_text"].strip()
-                elif isinstance(result, dict) and "generated_text" in result:
-                    return result["generated_text"].strip()
-            print(f"[LLM] Hugging Face API error: {response.status_code}")
+
+            result = self._transport("huggingface").post_json(API_URL, payload, headers=headers)
+            if isinstance(result, list) and len(result) > 0:
+                return result[0]["generated_text"].strip()
+            elif isinstance(result, dict) and "generated_text" in result:
+                return result["generated_text"].strip()
+            print("[LLM] Hugging Face API error: unexpected response shape")
             return self._get_mock_response_from_prompt(prompt)
-        except Exception as e:
+        except (TransportError, KeyError, TypeError, AttributeError) as e:
             print(f"[LLM] Hugging Face API error: {e}")
             return self._get_mock_response_from_prompt(prompt)
-            
+
     def _get_mock_response(self, messages: List[dict]) -> str:
         """Generate mock response based on messages"""
         user_message = ""
@@ -162,98 +212,25 @@ class LLMInterface:
             return f"I've processed your query: '{prompt}'. This is handled by the MemGraph memory system, which searches through its four specialized memory tiers to find the most relevant information. Each tier contributes different types of knowledge - from immediate recall to deep semantic understanding. What specific aspect of this process would you like to explore further?"
 
     def generate_memgraph_response(self, user_query: str, relevant_memories: List) -> str:
-=======
-import google.generativeai as genai
-
-class LLMInterface:
-    def __init__(self, model_name="gemini-2.0-flash"):
-        self.client = None
-        self.model_name = model_name
-        self.model = None
-
-    def set_api_key(self, api_key):
-        """Sets the Gemini API Key and initializes the model."""
-        try:
-            # Check environment variable first if not provided
-            if not api_key:
-                api_key = os.environ.get("GEMINI_API_KEY")
-            
-            # Hardcoded key fallback (User provided)
-            if not api_key:
-                api_key = "AIzaSy..." # Placeholder for security, in real usage would be the actual key
-
-            if not api_key:
-                print("[LLM] No API Key provided or found in environment.")
-                return
-
-            genai.configure(api_key=api_key)
-            self.model = genai.GenerativeModel(self.model_name)
-            self.client = True # Flag to indicate readiness
-            print(f"[LLM] Gemini API Key set. Model: {self.model_name}")
-        except Exception as e:
-            print(f"[LLM] Failed to configure Gemini: {e}")
-            self.client = None
-
-    def generate_memgraph_response(self, user_query, active_memories):
->>>>>>> 8cb370184dc79a488507db603c5646c3d1ffcc1d
         """
         Generates a response using the LLM, conditioned on retrieved memories.
         """
-<<<<<<< HEAD
-        # Construct Context String
-        context_str = "\n".join([
-            f"[{m.internal_code}] (Turn {m.metadata.get('creation_turn', '?')}): {m.content}" 
-            for m in relevant_memories
-        ])
+        # Pack memories into a token budget (dedupe, truncate, stable order)
+        packed = self.context_packer.pack(relevant_memories)
+        self.last_context_stats = packed.stats()
+        self.total_tokens_saved += packed.tokens_saved
+        if packed.tokens_saved:
+            print(f"[CONTEXT] Packed {len(packed.memories)}/{len(relevant_memories)} memories, saved {packed.tokens_saved} tokens")
+        context_str = packed.text
         
-        # Create more engaging system prompt
+        # Static instructions first, memory block last: the unchanged prefix is reusable by provider-side prompt caching
         if context_str:
-            system_prompt = f"""You are MemGraph AI, an advanced interactive assistant powered by a four-tier memory architecture. 
-You have access to relevant memories that inform your responses. Use this context naturally without explicitly mentioning memory codes.
+            system_prompt = f"""{MEMORY_SYSTEM_PROMPT}
 
 Active Memories:
-{context_str}
-=======
-        
-        # Context Construction
-        memory_block = ""
-        if active_memories:
-            memory_block = "RELEVANT MEMORIES (Use these to answer):\n"
-            for mem in active_memories:
-                memory_block += f"- [{mem.tier.name}] {mem.content} (Confidence: {mem.half_life_score:.2f})\n"
-        
-        system_prompt = f"""You are MemGraph, an AI with a localized long-term memory system.
-        
-{memory_block}
-
-INSTRUCTIONS:
-1. Answer the user's query based ONLY on the provided memories if relevant.
-2. If memories are provided, cite them implicitly (e.g., "As you mentioned before...").
-3. If no memories are relevant, answer generally but admit you don't recall specific details if asked.
-4. Be concise and helpful.
-"""
-        
-        # 1. Real API Call (if key set)
-        if self.client and self.model:
-            try:
-                # Gemini doesn't use 'system' role in the same way as OpenAI in `generate_content`
-                # We prepend system prompt to user query or use system_instruction if supported by lib version
-                # For safety, simpler concatenation:
-                full_prompt = f"{system_prompt}\n\nUSER: {user_query}"
-                
-                response = self.model.generate_content(full_prompt)
-                return response.text
-            except Exception as e:
-                return f"Error calling Gemini LLM: {str(e)}"
-
-        # 2. Mock Fallback (No Key)
-        return f"[MOCK RES] (Gemini Key Missing) I received: '{user_query}'. Memories used: {len(active_memories)}"
->>>>>>> 8cb370184dc79a488507db603c5646c3d1ffcc1d
-
-Your task is to provide helpful, conversational responses that demonstrate understanding of the context while being engaging and informative. Ask follow-up questions when appropriate, and make the conversation feel natural and interactive."""
+{context_str}"""
         else:
-            system_prompt = """You are MemGraph AI, an advanced interactive assistant. 
-You're designed to be helpful, engaging, and conversational. Ask questions, provide detailed explanations, and make the interaction feel natural and interesting."""
+            system_prompt = BASE_SYSTEM_PROMPT
 
         messages = [
             {"role": "system", "content": system_prompt},
@@ -261,7 +238,9 @@ You're designed to be helpful, engaging, and conversational. Ask questions, prov
         ]
         
         # Call appropriate provider
-        if self.provider == "openai" and self.api_key:
+        if self.provider == "gemini" and self.gemini_model is not None:
+            return self._call_gemini(system_prompt + "\n\nUSER: " + user_query)
+        elif self.provider == "openai" and self.api_key:
             return self._call_openai(messages)
         elif self.provider == "ollama":
             return self._call_ollama(system_prompt + "\n\nUser: " + user_query)
@@ -269,13 +248,14 @@ You're designed to be helpful, engaging, and conversational. Ask questions, prov
             return self._call_huggingface(system_prompt + "\n\nUser: " + user_query)
         else:
             # Fallback to enhanced mock response
+            if self.mock_latency is not None:
+                time.sleep(self.mock_latency.sample())
             return self._get_mock_response(messages)
             
     def summarize_intent(self, interaction_history: List[str]) -> str:
         """
         Summarizes a list of interactions into a single 'Goal' or 'Intent' string.
         """
-<<<<<<< HEAD
         joined_history = " ".join(interaction_history)
         
         prompt = f"""Summarize the following interaction history into a concise goal or intent:
@@ -284,7 +264,9 @@ You're designed to be helpful, engaging, and conversational. Ask questions, prov
 
 Provide a single sentence summary of the user's main objective or intent."""
 
-        if self.provider == "openai" and self.api_key:
+        if self.provider == "gemini" and self.gemini_model is not None:
+            return self._call_gemini(prompt)
+        elif self.provider == "openai" and self.api_key:
             messages = [
                 {"role": "system", "content": "You are a helpful assistant that summarizes user intents."},
                 {"role": "user", "content": prompt}
@@ -294,27 +276,67 @@ Provide a single sentence summary of the user's main objective or intent."""
             return self._call_ollama("Summarize this user intent: " + joined_history, temperature=0.3)
         else:
             # Mock summarization
-            if len(joined_history) > 100:
-                return f"User intent: exploring {joined_history[:50]}..."
+            return self._mock_summary(joined_history)
+
+    def summarize_clusters(self, clusters: List[List[str]]) -> List[str]:
+        """
+        Summarizes many interaction clusters in ONE request.
+        Asks for a structured JSON reply; clusters the reply misses fall back to the mock summary.
+        """
+        if not clusters:
+            return []
+
+        blocks = "\n\n".join(
+            f"Cluster {i}:\n" + "\n".join(f"- {text}" for text in texts)
+            for i, texts in enumerate(clusters)
+        )
+        prompt = f"""Summarize each cluster of interactions below into a single-sentence goal or intent.
+
+{blocks}
+
+Respond with JSON only, in the form {{"summaries": [{{"cluster": 0, "summary": "..."}}, ...]}} with one entry per cluster."""
+
+        raw = None
+        if self.provider == "gemini" and self.gemini_model is not None:
+            raw = self._call_gemini(prompt)
+        elif self.provider == "openai" and self.api_key:
+            messages = [
+                {"role": "system", "content": "You are a helpful assistant that summarizes user intents. Reply with JSON only."},
+                {"role": "user", "content": prompt}
+            ]
+            raw = self._call_openai(messages, temperature=0.3)
+        elif self.provider == "ollama":
+            raw = self._call_ollama(prompt, temperature=0.3)
+
+        parsed = self._parse_cluster_summaries(raw, len(clusters)) if raw else {}
+        return [parsed.get(i) or self._mock_summary(" ".join(texts)) for i, texts in enumerate(clusters)]
+
+    @staticmethod
+    def _parse_cluster_summaries(raw: str, count: int) -> dict:
+        start, end = raw.find("{"), raw.rfind("}")
+        if start == -1 or end <= start:
+            return {}
+        try:
+            data = json.loads(raw[start:end + 1])
+        except ValueError:
+            return {}
+        result = {}
+        for pos, entry in enumerate(data.get("summaries", [])):
+            if isinstance(entry, dict):
+                idx, text = entry.get("cluster", pos), entry.get("summary")
             else:
-                return f"User goal: {joined_history}"
+                idx, text = pos, entry
+            if isinstance(idx, int) and 0 <= idx < count and isinstance(text, str) and text.strip():
+                result[idx] = text.strip()
+        return result
+
+    @staticmethod
+    def _mock_summary(joined_history: str) -> str:
+        if len(joined_history) > 100:
+            return f"User intent: exploring {joined_history[:50]}..."
+        return f"User goal: {joined_history}"
 
-# Initialize with environment variables or defaults
+# Initialize with environment variables or defaults (configuration only, no I/O)
 provider = os.getenv("LLM_PROVIDER", "openai")
 model = os.getenv("LLM_MODEL", "gpt-3.5-turbo")
 llm_client = LLMInterface(provider=provider, model=model)
-=======
-        if self.client and self.model:
-            joined_history = " ".join(interaction_history)
-            try:
-                prompt = f"Summarize the following user interactions into a single concise goal or intent statement:\n\n{joined_history}"
-                response = self.model.generate_content(prompt)
-                return response.text
-            except Exception as e:
-                return f"Error summarizing intent: {str(e)}"
-        
-        return "User is testing the MemGraph system."
-
-# Singleton Init
-llm_client = LLMInterface()
->>>>>>> 8cb370184dc79a488507db603c5646c3d1ffcc1d
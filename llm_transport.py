@@ -0,0 +1,214 @@
+import os
+import time
+import random
+import threading
+from typing import Optional
+
+
+class TransportError(Exception):
+    """Raised when a provider call fails after retries (or cannot be attempted)."""
+
+
+class CircuitOpenError(TransportError):
+    """Raised without touching the network while a provider's circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Classic three-state breaker.
+    CLOSED -> (failure_threshold consecutive failures) -> OPEN
+    OPEN -> (reset_timeout elapsed) -> HALF_OPEN, which lets one probe through
+    HALF_OPEN -> success closes, failure re-opens.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=3, reset_timeout=15.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow_request(self):
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if self._clock() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = False
+            # HALF_OPEN: a single probe at a time
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def cancel_probe(self):
+        """Releases a half-open probe slot that was granted but never used."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    print(f"[LLM] Circuit opened after {self._failures} failures")
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+
+
+class ProviderTransport:
+    """
+    Shared HTTP transport for one LLM provider.
+
+    - keep-alive connection pool (one requests.Session per provider)
+    - bounded concurrency (calls beyond the limit wait, but never past the deadline)
+    - deadline-aware timeouts: each attempt gets min(attempt_timeout, time left)
+    - retries with full-jitter exponential backoff on connection errors, 429 and 5xx
+    - circuit breaker that short-circuits to the caller's fallback while unhealthy
+    """
+    RETRY_STATUS = {429, 500, 502, 503, 504}
+
+    def __init__(self, name, max_concurrency=8, deadline=8.0, attempt_timeout=5.0,
+                 connect_timeout=1.0, max_retries=2, backoff_base=0.1, backoff_cap=1.0,
+                 breaker=None, pool_size=None):
+        self.name = name
+        self.deadline = deadline
+        self.attempt_timeout = attempt_timeout
+        self.connect_timeout = connect_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.pool_size = pool_size or max_concurrency
+        self.breaker = breaker or CircuitBreaker()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._session = None
+        self._session_lock = threading.Lock()
+
+        # Counters for /stats style reporting
+        self.calls = 0
+        self.failures = 0
+        self.short_circuits = 0
+        self.retries = 0
+
+    @classmethod
+    def from_env(cls, name, **overrides):
+        """Builds a transport using LLM_* environment defaults."""
+        config = {
+            "max_concurrency": int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+            "deadline": float(os.getenv("LLM_DEADLINE_S", "8")),
+            "attempt_timeout": float(os.getenv("LLM_ATTEMPT_TIMEOUT_S", "5")),
+            "max_retries": int(os.getenv("LLM_MAX_RETRIES", "2")),
+        }
+        config.update(overrides)
+        return cls(name, **config)
+
+    @property
+    def session(self):
+        """Lazily builds the pooled session (keeps `requests` out of import time)."""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    self._session = session
+        return self._session
+
+    def _backoff(self, attempt):
+        # Full jitter: uniform(0, min(cap, base * 2^attempt))
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+
+    def post_json(self, url, payload, headers=None, deadline: Optional[float] = None):
+        """
+        POSTs JSON and returns the decoded JSON body.
+        Raises CircuitOpenError / TransportError instead of blocking past the deadline.
+        """
+        import requests
+
+        self.calls += 1
+        if not self.breaker.allow_request():
+            self.short_circuits += 1
+            raise CircuitOpenError(f"{self.name} circuit open")
+
+        budget = self.deadline if deadline is None else deadline
+        expires_at = time.monotonic() + budget
+
+        if not self._slots.acquire(timeout=max(0.0, budget)):
+            # Queue wait is not a provider failure, so leave the breaker counts alone
+            self.failures += 1
+            self.breaker.cancel_probe()
+            raise TransportError(f"{self.name} concurrency limit: no slot within {budget:.1f}s")
+
+        last_error = None
+        settled = False
+        try:
+            for attempt in range(self.max_retries + 1):
+                remaining = expires_at - time.monotonic()
+                if remaining <= 0:
+                    break
+                timeout = (min(self.connect_timeout, remaining), min(self.attempt_timeout, remaining))
+                try:
+                    response = self.session.post(url, json=payload, headers=headers, timeout=timeout)
+                    if response.status_code == 200:
+                        body = response.json()
+                        self.breaker.record_success()
+                        settled = True
+                        return body
+                    last_error = TransportError(f"{self.name} HTTP {response.status_code}")
+                    if response.status_code not in self.RETRY_STATUS:
+                        break
+                except (requests.RequestException, ValueError) as e:
+                    # Any requests failure (incl. ChunkedEncodingError, TooManyRedirects) or a bad JSON body
+                    last_error = TransportError(f"{self.name} {type(e).__name__}: {e}")
+
+                if attempt < self.max_retries:
+                    pause = self._backoff(attempt)
+                    if time.monotonic() + pause >= expires_at:
+                        break
+                    self.retries += 1
+                    time.sleep(pause)
+
+            self.failures += 1
+            self.breaker.record_failure()
+            settled = True
+            raise last_error or TransportError(f"{self.name} deadline of {budget:.1f}s exceeded")
+        finally:
+            self._slots.release()
+            if not settled:
+                # Unexpected error: never leave a half-open probe in flight
+                self.breaker.cancel_probe()
+
+    def stats(self):
+        return {
+            "provider": self.name,
+            "state": self.breaker.state,
+            "calls": self.calls,
+            "failures": self.failures,
+            "retries": self.retries,
+            "short_circuits": self.short_circuits,
+        }
@@ -0,0 +1,293 @@
+"""
+Load generator for the MemGraph API.
+
+Replays multi-turn transcripts against /chat, either closed-loop (N virtual users, each sending
+its next turn when the previous reply arrives) or open-loop at a fixed arrival rate, and reports
+throughput, latency percentiles, error rate and the server's own /chat stage timings.
+
+    python loadtest.py --users 16 --duration 30 --llm-latency lognormal:200:0.5
+    python loadtest.py --qps 40 --duration 30
+    python loadtest.py --url http://localhost:8000 --transcripts sessions.jsonl
+
+Without --url an in-process uvicorn server is started with the deterministic mock LLM.
+"""
+import os
+import sys
+import json
+import time
+import socket
+import random
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from profiler import percentile
+
+TOPICS = [
+    ("Python", ["I'm refactoring a Python service", "It uses FastAPI and asyncio", "Tests run with pytest"]),
+    ("Travel", ["I'm planning a trip to Japan", "I land in Tokyo in April", "I want to see Kyoto too"]),
+    ("Cooking", ["I'm learning to bake bread", "My sourdough starter is a week old", "The crumb came out dense"]),
+    ("Fitness", ["I started running again", "I do 5k three times a week", "My knee hurts after long runs"]),
+    ("Music", ["I'm practicing guitar", "I can play barre chords now", "I want to learn fingerstyle"]),
+]
+FOLLOW_UPS = [
+    "What did I tell you about {topic}?",
+    "Can you remind me what I said five turns ago?",
+    "Any advice on {topic} given what you know?",
+    "Summarize our conversation so far.",
+    "My name is User{user}.",
+]
+
+
+def synthetic_transcripts(count, turns, seed=0):
+    """Deterministic multi-turn conversations that mix new facts with recall questions."""
+    rng = random.Random(seed)
+    transcripts = []
+    for user in range(count):
+        topic, facts = rng.choice(TOPICS)
+        messages = []
+        for turn in range(turns):
+            if turn < len(facts):
+                messages.append(facts[turn])
+            else:
+                messages.append(rng.choice(FOLLOW_UPS).format(topic=topic, user=user))
+        transcripts.append(messages)
+    return transcripts
+
+
+def load_transcripts(path):
+    """JSONL: one conversation per line, either a list of messages or {"turns": [...]}."""
+    transcripts = []
+    with open(path) as fh:
+        for line in fh:
+            if line.strip():
+                row = json.loads(line)
+                transcripts.append(row["turns"] if isinstance(row, dict) else row)
+    return transcripts
+
+
+def start_local_server(storage="none"):
+    """Runs server.app in a background uvicorn thread, on the mock LLM, and returns (base_url, server)."""
+    # Explicit, not setdefault: --storage must win over an inherited MEMGRAPH_STORAGE
+    os.environ["MEMGRAPH_STORAGE"] = storage
+    import uvicorn
+    import server as memgraph_server
+    from llm_interface import llm_client
+
+    # Never reach a real provider, even with OPENAI_API_KEY etc. set
+    llm_client.provider = "mock"
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    config = uvicorn.Config(memgraph_server.app, host="127.0.0.1", port=port, log_level="warning")
+    srv = uvicorn.Server(config)
+    threading.Thread(target=srv.run, daemon=True).start()
+    deadline = time.time() + 10
+    while not srv.started:
+        if time.time() > deadline:
+            raise RuntimeError("Local server did not start")
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}", srv
+
+
+class LoadResult:
+    def __init__(self):
+        self.latencies = []
+        self.errors = 0
+        self.error_samples = []
+        self._lock = threading.Lock()
+
+    def record(self, seconds, error=None):
+        with self._lock:
+            if error is None:
+                self.latencies.append(seconds)
+            else:
+                self.errors += 1
+                if len(self.error_samples) < 5:
+                    self.error_samples.append(str(error))
+
+    def report(self, elapsed, server_stages=None):
+        lat = sorted(self.latencies)
+        total = len(lat) + self.errors
+        return {
+            "requests": total,
+            "duration_s": round(elapsed, 2),
+            "throughput_rps": round(len(lat) / elapsed, 2) if elapsed else 0.0,
+            "error_rate": round(self.errors / total, 4) if total else 0.0,
+            "p50_ms": round(percentile(lat, 50) * 1000, 1),
+            "p95_ms": round(percentile(lat, 95) * 1000, 1),
+            "p99_ms": round(percentile(lat, 99) * 1000, 1),
+            "max_ms": round(lat[-1] * 1000, 1) if lat else 0.0,
+            "errors": self.error_samples,
+            "server_stages": server_stages or {},
+        }
+
+
+def _send(session, url, message, timeout, session_id=None):
+    response = session.post(f"{url}/chat", json={"message": message, "session_id": session_id}, timeout=timeout)
+    response.raise_for_status()
+    return response
+
+
+def run_closed_loop(url, transcripts, users, duration, think_time=0.0, timeout=30.0, warmup=True):
+    """
+    Each virtual user replays transcripts back to back; a turn is sent only after the previous reply.
+    Every replay is its own server session (opened via /sessions first when `warmup` is set), so the
+    server reports first-turn latency separately.
+    """
+    import requests
+    result = LoadResult()
+    stop_at = time.perf_counter() + duration
+
+    def user_loop(idx):
+        session = requests.Session()
+        n = idx
+        while time.perf_counter() < stop_at:
+            session_id = f"loadtest-{idx}-{n}"
+            if warmup:
+                try:
+                    session.post(f"{url}/sessions", params={"session_id": session_id}, timeout=timeout)
+                except Exception as e:
+                    result.record(0.0, error=e)
+            for message in transcripts[n % len(transcripts)]:
+                if time.perf_counter() >= stop_at:
+                    break
+                start = time.perf_counter()
+                try:
+                    _send(session, url, message, timeout, session_id)
+                    result.record(time.perf_counter() - start)
+                except Exception as e:
+                    result.record(time.perf_counter() - start, error=e)
+                if think_time:
+                    time.sleep(think_time)
+            n += users
+        session.close()
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=user_loop, args=(i,)) for i in range(users)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return result, time.perf_counter() - start
+
+
+def run_open_loop(url, transcripts, qps, duration, max_workers=64, timeout=30.0):
+    """
+    Fixed arrival rate. Latency is measured from each request's scheduled send time, so a
+    saturated server shows up as queueing delay instead of silently lowering the offered load.
+    """
+    import requests
+    result = LoadResult()
+    messages = [m for t in transcripts for m in t]
+    local = threading.local()
+
+    def fire(message, scheduled):
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        try:
+            _send(local.session, url, message, timeout)
+            result.record(time.perf_counter() - scheduled)
+        except Exception as e:
+            result.record(time.perf_counter() - scheduled, error=e)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for i in range(int(qps * duration)):
+            scheduled = start + i / qps
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(fire, messages[i % len(messages)], scheduled)
+    return result, time.perf_counter() - start
+
+
+def fetch_server_stages(url):
+    import requests
+    try:
+        return requests.get(f"{url}/stats", timeout=5).json().get("stages", {})
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def run(args):
+    transcripts = load_transcripts(args.transcripts) if args.transcripts else \
+        synthetic_transcripts(max(args.users, 8), args.turns, seed=args.seed)
+
+    url, srv = args.url, None
+    if url is None:
+        url, srv = start_local_server(args.storage)
+        from llm_interface import llm_client
+        from mock_llm import LatencyModel
+        llm_client.mock_latency = LatencyModel.from_spec(args.llm_latency, seed=args.seed)
+
+    quiet = args.quiet and srv is not None
+    real_stdout = sys.stdout
+    if quiet:
+        # The in-process server logs every memory op; keep the report readable
+        sys.stdout = open(os.devnull, "w")
+    try:
+        if srv is not None:
+            import server as memgraph_server
+            memgraph_server.stage_timings.reset()
+        if args.qps:
+            result, elapsed = run_open_loop(url, transcripts, args.qps, args.duration, timeout=args.timeout)
+        else:
+            result, elapsed = run_closed_loop(url, transcripts, args.users, args.duration,
+                                              think_time=args.think_time, timeout=args.timeout, warmup=args.warmup)
+        report = result.report(elapsed, fetch_server_stages(url))
+    finally:
+        if quiet:
+            sys.stdout.close()
+            sys.stdout = real_stdout
+        if srv is not None:
+            srv.should_exit = True
+
+    report["mode"] = f"open-loop {args.qps} qps" if args.qps else f"closed-loop {args.users} users"
+    report["llm_latency"] = args.llm_latency if args.url is None else "server-configured"
+    return report
+
+
+def print_report(report):
+    print(f"\n[LOADTEST] {report['mode']} | llm={report['llm_latency']} | {report['duration_s']}s")
+    print(f"  requests={report['requests']}  throughput={report['throughput_rps']} req/s  errors={report['error_rate'] * 100:.2f}%")
+    print(f"  latency p50={report['p50_ms']}ms  p95={report['p95_ms']}ms  p99={report['p99_ms']}ms  max={report['max_ms']}ms")
+    for err in report["errors"]:
+        print(f"  ! {err}")
+    if report["server_stages"]:
+        print("  server stages (ms):      p50      p95      p99")
+        for stage, row in report["server_stages"].items():
+            if isinstance(row, dict):
+                print(f"    {stage:18s} {row['p50_ms']:8.2f} {row['p95_ms']:8.2f} {row['p99_ms']:8.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay conversations against the MemGraph /chat API.")
+    parser.add_argument("--url", help="Target server (default: start one in-process)")
+    parser.add_argument("--users", type=int, default=8, help="Closed-loop virtual users")
+    parser.add_argument("--qps", type=float, default=0, help="Open-loop arrival rate (overrides --users)")
+    parser.add_argument("--duration", type=float, default=20, help="Seconds to run")
+    parser.add_argument("--turns", type=int, default=12, help="Turns per synthetic transcript")
+    parser.add_argument("--transcripts", help="JSONL file of recorded conversations")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Seconds between a user's turns")
+    parser.add_argument("--llm-latency", default="lognormal:150:0.4", help="Mock LLM latency spec (in-process only)")
+    parser.add_argument("--storage", default="none", help="MEMGRAPH_STORAGE for the in-process server")
+    parser.add_argument("--warmup", action=argparse.BooleanOptionalAction, default=True,
+                        help="Open each closed-loop session via /sessions (L1 warm-up) before its first turn")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--quiet", action=argparse.BooleanOptionalAction, default=True,
+                        help="Silence in-process server logging during the run")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    return report
+
+
+if __name__ == "__main__":
+    main()
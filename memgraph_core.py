@@ -3,22 +3,41 @@ import uuid
 import math
 import random
 import json
+import functools
 from enum import Enum
 from collections import deque
+from itertools import islice, chain
 from datetime import datetime
 from llm_interface import llm_client
+from consolidation import ConsolidationEngine
+from dedup import NearDuplicateIndex
+from quantized_index import QuantizedVectorIndex
+from vector_ops import cosine_similarity
+from storage import SupabaseBackend, memory_to_record
+from cache import LRUCache
+from memory_catalog import MemoryCatalog
+from bitmap_index import BitmapIndex
+from tier_policy import TierMigrationPolicy
+from retrieval_cache import RetrievalCache, terms
+from summary_tree import SummaryTree
+from warmup import SessionWarmup
+from spill_store import ColdMemoryManager, SPILLED_FIELDS
 import os
-try:
-    from supabase_config import supabase_client
-except ImportError:
-    supabase_client = None
 
 class MemoryTier(Enum):
     L1_FAST_REACTOR = "L1_Redis_Cache"
     L2_EPISODIC = "L2_Episodic_Log"
     L3_SEMANTIC = "L3_Vector_Store"
+    L3_ARCHIVED = "L3_Archived_Leaf"    # HIAGENT constituent, reachable only under its goal (metadata parent_code)
     L4_GRAPH = "L4_Neo4j_Graph"
 
+def _tier_values(tier):
+    """Tier filter as stored values: accepts a MemoryTier, its value, or a list of either."""
+    if tier is None:
+        return None
+    tiers = [tier] if isinstance(tier, (str, MemoryTier)) else tier
+    return [t.value if isinstance(t, MemoryTier) else t for t in tiers]
+
 class Memory:
     def __init__(self, content, role="user", embedding=None, metadata=None):
         self.internal_code = f"MEM_{str(uuid.uuid4())[:8].upper()}"
@@ -39,6 +58,37 @@ class Memory:
         self.half_life_score = 1.0  # Starts at 100% confidence/relevance
         self.decay_rate = 0.05      # Adjustable decay rate
 
+    @classmethod
+    def from_record(cls, record):
+        """Hydrates a stored row as-is: no new internal code, no mock embedding."""
+        mem = cls.__new__(cls)
+        mem.internal_code = record["id"]
+        mem.content = record["content"]
+        mem.role = record.get("role") or "user"
+        mem.embedding = record.get("embedding")
+        created = record.get("created_at")
+        mem.creation_timestamp = created if isinstance(created, (int, float)) else time.time()
+        mem.last_access_timestamp = mem.creation_timestamp
+        mem.metadata = dict(record.get("metadata") or {})
+        mem.metadata.setdefault("creation_turn", 0)
+        mem.metadata.setdefault("last_access_turn", 0)
+        mem.access_count = record.get("access_count", 1)
+        try:
+            mem.tier = MemoryTier(record.get("tier"))
+        except ValueError:
+            mem.tier = MemoryTier.L2_EPISODIC
+        mem.half_life_score = record.get("half_life_score", 1.0)
+        mem.decay_rate = 0.05
+        return mem
+
+    def __getattr__(self, name):
+        # Only reached for attributes missing from __dict__: a spilled memory faults its payload back in
+        cold = self.__dict__.get("_cold")
+        if cold is None or name not in SPILLED_FIELDS:
+            raise AttributeError(name)
+        cold.fault_in(self)
+        return self.__dict__[name]
+
     def _mock_embedding(self):
         # reliable mock embedding for demonstration
         return [random.random() for _ in range(128)]
@@ -77,7 +127,9 @@ class Memory:
         }
 
 class MemGraphCore:
-    def __init__(self):
+    def __init__(self, db=None, backend=None, dedup_threshold=0.9, l3_vector_mode="int8",
+                 vector_store_path=None, write_batch_size=16, row_cache_size=10000, retrieval_cache_size=1024,
+                 embedder=None, ram_budget_bytes=None, spill_dir=None):
         # 3. Hierarchical Tiers
         self.l1_cache = {}          # O(1) Key-Value (Hash -> Memory) - Redis Simulation
         self.l2_episodic = deque(maxlen=50) # Recent context window
@@ -86,19 +138,54 @@ class MemGraphCore:
 
         # 2. Decoupled Indexing
         self.keyword_index = {}     # Inverted Index: Word -> Set(IDs)
-        self.vector_index = {}      # ID -> Embedding Vector
+        self.vector_index = {}      # ID -> Embedding Vector (L1/L2, full precision)
+        self.l3_vectors = QuantizedVectorIndex(mode=l3_vector_mode, store_path=vector_store_path) # L3, compressed
         self.entity_index = {}      # Entity -> Set(IDs)
+        self.memory_lookup = {}     # ID -> Memory (Code-Addressable Registry)
+        self.catalog = MemoryCatalog()  # Sorted tier/role/entity/turn indexes for listing queries
+        self.bitmaps = BitmapIndex()    # role/tier/entity/type predicate bitmaps for filtered retrieval
+
+        # Ingest-time near-duplicate suppression (None disables)
+        self.deduplicator = NearDuplicateIndex(min_similarity=dedup_threshold) if dedup_threshold else None
+
+        # HIAGENT Consolidation (clustered + batched)
+        self.consolidator = ConsolidationEngine(llm_client)
+        self.summary_tree = SummaryTree(llm_client, self.get_embedding, peek=self.peek_field)   # coarse-to-fine index over L3
+
+        # Access-frequency driven L1 promotion/demotion, applied in batches
+        self.tier_policy = TierMigrationPolicy()
+        self.warmup = SessionWarmup()   # session-open prefetch into L1
+
+        # Cold L3 payloads beyond the RAM budget live on disk and fault back in on access (None disables)
+        self.cold = ColdMemoryManager(ram_budget_bytes, spill_dir) if ram_budget_bytes else None
+
+        # texts -> vectors for new memories and queries (None: mock vectors); replaced by a ReindexJob swap
+        self.embedder = embedder
+        # {"model_id", "embedder" (reindex.EMBEDDERS name), "dim"} of the vectors in use; None = 128-d mock
+        self.embedding_model = None
 
         # "Nuclear" Configs
         self.neural_cache_hits = 0
         self.global_turn = 0
         
-        # Supabase Integration
-        self.db = supabase_client
-        if self.db:
-            print("[MemGraph] Connected to Supabase backend.")
+        # Persistence (explicit: pass a storage.StorageBackend, or a Supabase client as `db`)
+        self.backend = None
+        self.write_batch_size = write_batch_size
+        self._pending_writes = {}   # ID -> Memory, coalesced until flush_writes()
+        self._pending_deletes = set()
+        self.row_cache = LRUCache(row_cache_size)  # DB row ID -> hydrated Memory (remote retrieval)
+        # (normalized query, top_k) -> results, invalidated per term shard by writes (None disables)
+        self.retrieval_cache = RetrievalCache(retrieval_cache_size) if retrieval_cache_size else None
+        if backend is None and db is not None:
+            backend = SupabaseBackend(db)
+        self.attach_backend(backend)
+
+    def attach_backend(self, backend):
+        self.backend = backend
+        if backend is not None:
+            print(f"[MemGraph] Connected to {backend.name} storage backend.")
         else:
-            print("[MemGraph] Running in In-Memory Mode (No Supabase credentials).")
+            print("[MemGraph] Running in In-Memory Mode (no DB backend supplied).")
 
     def increment_turn(self):
         self.global_turn += 1
@@ -106,7 +193,14 @@ class MemGraphCore:
     def add_memory(self, content, role="user", entities=None):
         """
         Ingests a new memory, assigns code, indexes it, and places it in L2.
+        Near-duplicates of a live memory (same role) are merged into it instead.
         """
+        if self.deduplicator is not None:
+            dup_code = self.deduplicator.find(content, scope=role)
+            existing = self.memory_lookup.get(dup_code) if dup_code else None
+            if existing is not None:
+                return self._merge_duplicate(existing, entities)
+
         # Auto-increment turn on user input (or manual control)
         # For this implementation, we assume external controller calls increment_turn, 
         # OR we just use current global_turn.
@@ -115,44 +209,239 @@ class MemGraphCore:
         if entities:
             meta["entities"] = entities
 
-        mem = Memory(content, role=role, metadata=meta)
+        embedding = self.embedder([content])[0] if self.embedder is not None else None
+        mem = Memory(content, role=role, embedding=embedding, metadata=meta)
         
         # 1. Code-Addressable Logic
         print(f"[DEBUG] Created Memory: {mem.internal_code}")
 
         # Indexing
         self._update_indexes(mem, entities)
+        self.memory_lookup[mem.internal_code] = mem
+        if self.deduplicator is not None:
+            self.deduplicator.add(mem.internal_code, content, scope=role)
 
-        # Storage Deployment (New memories go to L2 initially)
-        if self.db:
-            # Persistent Storage via Supabase
-            try:
-                data = {
-                    "id": str(uuid.uuid4()), # Supabase generates UUIDs, but we can provide if needed, or let DB handle
-                    "content": mem.content,
-                    "tier": mem.tier.value,
-                    "embedding": mem.embedding,
-                    "metadata": mem.metadata
-                }
-                self.db.table("memgraph_memories").insert(data).execute()
-            except Exception as e:
-                print(f"[DB Error] Insert failed: {e}")
-                # Fallback to local
-                self.l2_episodic.append(mem)
-        else:
-            # Local In-Memory
-            self.l2_episodic.append(mem)
+        # Storage Deployment (New memories go to L2 initially; the backend keeps a durable copy)
+        self._append_l2(mem)
+        self._persist(mem)
         
         mem.tier = MemoryTier.L2_EPISODIC
-        
-        # Check for L1 Promotion (Hot Memory)
-        # In a real system, this would happen on frequent access. 
-        # For now, let's cache immediate user preferences/identities.
-        if "my name is" in content.lower() or "preference" in content.lower():
-            self._promote_to_l1(mem)
-        
+        self.catalog.add(mem)
+        self.bitmaps.add(mem)
+        self._invalidate_results(mem)
+        # L1 Promotion happens on observed access frequency (see run_tier_migration)
+        return mem
+
+    def _append_l2(self, mem):
+        # A full deque silently evicts its oldest entry; drop it from the registry too
+        if len(self.l2_episodic) == self.l2_episodic.maxlen:
+            self._forget(self.l2_episodic[0])
+        self.l2_episodic.append(mem)
+
+    def _merge_duplicate(self, mem, entities):
+        mem.update_access()
+        mem.metadata["last_access_turn"] = self.global_turn
+        mem.metadata["duplicate_count"] = mem.metadata.get("duplicate_count", 0) + 1
+        if entities:
+            merged = list(dict.fromkeys((mem.metadata.get("entities") or []) + list(entities)))
+            self._update_indexes_entities(mem, merged)
+            self.catalog.update(mem)
+            self.bitmaps.add(mem)
+        self._persist(mem)
+        print(f"[DEDUP] Merged near-duplicate into {mem.internal_code} (x{mem.metadata['duplicate_count'] + 1})")
         return mem
 
+    def _persist(self, mem):
+        """Queues an upsert; writes go to the backend in one batch per flush."""
+        if self.backend is None:
+            return
+        self._pending_deletes.discard(mem.internal_code)
+        self._pending_writes[mem.internal_code] = mem
+        if self.backend.serves_retrieval:
+            # Write-through: the next match_memories hit for this row reuses this object
+            self.row_cache.put(self.backend.db_id(mem.internal_code), mem)
+        if len(self._pending_writes) >= self.write_batch_size:
+            self.flush_writes()
+
+    def flush_writes(self):
+        """Sends queued upserts/deletes to the backend. Failed batches stay queued for the next flush."""
+        if self.backend is None or not (self._pending_writes or self._pending_deletes):
+            return 0
+        records = [memory_to_record(m, self.get_embedding(code)) for code, m in self._pending_writes.items()]
+        try:
+            self.backend.insert_batch(records)
+            self._pending_writes.clear()
+            if self._pending_deletes:
+                self.backend.delete(list(self._pending_deletes))
+                self._pending_deletes.clear()
+        except Exception as e:
+            print(f"[DB Error] Batch write failed: {e}")
+            return 0
+        return len(records)
+
+    def _hydrate_row(self, record):
+        """
+        Read-through cache for backend rows: a live local memory or a cached hydration is reused,
+        so repeated hits never rebuild Memory objects or regenerate embeddings.
+        """
+        mem = self.memory_lookup.get(record["id"])
+        if mem is not None:
+            return mem
+        key = record.get("db_id") or record["id"]
+        mem = self.row_cache.get(key)
+        if mem is None:
+            mem = Memory.from_record(record)
+            self.row_cache.put(key, mem)
+        return mem
+
+    def restore_from_backend(self):
+        """Rebuilds tiers and indexes from a local-authoritative backend (e.g. SQLite) after a restart."""
+        if self.backend is None or self.backend.serves_retrieval:
+            return 0
+        self._match_embedding_model(self.backend.get_setting("embedding_model"))
+        restored = 0
+        for tier in (MemoryTier.L2_EPISODIC, MemoryTier.L1_FAST_REACTOR, MemoryTier.L3_SEMANTIC):
+            for record in self.backend.scan_tier(tier.value):
+                mem = Memory.from_record(record)
+                mem.tier = tier
+                self._load_memory(mem)
+                restored += 1
+        # Archived constituents go back under their goals (loaded above) before the tree is rolled up
+        for record in self.backend.scan_tier(MemoryTier.L3_ARCHIVED.value):
+            restored += self.attach_archived(Memory.from_record(record))
+        self.summary_tree.rollup()
+        print(f"[MemGraph] Restored {restored} memories from {self.backend.name}")
+        return restored
+
+    def _match_embedding_model(self, stored):
+        """
+        Switches the embedder and the L3 index to the model the stored vectors were written with,
+        so vectors of another dimension are never read back truncated. Raises ValueError if unknown.
+        """
+        if stored is None or stored == self.embedding_model:
+            return
+        from reindex import EMBEDDERS
+        factory = EMBEDDERS.get(stored.get("embedder"))
+        if factory is None:
+            raise ValueError(f"Stored vectors use {stored.get('model_id')} ({stored.get('dim')} dims), "
+                             f"which is not a registered embedder; set embedder and embedding_model to match")
+        self.embedder = functools.partial(factory, dim=stored["dim"])
+        self.embedding_model = dict(stored)
+        old = self.l3_vectors
+        if old.dim != stored["dim"]:
+            store = old.full_store
+            path = f"{store.path}.{stored['model_id']}" if store is not None and not store._is_temp else None
+            self.l3_vectors = QuantizedVectorIndex(mode=old.mode, dim=stored["dim"], store_path=path,
+                                                   rescore_factor=old.rescore_factor)
+            old.close()
+        print(f"[MemGraph] Using stored embedding model {stored['model_id']} ({stored['dim']} dims)")
+
+    def attach_archived(self, leaf):
+        """Re-links a restored/imported archived constituent under its goal. Returns 1, or 0 if the goal is gone."""
+        if not self.summary_tree.attach_leaf(leaf.metadata.get("parent_code"), leaf):
+            print(f"[HIAGENT] Dropped orphaned leaf {leaf.internal_code} (goal {leaf.metadata.get('parent_code')} missing)")
+            return 0
+        return 1
+
+    def _load_memory(self, mem, fingerprint=None, in_l3=None):
+        """
+        Places an already-built memory (restore/import) into its tier and rebuilds its index entries.
+        `in_l3` overrides the list it lands in (an L1-promoted memory can sit in L3 after consolidation).
+        """
+        self._update_indexes(mem, mem.metadata.get("entities"))
+        self.memory_lookup[mem.internal_code] = mem
+        if self.deduplicator is not None:
+            self.deduplicator.add(mem.internal_code, mem.content, scope=mem.role, fingerprint=fingerprint)
+        if in_l3 is None:
+            # An L1-promoted goal still belongs to L3 (and the summary tree) by its home tier
+            in_l3 = MemoryTier.L3_SEMANTIC.value in (mem.tier.value, mem.metadata.get("home_tier"))
+        if in_l3:
+            if mem.tier == MemoryTier.L3_SEMANTIC:
+                self._store_l3_vector(mem)
+            self.l3_semantic.append(mem)
+            self.summary_tree.add_entry(mem)
+        else:
+            self._append_l2(mem)
+        if mem.tier == MemoryTier.L1_FAST_REACTOR:
+            self.l1_cache[mem.content] = mem
+        self.catalog.add(mem)
+        self.bitmaps.add(mem)
+        self.global_turn = max(self.global_turn, mem.metadata.get("creation_turn", 0))
+
+    def _forget(self, mem, delete=False):
+        """
+        Drops a memory from the registry and dedup index once it leaves every tier.
+        `delete` also removes the durable copy (pruning); eviction/consolidation keep it.
+        """
+        content = self.peek_content(mem)   # a spilled memory is dropped without faulting it back in
+        self.memory_lookup.pop(mem.internal_code, None)
+        self.catalog.remove(mem.internal_code)
+        self.bitmaps.remove(mem.internal_code)
+        self._invalidate_results(mem, content)
+        for leaf in self.summary_tree.remove(mem.internal_code):
+            # Archived constituents go with their goal, including their durable copies on pruning
+            self._invalidate_results(leaf)
+            if self.cold is not None:
+                self.cold.forget(leaf)
+            if delete and self.backend is not None:
+                self._pending_writes.pop(leaf.internal_code, None)
+                self._pending_deletes.add(leaf.internal_code)
+        if self.cold is not None:
+            self.cold.forget(mem)
+        if delete and self.l1_cache.get(content) is mem:
+            del self.l1_cache[content]
+        if delete and self.backend is not None:
+            self._pending_writes.pop(mem.internal_code, None)
+            self._pending_deletes.add(mem.internal_code)
+            self.row_cache.invalidate(self.backend.db_id(mem.internal_code))
+        self.vector_index.pop(mem.internal_code, None)
+        self.l3_vectors.remove(mem.internal_code)
+        if self.deduplicator is not None:
+            self.deduplicator.remove(mem.internal_code)
+
+    def _invalidate_results(self, mem, content=None):
+        if self.retrieval_cache is not None:
+            self.retrieval_cache.bump(content if content is not None else self.peek_content(mem))
+
+    def _store_l3_vector(self, mem):
+        """L3 keeps only the compressed code in RAM; the full vector goes to the on-disk store."""
+        embedding = mem.embedding if mem.embedding is not None else self.vector_index.get(mem.internal_code)
+        if embedding is None:
+            return
+        self.l3_vectors.add(mem.internal_code, embedding)
+        self.vector_index.pop(mem.internal_code, None)
+        mem.embedding = None
+
+    def get_embedding(self, code):
+        """Full-precision embedding for any tier."""
+        vec = self.vector_index.get(code)
+        return vec if vec is not None else self.l3_vectors.get(code)
+
+    def vector_search(self, query_vec, top_k=3, allowed=None):
+        """
+        Nearest memories by cosine similarity: exact over L1/L2 vectors,
+        quantized prefilter + exact rescoring over L3. Returns [(Memory, score)].
+        `allowed` (codes) restricts both scans to that subset instead of filtering afterwards.
+        """
+        if allowed is None:
+            hot = self.vector_index.items()
+        else:
+            hot = ((code, self.vector_index[code]) for code in allowed if code in self.vector_index)
+        scored = [(cosine_similarity(query_vec, vec), code) for code, vec in hot]
+        scored += [(score, code) for code, score in self.l3_vectors.search(query_vec, top_k, keys=allowed)]
+        scored.sort(reverse=True)
+        results = []
+        for score, code in scored:
+            mem = self.memory_lookup.get(code)
+            if mem is not None:
+                results.append((mem, score))
+                if len(results) == top_k:
+                    break
+        return results
+
+    def dedup_stats(self):
+        return self.deduplicator.stats() if self.deduplicator is not None else {"enabled": False}
+
     def _update_indexes(self, memory, entities):
         # Keyword Index
         words = memory.content.lower().split()
@@ -166,27 +455,129 @@ class MemGraphCore:
 
         # Entity Index
         if entities:
-            for entity in entities:
-                if entity not in self.entity_index:
-                    self.entity_index[entity] = set()
-                self.entity_index[entity].add(memory.internal_code)
-                memory.metadata['entities'] = entities
+            self._update_indexes_entities(memory, entities)
+
+    def _update_indexes_entities(self, memory, entities):
+        for entity in entities:
+            if entity not in self.entity_index:
+                self.entity_index[entity] = set()
+            self.entity_index[entity].add(memory.internal_code)
+        memory.metadata['entities'] = entities
+
+    def tier_page(self, tier, offset=0, limit=50):
+        """
+        One page of a tier's contents, oldest first, as (memories, total).
+        Only the requested slice is materialized, so inspectors stay cheap on large tiers.
+        """
+        tier = MemoryTier(tier)
+        if tier == MemoryTier.L1_FAST_REACTOR:
+            source = self.l1_cache.values()
+        elif tier == MemoryTier.L2_EPISODIC:
+            source = self.l2_episodic
+        elif tier == MemoryTier.L3_SEMANTIC:
+            return self.l3_semantic[offset:offset + limit], len(self.l3_semantic)
+        else:
+            return [], 0
+        return list(islice(source, offset, offset + limit)), len(source)
+
+    def list_memories(self, tier=None, role=None, entity=None, turn_min=None, turn_max=None, cursor=None, limit=50):
+        """Cursor-paginated, filtered listing of live memories. Returns (memories, next_cursor)."""
+        if tier is not None:
+            tier = MemoryTier(tier).value
+        return self.catalog.query(tier=tier, role=role, entity=entity, turn_min=turn_min,
+                                  turn_max=turn_max, cursor=cursor, limit=limit)
 
     def _promote_to_l1(self, memory):
         """Neural Prompt Caching / Fast-Reactor"""
         # key could be a hash of the content or the semantic meaning
         # For simplicity, using the content string as key mimicking "semantic hash"
+        if memory.tier != MemoryTier.L1_FAST_REACTOR:
+            memory.metadata["home_tier"] = memory.tier.value   # where demotion sends it back
+        if memory.internal_code in self.l3_vectors:
+            # L1 keeps a full-precision vector in RAM; demotion re-compresses it
+            self.vector_index[memory.internal_code] = self.l3_vectors.get(memory.internal_code)
+            self.l3_vectors.remove(memory.internal_code)
         self.l1_cache[memory.content] = memory
         memory.tier = MemoryTier.L1_FAST_REACTOR
+        self.catalog.update(memory)
+        self.bitmaps.add(memory)
+        self._persist(memory)
         print(f"[CACHE] Promoted {memory.internal_code} to L1 Fast-Reactor")
 
-    def retrieve(self, query, top_k=3):
+    def _demote_from_l1(self, memory):
+        if self.l1_cache.get(memory.content) is memory:
+            del self.l1_cache[memory.content]
+        if memory.internal_code not in self.memory_lookup:
+            return  # already left its home tier (evicted/consolidated); L1 was the last reference
+        memory.tier = MemoryTier(memory.metadata.pop("home_tier", MemoryTier.L2_EPISODIC.value))
+        if memory.tier == MemoryTier.L3_SEMANTIC:
+            self._store_l3_vector(memory)
+        self.catalog.update(memory)
+        self.bitmaps.add(memory)
+        self._persist(memory)
+        print(f"[CACHE] Demoted {memory.internal_code} to {memory.tier.value}")
+
+    def run_tier_migration(self):
+        """
+        Applies one TierMigrationPolicy batch: hot memories (by Count-Min access estimate) move
+        into L1, cold or displaced L1 residents go back to their home tier. Returns (promoted, demoted) IDs.
+        """
+        residents = {m.internal_code: m for m in self.l1_cache.values()}
+        promote, demote = self.tier_policy.plan(residents)
+        for code in demote:
+            self._demote_from_l1(residents[code])
+        promote = [code for code in promote if code in self.memory_lookup]
+        for code in promote:
+            self._promote_to_l1(self.memory_lookup[code])
+        if promote or demote:
+            print(f"[TIERING] Promoted {len(promote)}, demoted {len(demote)} (L1 size {len(self.l1_cache)})")
+        return promote, demote
+
+    def warm_up(self, limit=None):
+        """Session warm-up: prefetches the likely working set into L1 (see SessionWarmup). Returns the count."""
+        return self.warmup.run(self, limit)
+
+    def prefetch_rows(self, limit=None):
+        """Remote-retrieval backends: hydrates the durable L1 working set into the row cache."""
+        if self.backend is None or not self.backend.serves_retrieval:
+            return 0
+        fetched = 0
+        try:
+            for record in self.backend.scan_tier(MemoryTier.L1_FAST_REACTOR.value, limit=limit or self.tier_policy.l1_capacity):
+                self._hydrate_row(record)
+                fetched += 1
+        except Exception as e:
+            print(f"[DB Error] Row prefetch failed: {e}")
+        return fetched
+
+    def _record_accesses(self, results):
+        for mem in results:
+            self.tier_policy.record_access(mem.internal_code)
+        if self.tier_policy.tick():
+            self.run_tier_migration()
+
+    def retrieve(self, query, top_k=3, turn_window=None, time_window=None,
+                 role=None, tier=None, entity=None, memory_type=None):
         """
         Retrieves memories using ACAN (Auxiliary Cross-Attention Network) logic simulation.
         1. Check L1 Cache (Exact match or high similarity)
         2. Search L2/L3 using Hybrid Search (Keyword + Vector)
         3. Score results
+        `turn_window` (first, last turn) / `time_window` (since, until epoch seconds) switch to
+        temporal mode: only memories created inside the window are read and scored.
+        `role` / `tier` / `entity` / `memory_type` (a value or a list) switch to filtered mode:
+        the predicate bitmaps pick the candidates first, so only matching memories are scored.
         """
+        allowed = None
+        if role is not None or tier is not None or entity is not None or memory_type is not None:
+            allowed = self.bitmaps.select(role=role, tier=_tier_values(tier), entity=entity, memory_type=memory_type)
+            if not allowed:
+                return []
+        if turn_window is not None or time_window is not None:
+            return self._retrieve_window(query, top_k, turn_window, time_window, allowed=allowed)
+        if allowed is not None:
+            return self._retrieve_filtered(query, top_k, allowed)
+
         results = []
         
         # 1. L1 Fast-Reactor Check
@@ -194,53 +585,53 @@ class MemGraphCore:
             self.neural_cache_hits += 1
             mem = self.l1_cache[query]
             mem.update_access()
+            self._record_accesses([mem])
             return [mem]
 
-        # 2. Vector Similarity check (simulated OR via DB)
-        if self.db:
-            # Supabase Vector Search
+        # 1b. Result Cache: same normalized query, no relevant writes since it was computed
+        if self.retrieval_cache is not None:
+            cached = self.retrieval_cache.get(query, top_k, is_live=self._is_live)
+            if cached is not None:
+                self._touch(cached)
+                return cached
+        started = time.perf_counter()
+
+        # 2. Vector Similarity check (simulated OR via DB); the query is embedded once for both
+        query_vec = self._query_vector(query)
+        remote_hits = {}
+        if self.backend is not None and self.backend.serves_retrieval:
+            # Remote Vector Search (Supabase match_memories RPC), hydrated through the row cache
             try:
-                # Need to use an RPC calling match_memories
-                # Embedding is [float] * 128
-                query_vec = [random.random() for _ in range(128)] # Mock query vector generation (should be real embedding model)
-                
-                response = self.db.rpc("match_memories", {
-                    "query_embedding": query_vec, 
-                    "match_threshold": 0.5, 
-                    "match_count": top_k
-                }).execute()
-                
-                if response.data:
-                    # Convert DB rows back to Memory objects
-                    db_results = []
-                    for row in response.data:
-                        m = Memory(row['content'], metadata=row['metadata'])
-                        m.half_life_score = row.get('similarity', 0.9) # Use similarity as score
-                        m.internal_code = str(row['id']) # Use DB UUID as code
-                        db_results.append(m)
-                    
-                    # Update access stats (in metadata) for retrieved items?
-                    # For performance, maybe skip writing back immediately in hackathon
-                    return db_results
+                for record, similarity in self.backend.vector_top_k(query_vec, top_k):
+                    mem = self._hydrate_row(record)
+                    remote_hits[id(mem)] = (similarity or 0.9, mem)
             except Exception as e:
                 print(f"[DB Error] Retrieval failed: {e}")
                 # Fallback to local logic below...
 
-        # Local Logic (Fallback)
-        candidates = list(self.l2_episodic) + self.l3_semantic
+        # Local Logic (L2 + L3), merged with any remote hits. L3 is reached through the summary
+        # tree: only the best branches are expanded, and archived constituents can surface too.
+        if len(self.summary_tree):
+            l3_candidates = [m for _, m in self.summary_tree.search(query, query_vec, top_k=max(top_k * 4, 8))]
+        else:
+            l3_candidates = self.l3_semantic
+        candidates = list(self.l2_episodic) + l3_candidates
         
-        query_vec = [random.random() for _ in range(128)] # Mock query vector
+        # Remote rows already held locally are scored once, with their real similarity
+        remote_only = [m for _, m in remote_hits.values() if m.internal_code not in self.memory_lookup]
         
+        query_terms = terms(query)
         scored_candidates = []
-        for mem in candidates:
-            # Mock Similarity Score (0.0 to 1.0)
-            sim_score = random.uniform(0.1, 0.9) 
+        for mem in candidates + remote_only:
+            if id(mem) in remote_hits:
+                sim_score = remote_hits[id(mem)][0]
+            else:
+                # Mock Similarity Score (0.0 to 1.0)
+                sim_score = random.uniform(0.1, 0.9) 
             
-            # ACAN: Relevance based on Current Intent (simulated by boosting if keywords match)
-            intent_boost = 1.0
-            for word in query.lower().split():
-                if word in mem.content.lower():
-                    intent_boost += 0.5
+            # ACAN: Relevance based on Current Intent (simulated by boosting if keywords match).
+            # Whole terms, as the result cache invalidates by; scoring must not fault spilled candidates in
+            intent_boost = 1.0 + 0.5 * len(query_terms & terms(self.peek_content(mem)))
             
             # Intelligent Pruning: Weight by Half-Life Score
             final_score = sim_score * intent_boost * mem.half_life_score
@@ -249,12 +640,81 @@ class MemGraphCore:
         # Sort and return top_k
         scored_candidates.sort(key=lambda x: x[0], reverse=True)
         results = [x[1] for x in scored_candidates[:top_k]]
+        if self.retrieval_cache is not None:
+            self.retrieval_cache.put(query, top_k, results, time.perf_counter() - started)
         
-        # Update access for retrieved memories
+        self._touch(results)
+        return results
+
+    def _retrieve_filtered(self, query, top_k, allowed):
+        """
+        Filtered Mode: the vector and keyword scoring run over the allowed slots only, so a
+        selective filter shrinks the work and still fills top_k from matching memories.
+        """
+        codes = self.bitmaps.codes(allowed)
+        if self.embedder is not None:
+            # Real embeddings: restricted nearest-neighbour shortlist, rescored like the main path
+            hits = self.vector_search(self._query_vector(query), max(top_k * 4, 8), allowed=codes)
+            sims = {id(mem): sim for mem, sim in hits}
+            candidates = [mem for mem, _ in hits]
+        else:
+            sims = {}
+            candidates = [self.memory_lookup[code] for code in codes]
+
+        query_terms = terms(query)
+        scored = []
+        for mem in candidates:
+            sim_score = sims[id(mem)] if sims else random.uniform(0.1, 0.9)
+            intent_boost = 1.0 + 0.5 * len(query_terms & terms(self.peek_content(mem)))
+            scored.append((sim_score * intent_boost * mem.half_life_score, mem))
+        scored.sort(key=lambda x: x[0], reverse=True)
+        results = [mem for _, mem in scored[:top_k]]
+        self._touch(results)
+        return results
+
+    def _query_vector(self, query):
+        if self.embedder is not None:
+            return self.embedder([query])[0]
+        return [random.random() for _ in range(128)] # Mock query vector (no embedding model configured)
+
+    def _is_live(self, mem):
+        """True while retrieval may still return `mem`: registered, an archived leaf, or a cached remote row."""
+        code = mem.internal_code
+        if self.memory_lookup.get(code) is mem or self.summary_tree.leaves.get(code) is mem:
+            return True
+        return (self.backend is not None and self.backend.serves_retrieval
+                and self.row_cache.peek(self.backend.db_id(code)) is mem)
+
+    def _touch(self, results):
+        # Update access for retrieved memories (written back with the next batched flush)
         for mem in results:
             mem.update_access()
             mem.metadata["last_access_turn"] = self.global_turn
-            
+            if self._is_live(mem):   # never resurrect a pruned row
+                self._persist(mem)
+        self._record_accesses(results)
+
+    def _retrieve_window(self, query, top_k, turn_window=None, time_window=None, recency_half_life=5, allowed=None):
+        """
+        Temporal Mode: candidates come from the catalog's turn/time indexes, so cost tracks the
+        window size, not total history. Score = keyword intent * half-life * recency, where
+        recency halves every `recency_half_life` turns before the current one.
+        `allowed` (a predicate Bitmap) drops non-matching memories before they are scored.
+        """
+        turn_min, turn_max = turn_window if turn_window is not None else (None, None)
+        since, until = time_window if time_window is not None else (None, None)
+        query_terms = terms(query)
+        scored = []
+        for mem in self.catalog.window(turn_min, turn_max, since, until):
+            if allowed is not None and self.bitmaps.slot_of(mem.internal_code) not in allowed:
+                continue
+            intent_boost = 1.0 + 0.5 * len(query_terms & terms(self.peek_content(mem)))
+            age = max(0, self.global_turn - mem.metadata.get("creation_turn", 0))
+            recency = 0.5 ** (age / recency_half_life)
+            scored.append((intent_boost * mem.half_life_score * recency, mem.metadata.get("creation_turn", 0), mem))
+        scored.sort(key=lambda x: (x[0], x[1]), reverse=True)
+        results = [mem for _, _, mem in scored[:top_k]]
+        self._touch(results)
         return results
 
     def run_pruning_cycle(self):
@@ -268,37 +728,103 @@ class MemGraphCore:
             if mem.half_life_score > 0.2: # Threshold
                 kept_memories.append(mem)
             else:
+                self._forget(mem, delete=True)
                 print(f"[PRUNING] Pruned {mem.internal_code} due to low half-life ({mem.half_life_score:.2f})")
         self.l3_semantic = kept_memories
+        self.enforce_ram_budget()
+
+    def enforce_ram_budget(self):
+        """Spills the coldest L3 entries and archived leaves once their payloads exceed the RAM budget."""
+        if self.cold is None:
+            return 0
+        pinned = {m.internal_code for m in self.l1_cache.values()}
+        return self.cold.enforce(chain(self.l3_semantic, self.summary_tree.leaves.values()), pinned)
 
-    def consolidate_memories(self):
+    def peek_field(self, mem, name):
+        """A memory field's value without faulting a spilled memory back into RAM."""
+        return self.cold.peek(mem, name) if self.cold is not None else getattr(mem, name)
+
+    def peek_content(self, mem):
+        """A memory's text without faulting a spilled memory back into RAM."""
+        return self.peek_field(mem, "content")
+
+    def consolidate_memories(self, force=False):
         """
         Goal-Oriented Chunking (HIAGENT)
-        Move older L2 memories to L3, summarizing them into a "Goal" memory.
+        Move older L2 memories to L3. Pending memories are clustered by topic and every
+        multi-memory cluster is summarized into a "Goal" memory in one batched LLM call.
+        `force` consolidates regardless of the pending-count trigger.
         """
-        if len(self.l2_episodic) >= 5: # Threshold of 5 for demo
-            # Take oldest 3 to chunk
-            chunk_batch = []
-            for _ in range(3):
-                chunk_batch.append(self.l2_episodic.popleft())
-            
-            # Extract content for summarization
-            chunk_texts = [m.content for m in chunk_batch]
-            
-            # HIAGENT: Generate Subgoal/Summary
-            summary_text = llm_client.summarize_intent(chunk_texts)
-            
+        consumed, goals = self.consolidator.run(list(self.l2_episodic), force=force)
+        if not consumed:
+            return []
+
+        consumed_ids = {id(m) for m in consumed}
+        for goal in goals:
+            if goal["summary"] is not None:
+                for m in goal["constituents"]:
+                    self._forget(m)
+        self.l2_episodic = deque((m for m in self.l2_episodic if id(m) not in consumed_ids), maxlen=self.l2_episodic.maxlen)
+
+        created = []
+        for goal in goals:
+            members = goal["constituents"]
+            if goal["summary"] is not None:
+                continue
+            # Singleton: promote as-is, no summary needed
+            mem = members[0]
+            if mem.tier == MemoryTier.L2_EPISODIC:
+                mem.tier = MemoryTier.L3_SEMANTIC
+                self._store_l3_vector(mem)
+                self.catalog.update(mem)
+                self.bitmaps.add(mem)
+            elif mem.tier == MemoryTier.L1_FAST_REACTOR:
+                mem.metadata["home_tier"] = MemoryTier.L3_SEMANTIC.value
+            self.l3_semantic.append(mem)
+            self.summary_tree.add_entry(mem)
+            self._persist(mem)
+
+        for goal in goals:
+            members = goal["constituents"]
+            if goal["summary"] is None:
+                continue
+
             # Create new L3 Memory
-            l3_mem = Memory(summary_text, role="system", metadata={"type": "HIAGENT_Goal", "constituent_codes": [m.internal_code for m in chunk_batch]})
+            l3_mem = Memory(goal["summary"], role="system", embedding=goal["embedding"], metadata={
+                "type": "HIAGENT_Goal",
+                "constituent_codes": [m.internal_code for m in members],
+                "creation_turn": self.global_turn,
+                "last_access_turn": self.global_turn,
+            })
             l3_mem.tier = MemoryTier.L3_SEMANTIC
-            
-            self._update_indexes(l3_mem, entities=[]) # Re-index the new summary
+
+            self._update_indexes(l3_mem, entities=goal["entities"]) # Re-index the new summary
+            self._store_l3_vector(l3_mem)
+            self.memory_lookup[l3_mem.internal_code] = l3_mem
+            self.catalog.add(l3_mem)
+            self.bitmaps.add(l3_mem)
+            self._invalidate_results(l3_mem)
+            self._persist(l3_mem)
             self.l3_semantic.append(l3_mem)
-            print(f"[HIAGENT] Consolidated {len(chunk_batch)} memories into L3 Goal: {l3_mem.internal_code}")
+            self.summary_tree.add_entry(l3_mem, constituents=members)
+            for m in members:
+                # An archived leaf is reached through its goal only, never the L1 fast path
+                if self.l1_cache.get(m.content) is m:
+                    del self.l1_cache[m.content]
+                m.metadata.pop("home_tier", None)
+                # Durable copies move to the archived tier, so a restore reattaches them instead of reviving them in L2
+                m.tier = MemoryTier.L3_ARCHIVED
+                m.metadata["parent_code"] = l3_mem.internal_code
+                self._persist(m)
+            created.append(l3_mem)
+            print(f"[HIAGENT] Consolidated {len(members)} memories into L3 Goal: {l3_mem.internal_code}")
+        self.summary_tree.rollup()
+        return created
 
 # Example Usage
 if __name__ == "__main__":
-    mg = MemGraphCore()
+    from supabase_config import get_supabase_client
+    mg = MemGraphCore(db=get_supabase_client())
     m1 = mg.add_memory("The user's name is Priranshu.", role="user", entities=["Priranshu"])
     m2 = mg.add_memory("I like coding in Python.", role="user", entities=["Python"])
     
@@ -0,0 +1,148 @@
+from bisect import bisect_left, bisect_right, insort
+from itertools import count
+
+
+class MemoryCatalog:
+    """
+    Secondary indexes for listing/querying live memories without scanning the tiers.
+
+    Every memory gets a sort key (creation_turn, seq). One sorted key list is kept for all
+    memories and one per tier, role and entity, so a filtered page is a bisect into the most
+    selective list followed by a short walk: O(log N + page size) for single-filter queries.
+    Cursors are the sort key of the last item returned.
+    A (creation_timestamp, key) list serves wall-clock windows the same way.
+    """
+
+    def __init__(self):
+        self._seq = count()
+        self._all = []
+        self._by_tier = {}
+        self._by_role = {}
+        self._by_entity = {}
+        self._by_time = []
+        self._entries = {}      # code -> (key, tier, role, entities, timestamp)
+        self._by_key = {}       # key -> Memory
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, code):
+        return code in self._entries
+
+    def add(self, mem, key=None):
+        """Indexes `mem` under its current tier/role/entities. Re-adding a code re-indexes it."""
+        if mem.internal_code in self._entries:
+            key = self.remove(mem.internal_code)
+        if key is None:
+            key = (mem.metadata.get("creation_turn", 0), next(self._seq))
+        tier = mem.tier.value
+        entities = tuple(mem.metadata.get("entities") or ())
+        insort(self._all, key)
+        insort(self._by_tier.setdefault(tier, []), key)
+        insort(self._by_role.setdefault(mem.role, []), key)
+        for entity in entities:
+            insort(self._by_entity.setdefault(entity, []), key)
+        ts = mem.creation_timestamp
+        insort(self._by_time, (ts, key))
+        self._entries[mem.internal_code] = (key, tier, mem.role, entities, ts)
+        self._by_key[key] = mem
+        return key
+
+    def update(self, mem):
+        """Re-indexes after a tier move or entity change, keeping the memory's position."""
+        entry = self._entries.get(mem.internal_code)
+        self.add(mem, key=entry[0] if entry else None)
+
+    def remove(self, code):
+        entry = self._entries.pop(code, None)
+        if entry is None:
+            return None
+        key, tier, role, entities, ts = entry
+        self._discard(self._all, key)
+        self._discard(self._by_tier.get(tier), key)
+        self._discard(self._by_role.get(role), key)
+        for entity in entities:
+            self._discard(self._by_entity.get(entity), key)
+        self._discard(self._by_time, (ts, key))
+        self._by_key.pop(key, None)
+        return key
+
+    @staticmethod
+    def _discard(keys, key):
+        if keys:
+            i = bisect_left(keys, key)
+            if i < len(keys) and keys[i] == key:
+                del keys[i]
+
+    @staticmethod
+    def encode_cursor(key):
+        return f"{key[0]}.{key[1]}"
+
+    @staticmethod
+    def decode_cursor(cursor):
+        try:
+            turn, seq = cursor.split(".")
+            return int(turn), int(seq)
+        except (AttributeError, ValueError):
+            raise ValueError(f"Invalid cursor: {cursor!r}")
+
+    def query(self, tier=None, role=None, entity=None, turn_min=None, turn_max=None, cursor=None, limit=50):
+        """
+        Memories matching every given filter, ordered by (creation_turn, insertion order).
+        Returns (memories, next_cursor); next_cursor is None on the last page.
+        """
+        filters = []
+        for value, index, slot in ((tier, self._by_tier, 1), (role, self._by_role, 2), (entity, self._by_entity, 3)):
+            if value is not None:
+                filters.append((index.get(value, []), slot, value))
+        # Walk the smallest candidate list; the other filters are checked per entry
+        keys = min((f[0] for f in filters), key=len) if filters else self._all
+
+        start = 0
+        if turn_min is not None:
+            start = bisect_left(keys, (turn_min,))
+        if cursor is not None:
+            start = max(start, bisect_right(keys, self.decode_cursor(cursor)))
+
+        page = []
+        for i in range(start, len(keys)):
+            key = keys[i]
+            if turn_max is not None and key[0] > turn_max:
+                break
+            entry = self._entries[self._by_key[key].internal_code]
+            if not all(value in entry[slot] if slot == 3 else entry[slot] == value for _, slot, value in filters):
+                continue
+            if len(page) == limit:
+                # One more match exists, so there is a next page
+                return [self._by_key[k] for k in page], self.encode_cursor(page[-1])
+            page.append(key)
+        return [self._by_key[k] for k in page], None
+
+    def window(self, turn_min=None, turn_max=None, since=None, until=None):
+        """
+        Yields memories created inside a turn range and/or wall-clock range (inclusive),
+        walking only the entries inside the window.
+        """
+        if since is not None or until is not None:
+            start = bisect_left(self._by_time, (since,)) if since is not None else 0
+            for i in range(start, len(self._by_time)):
+                ts, key = self._by_time[i]
+                if until is not None and ts > until:
+                    break
+                if (turn_min is None or key[0] >= turn_min) and (turn_max is None or key[0] <= turn_max):
+                    yield self._by_key[key]
+            return
+        start = bisect_left(self._all, (turn_min,)) if turn_min is not None else 0
+        for i in range(start, len(self._all)):
+            key = self._all[i]
+            if turn_max is not None and key[0] > turn_max:
+                break
+            yield self._by_key[key]
+
+    def stats(self):
+        return {
+            "indexed": len(self._entries),
+            "tiers": {t: len(keys) for t, keys in self._by_tier.items() if keys},
+            "roles": {r: len(keys) for r, keys in self._by_role.items() if keys},
+            "entities": sum(1 for keys in self._by_entity.values() if keys),
+        }
@@ -0,0 +1,124 @@
+-- Migration 001: ANN index, tenant/tier filters and server-side hybrid scoring.
+-- Run after setup_supabase.sql. Safe to re-run.
+
+-- Columns the client previously kept only inside metadata
+alter table memgraph_memories add column if not exists tenant_id text not null default 'default';
+alter table memgraph_memories add column if not exists half_life_score real not null default 1.0;
+alter table memgraph_memories add column if not exists last_access_at timestamptz not null default now();
+
+-- Approximate nearest neighbour index (cosine). HNSW needs no training data, unlike IVFFlat.
+create index if not exists memgraph_memories_embedding_hnsw
+  on memgraph_memories using hnsw (embedding vector_cosine_ops)
+  with (m = 16, ef_construction = 64);
+
+-- B-tree indexes for filtered scans and tier listings
+create index if not exists memgraph_memories_tenant_tier on memgraph_memories (tenant_id, tier);
+create index if not exists memgraph_memories_tier_created on memgraph_memories (tier, created_at);
+
+-- The old function filtered on similarity before ordering, which hides the
+-- ORDER BY distance LIMIT k shape the ANN index needs. Take the k nearest first,
+-- then apply the threshold.
+create or replace function match_memories (
+  query_embedding vector(128),
+  match_threshold float,
+  match_count int
+)
+returns table (
+  id uuid,
+  content text,
+  tier text,
+  metadata jsonb,
+  similarity float
+)
+language sql stable
+as $$
+  select nearest.id, nearest.content, nearest.tier, nearest.metadata, nearest.similarity
+  from (
+    select m.id, m.content, m.tier, m.metadata, 1 - (m.embedding <=> query_embedding) as similarity
+    from memgraph_memories m
+    order by m.embedding <=> query_embedding
+    limit match_count
+  ) nearest
+  where nearest.similarity > match_threshold
+  order by nearest.similarity desc;
+$$;
+
+-- Tenant/tier filtered search with half-life weighting done in the database:
+--   score = similarity * half_life_score * 0.5 ^ (hours since last access / half_life_hours)
+-- The index supplies match_count * candidate_multiplier nearest candidates; only those are rescored.
+-- HNSW applies the tenant/tier filter after the graph walk, so a selective filter can leave fewer
+-- than match_count candidates. pgvector >= 0.8 keeps walking (hnsw.iterative_scan); on older
+-- versions, or if the walk still comes up short, the candidates are taken by an exact filtered scan.
+create or replace function match_memories_v2 (
+  query_embedding vector(128),
+  match_count int,
+  filter_tenant text default 'default',
+  filter_tiers text[] default null,
+  match_threshold float default 0.0,
+  half_life_hours float default 24,
+  candidate_multiplier int default 4
+)
+returns table (
+  id uuid,
+  content text,
+  tier text,
+  metadata jsonb,
+  created_at timestamptz,
+  similarity float,
+  score float
+)
+language plpgsql stable
+set hnsw.ef_search = 100
+as $$
+#variable_conflict use_column
+declare
+  previous_scan text;
+  candidate_ids uuid[];
+begin
+  begin
+    previous_scan := current_setting('hnsw.iterative_scan', true);
+    perform set_config('hnsw.iterative_scan', 'relaxed_order', true);
+  exception when others then
+    previous_scan := null;   -- pgvector < 0.8: no iterative scan
+  end;
+
+  select array_agg(c.id) into candidate_ids
+  from (
+    select m.id
+    from memgraph_memories m
+    where m.tenant_id = filter_tenant
+      and (filter_tiers is null or m.tier = any(filter_tiers))
+    order by m.embedding <=> query_embedding
+    limit match_count * candidate_multiplier
+  ) c;
+
+  if previous_scan is not null then
+    perform set_config('hnsw.iterative_scan', previous_scan, true);
+  end if;
+
+  if coalesce(array_length(candidate_ids, 1), 0) < match_count then
+    -- Exact fallback: "+ 0" keeps the planner off the HNSW index, so the tenant/tier
+    -- b-tree narrows the rows and every eligible row is ranked.
+    select array_agg(c.id) into candidate_ids
+    from (
+      select m.id
+      from memgraph_memories m
+      where m.tenant_id = filter_tenant
+        and (filter_tiers is null or m.tier = any(filter_tiers))
+      order by (m.embedding <=> query_embedding) + 0
+      limit match_count * candidate_multiplier
+    ) c;
+  end if;
+
+  return query
+    select m.id, m.content, m.tier, m.metadata, m.created_at, s.similarity,
+           s.similarity * m.half_life_score
+             * power(0.5, extract(epoch from (now() - m.last_access_at)) / 3600.0 / half_life_hours) as score
+    from memgraph_memories m
+    cross join lateral (select 1 - (m.embedding <=> query_embedding) as similarity) s
+    where m.id = any(candidate_ids)
+      and s.similarity > match_threshold
+    order by 7 desc
+    limit match_count;
+end;
+$$;
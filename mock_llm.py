@@ -0,0 +1,49 @@
+import math
+import random
+import threading
+
+
+class LatencyModel:
+    """
+    Seeded latency distribution for the mock LLM, so load tests see realistic, repeatable
+    generation delays without a provider. Samples are in seconds.
+
+    Spec strings (milliseconds):
+      "constant:200"
+      "uniform:100:400"
+      "lognormal:200:0.5"          median 200ms, sigma 0.5
+      "bimodal:150:1200:0.05"      150ms normally, 1200ms for 5% of calls (slow tail)
+    """
+
+    KINDS = ("constant", "uniform", "lognormal", "bimodal")
+
+    def __init__(self, kind="constant", params=(0.0,), seed=0):
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown latency distribution '{kind}', expected one of {self.KINDS}")
+        self.kind = kind
+        self.params = tuple(float(p) for p in params)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_spec(cls, spec, seed=0):
+        if not spec:
+            return None
+        kind, *params = spec.split(":")
+        return cls(kind, params or (0.0,), seed=seed)
+
+    def sample(self):
+        p = self.params
+        with self._lock:
+            if self.kind == "constant":
+                ms = p[0]
+            elif self.kind == "uniform":
+                ms = self._rng.uniform(p[0], p[1])
+            elif self.kind == "lognormal":
+                ms = p[0] * math.exp(self._rng.gauss(0.0, p[1] if len(p) > 1 else 0.5))
+            else:
+                ms = p[1] if self._rng.random() < p[2] else p[0]
+        return ms / 1000
+
+    def __repr__(self):
+        return f"LatencyModel({':'.join([self.kind] + [f'{x:g}' for x in self.params])})"
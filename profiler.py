@@ -0,0 +1,317 @@
+import os
+import sys
+import time
+import cProfile
+import pstats
+import threading
+from collections import Counter, deque
+from typing import Optional
+
+# Leaf frames that mean "this thread is parked", not "this thread is burning CPU".
+IDLE_LEAVES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+}
+
+
+def _frame_label(filename, lineno, name):
+    return f"{name} ({os.path.basename(filename)}:{lineno})"
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile (q in [0, 100]) of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * q // 100))
+    return sorted_values[min(len(sorted_values), int(rank)) - 1]
+
+
+class StageTimings:
+    """Rolling per-stage latency samples (e.g. ingest/retrieve/generate of /chat)."""
+
+    def __init__(self, window=10000):
+        self._window = window
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage, seconds):
+        with self._lock:
+            self._samples.setdefault(stage, deque(maxlen=self._window)).append(seconds)
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+
+    def summary(self):
+        with self._lock:
+            snapshot = {stage: sorted(values) for stage, values in self._samples.items()}
+        return {
+            stage: {
+                "count": len(values),
+                "mean_ms": round(sum(values) / len(values) * 1000, 3),
+                "p50_ms": round(percentile(values, 50) * 1000, 3),
+                "p95_ms": round(percentile(values, 95) * 1000, 3),
+                "p99_ms": round(percentile(values, 99) * 1000, 3),
+            }
+            for stage, values in snapshot.items() if values
+        }
+
+
+class RuntimeProfiler:
+    """
+    On-demand profiler for a live process.
+
+    Two modes:
+    - sampling: a background thread snapshots every thread's stack for N seconds.
+    - deterministic: cProfile is switched on for the next N requests seen by ProfilerMiddleware.
+
+    While idle the only cost is the `armed` attribute check done by the middleware.
+    Either mode can be ended early with stop(); a report is built from what was collected.
+    """
+
+    MAX_INTERVAL = 1.0
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.armed = False              # Hot-path flag read by ProfilerMiddleware
+        self.running = False
+        self.mode = None
+        self.last_report = None
+
+        # Sampling state
+        self._sampler = None
+        self._interval = 0.005
+        self._stop = threading.Event()
+
+        # Deterministic state
+        self._cprofile = None
+        self._remaining = 0
+        self._in_flight = 0
+        self._requested = 0
+        self._profiled = 0
+        self._started_at = 0.0
+
+    # --- Sampling Mode ---
+    def start_sampling(self, seconds, interval=0.005, include_idle=False):
+        """Samples all thread stacks every `interval` seconds for `seconds` seconds."""
+        if not 0 < interval <= self.MAX_INTERVAL:
+            raise ValueError(f"interval must be in (0, {self.MAX_INTERVAL}] seconds")
+        with self._lock:
+            if self.running:
+                raise RuntimeError(f"Profiler already running in '{self.mode}' mode")
+            self.running = True
+            self.mode = "sampling"
+            self._interval = interval
+            self._stop.clear()
+
+        self._sampler = threading.Thread(
+            target=self._sample_loop,
+            args=(seconds, interval, include_idle),
+            name="memgraph-profiler",
+            daemon=True,
+        )
+        self._sampler.start()
+        print(f"[PROFILER] Sampling for {seconds}s every {interval * 1000:.1f}ms")
+
+    def wait(self, timeout=None):
+        """Blocks until a running sampling session finishes."""
+        if self._sampler:
+            self._sampler.join(timeout)
+        return self.last_report
+
+    def _sample_loop(self, seconds, interval, include_idle):
+        own_id = threading.get_ident()
+        stacks = Counter()
+        started = time.perf_counter()
+        deadline = started + seconds
+        samples = 0
+        error = None
+
+        try:
+            while time.perf_counter() < deadline and not self._stop.is_set():
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own_id:
+                        continue
+                    stack = []
+                    while frame is not None:
+                        code = frame.f_code
+                        stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                        frame = frame.f_back
+                    if not stack:
+                        continue
+                    leaf = stack[0]
+                    if not include_idle and (os.path.basename(leaf[0]), leaf[2]) in IDLE_LEAVES:
+                        continue
+                    stack.reverse()
+                    stacks[tuple(stack)] += 1
+                samples += 1
+                self._stop.wait(interval)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            print(f"[PROFILER] Sampling failed: {error}")
+        finally:
+            # Always release the profiler and leave a report, even if the loop died
+            elapsed = time.perf_counter() - started
+            report = self._build_sampling_report(stacks, samples, interval, elapsed)
+            report["error"] = error
+            with self._lock:
+                self.last_report = report
+                self.running = False
+        print(f"[PROFILER] Sampling finished: {samples} ticks, {sum(stacks.values())} stacks")
+
+    def _build_sampling_report(self, stacks, samples, interval, elapsed, top=25):
+        cumulative = Counter()
+        own = Counter()
+        collapsed = []
+        for stack, count in stacks.most_common():
+            collapsed.append(";".join(_frame_label(*f) for f in stack) + f" {count}")
+            own[stack[-1]] += count
+            # Count each function once per stack so recursion is not double-counted
+            for func in set(stack):
+                cumulative[func] += count
+
+        top_functions = [
+            {
+                "function": _frame_label(*func),
+                "cumulative_s": round(count * interval, 6),
+                "self_s": round(own[func] * interval, 6),
+                "samples": count,
+            }
+            for func, count in cumulative.most_common(top)
+        ]
+        return {
+            "mode": "sampling",
+            "duration_s": round(elapsed, 3),
+            "interval_ms": interval * 1000,
+            "ticks": samples,
+            "collapsed": "\n".join(collapsed),
+            "top_functions": top_functions,
+        }
+
+    # --- Deterministic Mode ---
+    def start_deterministic(self, requests):
+        """Arms cProfile for the next `requests` requests passing through the middleware."""
+        with self._lock:
+            if self.running:
+                raise RuntimeError(f"Profiler already running in '{self.mode}' mode")
+            self.running = True
+            self.mode = "deterministic"
+            self._cprofile = cProfile.Profile()
+            self._remaining = requests
+            self._requested = requests
+            self._profiled = 0
+            self._in_flight = 0
+            self._started_at = time.perf_counter()
+            self.armed = True
+        print(f"[PROFILER] Deterministic profiling armed for next {requests} requests")
+
+    def request_started(self):
+        """Returns True if this request is being profiled (caller must then call request_finished)."""
+        with self._lock:
+            if not self.armed or self._remaining <= 0:
+                return False
+            self._remaining -= 1
+            if self._remaining == 0:
+                self.armed = False
+            self._profiled += 1
+            self._in_flight += 1
+            if self._in_flight == 1:
+                self._cprofile.enable()
+            return True
+
+    def request_finished(self):
+        with self._lock:
+            self._in_flight -= 1
+            if self._in_flight > 0 or self._remaining > 0:
+                return
+            self._finish_deterministic()
+
+    def _finish_deterministic(self):
+        # Caller holds self._lock
+        self._cprofile.disable()
+        self.last_report = self._build_deterministic_report(self._cprofile)
+        self._cprofile = None
+        self.running = False
+        print(f"[PROFILER] Deterministic profiling finished after {self._profiled} requests")
+
+    def stop(self):
+        """
+        Ends the running session early. Sampling stops at its next tick; deterministic mode stops
+        accepting requests and reports once the in-flight ones finish. Returns False if idle.
+        """
+        with self._lock:
+            if not self.running:
+                return False
+            if self.mode == "sampling":
+                self._stop.set()
+            else:
+                self.armed = False
+                self._remaining = 0
+                if self._in_flight == 0:
+                    self._finish_deterministic()
+        if self.mode == "sampling":
+            self.wait()
+        return True
+
+    def _build_deterministic_report(self, profile, top=25):
+        stats = pstats.Stats(profile)
+        collapsed = []
+        rows = []
+        for func, (cc, nc, tt, ct, callers) in stats.stats.items():
+            label = _frame_label(*func)
+            rows.append((ct, tt, nc, label))
+            if not callers:
+                collapsed.append(f"{label} {int(tt * 1e6)}")
+            # cProfile only knows caller -> callee edges, so stacks are two frames deep
+            for caller, caller_stats in callers.items():
+                own_time = caller_stats[2]
+                if own_time > 0:
+                    collapsed.append(f"{_frame_label(*caller)};{label} {int(own_time * 1e6)}")
+
+        rows.sort(reverse=True)
+        top_functions = [
+            {"function": label, "cumulative_s": round(ct, 6), "self_s": round(tt, 6), "calls": nc}
+            for ct, tt, nc, label in rows[:top]
+        ]
+        return {
+            "mode": "deterministic",
+            "duration_s": round(time.perf_counter() - self._started_at, 3),
+            "requests": self._profiled,
+            "collapsed": "\n".join(collapsed),
+            "top_functions": top_functions,
+        }
+
+    def status(self):
+        return {
+            "running": self.running,
+            "mode": self.mode,
+            "remaining_requests": self._remaining if self.mode == "deterministic" else None,
+            "has_report": self.last_report is not None,
+        }
+
+
+class ProfilerMiddleware:
+    """
+    Plain ASGI middleware so the disabled path is a single attribute check,
+    without the per-request overhead of BaseHTTPMiddleware.
+    """
+
+    def __init__(self, app, profiler: RuntimeProfiler, exclude_prefix: Optional[str] = "/admin"):
+        self.app = app
+        self.profiler = profiler
+        self.exclude_prefix = exclude_prefix
+
+    async def __call__(self, scope, receive, send):
+        if not self.profiler.armed or scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        if self.exclude_prefix and scope.get("path", "").startswith(self.exclude_prefix):
+            return await self.app(scope, receive, send)
+
+        if not self.profiler.request_started():
+            return await self.app(scope, receive, send)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.profiler.request_finished()
@@ -0,0 +1,299 @@
+import os
+import sys
+import heapq
+import random
+import tempfile
+import threading
+from array import array
+from itertools import islice
+from vector_ops import cosine_similarity
+
+QUANT_MODES = ("float32", "int8", "binary")
+
+
+class FullPrecisionStore:
+    """
+    Append-only on-disk float32 vector file. Only an offset per key stays in RAM;
+    vectors are read back (one seek each) when candidates need exact rescoring.
+    Deletes and re-puts leave dead records behind; once they pass `compact_ratio` of the file
+    (and `min_compact_bytes`), the live records are rewritten into a fresh file.
+    """
+
+    def __init__(self, path=None, dim=128, compact_ratio=0.5, min_compact_bytes=1 << 20):
+        self.path = path
+        self.dim = dim
+        self._record_bytes = dim * 4
+        self._offsets = {}
+        self._lock = threading.Lock()
+        self._fh = None
+        self._is_temp = path is None
+        self.compact_ratio = compact_ratio
+        self.min_compact_bytes = min_compact_bytes
+        self.dead_bytes = 0
+        self.compactions = 0
+
+    def _open(self):
+        # The file is created on first write so idle indexes cost nothing on disk
+        if self._fh is None:
+            if self.path is None:
+                fd, self.path = tempfile.mkstemp(prefix="memgraph_vectors_", suffix=".f32")
+                os.close(fd)
+            self._fh = open(self.path, "a+b")
+        return self._fh
+
+    def put(self, key, vector):
+        if len(vector) != self.dim:
+            raise ValueError(f"Vector has {len(vector)} dims, store holds {self.dim}")
+        data = array("f", vector).tobytes()
+        with self._lock:
+            self._open()
+            self._fh.seek(0, os.SEEK_END)
+            if key in self._offsets:
+                self.dead_bytes += self._record_bytes
+            self._offsets[key] = self._fh.tell()
+            self._fh.write(data)
+            self._maybe_compact()
+
+    def get(self, key):
+        with self._lock:
+            # Offset read under the lock: a concurrent compaction rebases every offset
+            offset = self._offsets.get(key)
+            if offset is None:
+                return None
+            self._fh.flush()
+            self._fh.seek(offset)
+            raw = self._fh.read(self._record_bytes)
+        vec = array("f")
+        vec.frombytes(raw)
+        return vec.tolist()
+
+    def attach(self, keys):
+        """Re-opens an existing file whose records belong to `keys`, in file order."""
+        self._open()
+        self._offsets = {key: i * self._record_bytes for i, key in enumerate(keys)}
+        self.dead_bytes = 0
+
+    def sync(self):
+        """Flushes appended vectors to disk."""
+        with self._lock:
+            if self._fh is not None:
+                self._fh.flush()
+                os.fsync(self._fh.fileno())
+
+    def delete(self, key):
+        # Only the offset is dropped here; the record's space is reclaimed by compaction
+        with self._lock:
+            if self._offsets.pop(key, None) is not None:
+                self.dead_bytes += self._record_bytes
+                self._maybe_compact()
+
+    def file_bytes(self):
+        return (len(self._offsets) * self._record_bytes) + self.dead_bytes
+
+    def _maybe_compact(self):
+        if self.dead_bytes >= self.min_compact_bytes and self.dead_bytes >= self.compact_ratio * self.file_bytes():
+            self._compact()
+
+    def _compact(self):
+        """Rewrites the live records, in file order, into a new file that replaces the old one (lock held)."""
+        tmp = f"{self.path}.compact"
+        offsets = {}
+        self._fh.flush()
+        with open(tmp, "wb") as out:
+            for key, offset in sorted(self._offsets.items(), key=lambda item: item[1]):
+                self._fh.seek(offset)
+                offsets[key] = out.tell()
+                out.write(self._fh.read(self._record_bytes))
+        self._fh.close()
+        os.replace(tmp, self.path)
+        self._fh = open(self.path, "a+b")
+        reclaimed, self.dead_bytes = self.dead_bytes, 0
+        self._offsets = offsets
+        self.compactions += 1
+        print(f"[VECTORS] Compacted {self.path}: reclaimed {reclaimed:,} bytes, {len(offsets)} live vectors")
+
+    def __contains__(self, key):
+        return key in self._offsets
+
+    def close(self):
+        """Closes the file; temp files created by the store are deleted."""
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+            if self._is_temp:
+                os.remove(self.path)
+
+
+def quantize_int8(vector):
+    """Per-vector affine int8 code: x ~= lo + (q + 128) * step."""
+    lo, hi = min(vector), max(vector)
+    step = (hi - lo) / 255 or 1.0
+    inv = 1.0 / step
+    # x - lo >= 0, so int(... + 0.5) rounds to nearest without the round() call
+    codes = array("b", [int((x - lo) * inv + 0.5) - 128 for x in vector])
+    return codes, lo, step
+
+
+def dequantize_int8(codes, lo, step):
+    return [lo + (q + 128) * step for q in codes]
+
+
+def quantize_binary(vector):
+    """1 bit per dimension: set where the component is above the vector's mean (centres non-negative embeddings)."""
+    mean = sum(vector) / len(vector)
+    bits = 0
+    for i, x in enumerate(vector):
+        if x > mean:
+            bits |= 1 << i
+    return bits
+
+
+class QuantizedVectorIndex:
+    """
+    Compressed vector index with exact rescoring.
+
+    mode="float32": vectors kept in RAM as packed float32 arrays (4 B/dim).
+    mode="int8":    1 B/dim + 2 floats per vector; approximate cosine over dequantized codes.
+    mode="binary":  1 bit/dim; Hamming distance prefilter.
+    In the compressed modes full-precision vectors live in a FullPrecisionStore on disk and the best
+    `top_k * rescore_factor` approximate candidates are rescored exactly.
+    """
+
+    DEFAULT_RESCORE_FACTOR = {"float32": 1, "int8": 4, "binary": 16}
+
+    def __init__(self, mode="int8", dim=128, store_path=None, rescore_factor=None):
+        if mode not in QUANT_MODES:
+            raise ValueError(f"Unknown quantization mode '{mode}', expected one of {QUANT_MODES}")
+        self.mode = mode
+        self.dim = dim
+        self.rescore_factor = rescore_factor or self.DEFAULT_RESCORE_FACTOR[mode]
+        self._codes = {}
+        self.full_store = FullPrecisionStore(store_path, dim) if mode != "float32" else None
+
+    def add(self, key, vector):
+        if len(vector) != self.dim:
+            raise ValueError(f"Vector has {len(vector)} dims, index holds {self.dim}")
+        if self.mode == "float32":
+            self._codes[key] = array("f", vector)
+        elif self.mode == "int8":
+            self._codes[key] = quantize_int8(vector)
+            self.full_store.put(key, vector)
+        else:
+            self._codes[key] = quantize_binary(vector)
+            self.full_store.put(key, vector)
+
+    def remove(self, key):
+        self._codes.pop(key, None)
+        if self.full_store:
+            self.full_store.delete(key)
+
+    def get(self, key):
+        """Full-precision vector for `key` (from RAM or disk)."""
+        if key not in self._codes:
+            return None
+        if self.mode == "float32":
+            return self._codes[key].tolist()
+        return self.full_store.get(key)
+
+    def __contains__(self, key):
+        return key in self._codes
+
+    def __len__(self):
+        return len(self._codes)
+
+    def keys(self):
+        return self._codes.keys()
+
+    def _approx_scores(self, query, keys):
+        if self.mode == "float32":
+            return ((cosine_similarity(query, self._codes[k]), k) for k in keys)
+        if self.mode == "int8":
+            return ((cosine_similarity(query, dequantize_int8(*self._codes[k])), k) for k in keys)
+        q_bits = quantize_binary(query)
+        # Fewer differing bits = closer; negate so larger is better like the other modes
+        return ((-(q_bits ^ self._codes[k]).bit_count(), k) for k in keys)
+
+    def search(self, query, top_k=3, keys=None, rescore=True):
+        """Returns [(key, cosine_score)] best first. `keys` restricts the search to a subset."""
+        pool = self._codes.keys() if keys is None else [k for k in keys if k in self._codes]
+        if self.mode == "float32":
+            return [(k, s) for s, k in heapq.nlargest(top_k, self._approx_scores(query, pool))]
+
+        shortlist = heapq.nlargest(top_k * self.rescore_factor, self._approx_scores(query, pool))
+        if not rescore:
+            return [(k, s) for s, k in shortlist[:top_k]]
+        exact = ((cosine_similarity(query, self.full_store.get(k)), k) for _, k in shortlist)
+        return [(k, s) for s, k in heapq.nlargest(top_k, exact)]
+
+    def bytes_per_vector(self, sample=256):
+        """
+        Mean RAM per stored code, measured with sys.getsizeof like python_list_bytes, so the two
+        compare like for like (object headers included). 0 while the index is empty.
+        """
+        codes = list(islice(self._codes.values(), sample))
+        if not codes:
+            return 0
+        return sum(_code_bytes(c) for c in codes) // len(codes)
+
+    def close(self):
+        if self.full_store:
+            self.full_store.close()
+
+    def memory_report(self):
+        return {
+            "mode": self.mode,
+            "vectors": len(self),
+            "bytes_per_vector": self.bytes_per_vector(),
+            "resident_bytes": self.bytes_per_vector() * len(self),
+            "disk_bytes": self.full_store.file_bytes() if self.full_store else 0,
+            "dead_disk_bytes": self.full_store.dead_bytes if self.full_store else 0,
+            "compactions": self.full_store.compactions if self.full_store else 0,
+        }
+
+
+def _code_bytes(code):
+    if isinstance(code, tuple):   # int8: (codes, lo, step)
+        return sys.getsizeof(code) + sum(sys.getsizeof(x) for x in code)
+    return sys.getsizeof(code)
+
+
+def python_list_bytes(vector):
+    """RAM used by a list-of-floats embedding (the pre-quantization representation)."""
+    return sys.getsizeof(vector) + sum(sys.getsizeof(x) for x in vector)
+
+
+def evaluate_recall(vectors, queries, top_k=10, rescore_factor=None):
+    """
+    Recall@k of each mode against exact float search, plus bytes per vector.
+    `vectors` is {key: vector}; returns {mode: {...}}.
+    """
+    dim = len(next(iter(vectors.values())))
+    exact = {}
+    for qi, q in enumerate(queries):
+        scored = heapq.nlargest(top_k, ((cosine_similarity(q, v), k) for k, v in vectors.items()))
+        exact[qi] = {k for _, k in scored}
+
+    list_bytes = python_list_bytes(next(iter(vectors.values())))
+    report = {"python_list": {"bytes_per_vector": list_bytes, "recall_at_k": 1.0, "compression": 1.0}}
+    for mode in QUANT_MODES:
+        index = QuantizedVectorIndex(mode, dim=dim, rescore_factor=rescore_factor)
+        for k, v in vectors.items():
+            index.add(k, v)
+        hits = 0
+        for qi, q in enumerate(queries):
+            hits += len(exact[qi] & {k for k, _ in index.search(q, top_k)})
+        report[mode] = {
+            "bytes_per_vector": index.bytes_per_vector(),
+            "recall_at_k": round(hits / (top_k * len(queries)), 4),
+            "compression": round(list_bytes / index.bytes_per_vector(), 1),
+        }
+        index.close()
+    return report
+
+
+if __name__ == "__main__":
+    random.seed(7)
+    data = {f"MEM_{i:05d}": [random.random() for _ in range(128)] for i in range(2000)}
+    qs = [[random.random() for _ in range(128)] for _ in range(20)]
+    for mode, row in evaluate_recall(data, qs, top_k=10).items():
+        print(f"{mode:12s} {row['bytes_per_vector']:6d} B/vec  recall@10={row['recall_at_k']:.3f}  {row['compression']}x smaller than list")
@@ -0,0 +1,310 @@
+"""
+Online re-embedding: rebuilds every vector with a new embedding function while the engine keeps serving.
+
+    job = ReindexJob(mg, functools.partial(hashed_embedding, dim=256), "hashed-256", dim=256,
+                     embedder="hashed", checkpoint_dir="reindex_checkpoint")
+    job.build()     # heavy part; safe on a background thread, embeddings run on a process pool
+    job.swap()      # on the thread that owns the engine: one short, atomic switch
+    for _ in job.persist(): pass
+
+build() embeds a snapshot of (id, text) pairs in batches and appends the results to a shadow
+full-precision vector file. With a `checkpoint_dir`, that file plus an id list and state.json
+are the checkpoint: an interrupted build resumes after the last completed batch, provided
+`model_id` and `dim` match. swap() embeds whatever was written after the snapshot, builds the
+new L1/L2 and L3 indexes from the shadow and replaces the live ones in one step. persist() rewrites
+every backend row (including ones the engine no longer holds) and records the model, so a restarted
+engine restores with the same embedder and dimension.
+Note: the Supabase schema pins vector(128); persisting other dimensions needs a column change first.
+"""
+import os
+import re
+import json
+import math
+import time
+import zlib
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from quantized_index import FullPrecisionStore, QuantizedVectorIndex
+from memgraph_core import MemoryTier
+
+_WORD_RE = re.compile(r"\w+")
+STATE, CODES, VECTORS = "state.json", "codes.txt", "vectors.f32"
+
+
+def hashed_embedding(texts, dim=128):
+    """Deterministic feature-hashing embedding: signed word buckets, L2-normalized."""
+    out = []
+    for text in texts:
+        vec = [0.0] * dim
+        for word in _WORD_RE.findall(text.lower()):
+            h = zlib.crc32(word.encode())
+            vec[h % dim] += 1.0 if (h >> 16) & 1 else -1.0
+        n = math.sqrt(sum(v * v for v in vec)) or 1.0
+        out.append([v / n for v in vec])
+    return out
+
+
+def _live_memories(mg):
+    """Every memory that owns a vector: registry, L1 residents that left their tier, archived summary-tree leaves."""
+    live = dict(mg.memory_lookup)
+    for mem in mg.l1_cache.values():
+        live.setdefault(mem.internal_code, mem)
+    for code, mem in mg.summary_tree.leaves.items():
+        live.setdefault(code, mem)
+    return live
+
+
+class ReindexJob:
+    def __init__(self, mg, embed_fn, model_id, dim=128, batch_size=256, workers=None, checkpoint_dir=None,
+                 embedder=None):
+        """
+        `embed_fn(texts) -> vectors` must be picklable (a module-level function or functools.partial)
+        when `workers` > 0; `workers=0` embeds inline on the build thread. `embedder` is embed_fn's
+        name in EMBEDDERS; without it a restarted engine cannot rebuild embed_fn by itself.
+        """
+        self.mg = mg
+        self.embed_fn = embed_fn
+        self.model_id = model_id
+        self.embedder = embedder
+        self.dim = dim
+        self.batch_size = batch_size
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.checkpoint_dir = checkpoint_dir
+        # Taken now, on the engine's thread; build() never touches live engine state
+        self._items = [(code, mg.peek_content(mem)) for code, mem in _live_memories(mg).items()]
+        self._codes_fh = None
+        self._cancel = threading.Event()
+        self.shadow = None
+        self.state = "pending"
+        self.done = 0
+        self.resumed = 0
+        self.swapped_at = None
+        self.error = None
+        self.elapsed = 0.0
+
+    # --- Checkpoint ---
+    def _open_shadow(self):
+        if self.checkpoint_dir is None:
+            self.shadow = FullPrecisionStore(None, self.dim)
+            return []
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        state_path = os.path.join(self.checkpoint_dir, STATE)
+        codes_path = os.path.join(self.checkpoint_dir, CODES)
+        vec_path = os.path.join(self.checkpoint_dir, VECTORS)
+        done_codes = []
+        if os.path.exists(state_path):
+            with open(state_path) as fh:
+                state = json.load(fh)
+            if state.get("model_id") == self.model_id and state.get("dim") == self.dim:
+                with open(codes_path) as fh:
+                    done_codes = fh.read().split("\n")[:state["done"]]
+        # Drop anything written after the last recorded batch (a torn tail)
+        with open(codes_path, "a+") as fh:
+            fh.truncate(sum(len(c) + 1 for c in done_codes))
+        with open(vec_path, "a+b") as fh:
+            fh.truncate(len(done_codes) * self.dim * 4)
+        self.shadow = FullPrecisionStore(vec_path, self.dim)
+        self.shadow.attach(done_codes)
+        self._codes_fh = open(codes_path, "a")
+        return done_codes
+
+    def _checkpoint(self):
+        if self.checkpoint_dir is None:
+            return
+        self.shadow.sync()
+        self._codes_fh.flush()
+        os.fsync(self._codes_fh.fileno())
+        tmp = os.path.join(self.checkpoint_dir, STATE + ".tmp")
+        with open(tmp, "w") as fh:
+            json.dump({"model_id": self.model_id, "dim": self.dim, "done": self.done}, fh)
+        os.replace(tmp, os.path.join(self.checkpoint_dir, STATE))
+
+    def _store(self, codes, vectors):
+        for code, vec in zip(codes, vectors):
+            if len(vec) != self.dim:
+                raise ValueError(f"Embedding has {len(vec)} dims, expected {self.dim}")
+            self.shadow.put(code, vec)
+            if self._codes_fh is not None:
+                self._codes_fh.write(code + "\n")
+        self.done += len(codes)
+        self._checkpoint()
+
+    # --- Phases ---
+    def build(self):
+        """Embeds the snapshot into the shadow store. Returns False if cancelled (the checkpoint stays)."""
+        start = time.perf_counter()
+        self.state = "building"
+        try:
+            done_codes = set(self._open_shadow())
+            self.done = self.resumed = len(done_codes)
+            todo = [(c, t) for c, t in self._items if c not in done_codes]
+            batches = [todo[i:i + self.batch_size] for i in range(0, len(todo), self.batch_size)]
+            print(f"[REINDEX] {self.model_id}: {len(todo)} to embed in {len(batches)} batches ({self.resumed} resumed)")
+            if self.workers:
+                with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                    pending = {}
+                    while batches or pending:
+                        while batches and len(pending) < 2 * self.workers and not self._cancel.is_set():
+                            batch = batches.pop(0)
+                            pending[pool.submit(self.embed_fn, [t for _, t in batch])] = batch
+                        if not pending:
+                            break
+                        finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in finished:
+                            self._store([c for c, _ in pending.pop(future)], future.result())
+            else:
+                for batch in batches:
+                    if self._cancel.is_set():
+                        break
+                    self._store([c for c, _ in batch], self.embed_fn([t for _, t in batch]))
+        except Exception as e:
+            self.state, self.error = "failed", str(e)
+            self.shadow.close()
+            raise
+        finally:
+            self.elapsed += time.perf_counter() - start
+            if self._codes_fh is not None:
+                self._codes_fh.close()
+                self._codes_fh = None
+        if self._cancel.is_set():
+            self.state = "cancelled"
+            self.shadow.close()
+            return False
+        self.state = "built"
+        return True
+
+    def cancel(self):
+        self._cancel.set()
+
+    def swap(self):
+        """
+        Switches the engine to the new vectors. Must run where no other engine call is in progress
+        (the server's event loop thread). Memories written since the snapshot are embedded here.
+        """
+        if self.state != "built":
+            raise RuntimeError(f"Reindex job is {self.state}, not built")
+        mg = self.mg
+        live = _live_memories(mg)
+        missing = [m for code, m in live.items() if code not in self.shadow]
+        for i in range(0, len(missing), self.batch_size):
+            batch = missing[i:i + self.batch_size]
+            for mem, vec in zip(batch, self.embed_fn([m.content for m in batch])):
+                self.shadow.put(mem.internal_code, vec)
+
+        old_l3 = mg.l3_vectors
+        old_store = old_l3.full_store
+        store_path = f"{old_store.path}.{self.model_id}" if old_store is not None and not old_store._is_temp else None
+        vector_index = {}
+        l3_vectors = QuantizedVectorIndex(mode=old_l3.mode, dim=self.dim, store_path=store_path,
+                                          rescore_factor=old_l3.rescore_factor)
+        for code, mem in live.items():
+            vec = self.shadow.get(code)
+            if code in old_l3:
+                l3_vectors.add(code, vec)           # L3 residency is unchanged, only the vector
+            elif code in mg.vector_index:
+                vector_index[code] = vec
+                mem.embedding = vec
+            else:
+                mem.embedding = vec                 # archived leaf
+        mg.vector_index, mg.l3_vectors = vector_index, l3_vectors
+        mg.embedder = self.embed_fn
+        mg.embedding_model = {"model_id": self.model_id, "embedder": self.embedder, "dim": self.dim}
+        mg.summary_tree.refresh_vectors()
+        if mg.retrieval_cache is not None:
+            mg.retrieval_cache.clear()
+        old_l3.close()
+        self.shadow.close()
+        self.swapped_at = time.time()
+        self.state = "swapped"
+        print(f"[REINDEX] Swapped to {self.model_id} ({len(live)} vectors, {len(missing)} embedded at swap)")
+        if self.checkpoint_dir is not None:
+            for name in (STATE, CODES, VECTORS):
+                path = os.path.join(self.checkpoint_dir, name)
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def persist(self, chunk_size=512):
+        """
+        Rewrites every backend row with the new vectors, one chunk per iteration (yield between chunks):
+        the engine's memories (registry, L1 residents, archived leaves) first, then rows it no longer
+        holds (evicted from L2), which are re-embedded from their stored text. The model is recorded last.
+        State is "persisting" until the last row is written, then "done".
+        """
+        mg = self.mg
+        if mg.backend is None:
+            self.state = "done"
+            return
+        self.state = "persisting"
+        live = _live_memories(mg)
+        memories = list(live.values())
+        written = 0
+        for i in range(0, len(memories), chunk_size):
+            for mem in memories[i:i + chunk_size]:
+                mg._persist(mem)
+            written += len(memories[i:i + chunk_size])
+            yield written
+        mg.flush_writes()
+
+        for tier in MemoryTier:
+            stale = [r for r in mg.backend.scan_tier(tier.value) if r["id"] not in live]
+            for i in range(0, len(stale), chunk_size):
+                batch = stale[i:i + chunk_size]
+                for record, vec in zip(batch, self.embed_fn([r["content"] for r in batch])):
+                    record["embedding"] = vec
+                mg.backend.insert_batch(batch)
+                written += len(batch)
+                yield written
+        # This job's model, not mg.embedding_model: the rows above were written with self.embed_fn
+        mg.backend.put_setting("embedding_model", {"model_id": self.model_id, "embedder": self.embedder, "dim": self.dim})
+        self.state = "done"
+        print(f"[REINDEX] Persisted {written} rows with {self.model_id}")
+
+    def run(self):
+        """build + swap + persist, for offline use."""
+        if self.build():
+            self.swap()
+            for _ in self.persist():
+                pass
+        return self.progress()
+
+    def progress(self):
+        total = len(self._items)
+        return {
+            "model_id": self.model_id,
+            "dim": self.dim,
+            "state": self.state,
+            "done": self.done,
+            "total": total,
+            "resumed": self.resumed,
+            "percent": round(100.0 * self.done / total, 1) if total else 100.0,
+            "elapsed_s": round(self.elapsed, 3),
+            "error": self.error,
+        }
+
+
+EMBEDDERS = {"hashed": hashed_embedding}
+
+
+if __name__ == "__main__":
+    import argparse
+    import functools
+    from memgraph_core import MemGraphCore
+    from storage import create_backend
+
+    parser = argparse.ArgumentParser(description="Re-embed every stored memory with a new embedding function.")
+    parser.add_argument("--model", default="hashed", choices=sorted(EMBEDDERS))
+    parser.add_argument("--dim", type=int, default=128)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--checkpoint", default="reindex_checkpoint", help="Checkpoint directory (resumes if present)")
+    parser.add_argument("--storage", default=None, help="Backend spec (default: $MEMGRAPH_STORAGE)")
+    args = parser.parse_args()
+
+    engine = MemGraphCore(backend=create_backend(args.storage))
+    engine.restore_from_backend()
+    job = ReindexJob(engine, functools.partial(EMBEDDERS[args.model], dim=args.dim), f"{args.model}-{args.dim}",
+                     dim=args.dim, batch_size=args.batch_size, workers=args.workers, checkpoint_dir=args.checkpoint,
+                     embedder=args.model)
+    print(job.run())
+    if engine.backend is not None:
+        engine.backend.close()
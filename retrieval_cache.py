@@ -0,0 +1,95 @@
+import re
+import time
+import zlib
+from array import array
+from cache import LRUCache
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def terms(text):
+    """Lower-cased \\w+ terms: the unit of both the keyword intent boost and shard invalidation."""
+    return set(_WORD_RE.findall(text.lower()))
+
+
+def normalize_query(query):
+    """Case, punctuation and whitespace insensitive form used as the cache key."""
+    return " ".join(_WORD_RE.findall(query.lower()))
+
+
+class RetrievalCache:
+    """
+    Caches retrieve() results by (normalized query, top_k), validated by shard generations.
+
+    The term space is hashed into `shards` buckets, each with a generation counter. Writers bump
+    the shards of the terms of every memory they add, remove or move; an entry remembers the
+    generations of its query's shards when it was computed and is served only while all of them
+    are unchanged. The keyword boost counts whole shared `terms`, so a memory with no term in common
+    with the query cannot change its boost,
+    so unrelated ingestion leaves the entry valid and nothing is flushed globally. Score drift from
+    gradual half-life decay is not tracked; `ttl` bounds how long an entry can be reused.
+    Removal is not term-scoped: a cached memory may share no term with the query, so `get` also
+    drops any entry holding a memory the `is_live` check rejects (pruned since it was cached).
+    """
+
+    def __init__(self, capacity=1024, shards=256, ttl=60.0, clock=time.monotonic):
+        self.shards = shards
+        self.ttl = ttl
+        self._clock = clock
+        self._generations = array("Q", bytes(8 * shards))
+        self._entries = LRUCache(capacity)
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.saved_seconds = 0.0
+
+    def _shards_of(self, text):
+        return sorted({zlib.crc32(word.encode()) % self.shards for word in terms(text)})
+
+    def bump(self, text):
+        """Invalidates cached results whose query shares a term shard with `text`."""
+        for shard in self._shards_of(text):
+            self._generations[shard] += 1
+
+    def get(self, query, top_k, is_live=None):
+        key = (normalize_query(query), top_k)
+        entry = self._entries.peek(key)
+        if entry is not None:
+            results, shards, generations, cost, stored_at = entry
+            if self._clock() - stored_at <= self.ttl and all(
+                    self._generations[s] == g for s, g in zip(shards, generations)) and (
+                    is_live is None or all(is_live(m) for m in results)):
+                self._entries.get(key)   # refresh recency
+                self.hits += 1
+                self.saved_seconds += cost
+                return list(results)
+            self._entries.invalidate(key)
+            self.stale += 1
+        self.misses += 1
+        return None
+
+    def put(self, query, top_k, results, cost):
+        """Stores `results` computed in `cost` seconds under the current shard generations."""
+        shards = self._shards_of(query)
+        generations = [self._generations[s] for s in shards]
+        self._entries.put((normalize_query(query), top_k), (list(results), shards, generations, cost, self._clock()))
+
+    def clear(self):
+        self._entries.clear()
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale_skipped": self.stale,
+            "hit_rate": round(self.hit_rate, 4),
+            "latency_saved_ms": round(self.saved_seconds * 1000, 3),
+        }
@@ -0,0 +1,58 @@
+"""
+Wire encodings for the API, picked per request from the Accept / Content-Type headers.
+
+  application/msgpack  binary, smallest payloads (needs the optional `msgpack` package)
+  application/json     orjson when installed, stdlib json otherwise
+
+Both optional packages are imported here once; callers never need to check for them.
+"""
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+_MSGPACK_TYPES = (MSGPACK, "application/x-msgpack")
+
+
+def is_msgpack(media_type):
+    return bool(media_type) and any(t in media_type for t in _MSGPACK_TYPES)
+
+
+def negotiate(accept):
+    """Response media type for an Accept header: msgpack only when asked for and available."""
+    return MSGPACK if msgpack is not None and is_msgpack(accept) else JSON
+
+
+def dumps(obj, media_type=JSON):
+    if media_type == MSGPACK:
+        return msgpack.packb(obj, use_bin_type=True)
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def loads(data, media_type=JSON):
+    """Decodes a request body; raises ValueError on malformed input or an unsupported type."""
+    if is_msgpack(media_type):
+        if msgpack is None:
+            raise ValueError("msgpack bodies are not supported (msgpack is not installed)")
+        try:
+            return msgpack.unpackb(data, raw=False)
+        except Exception as e:
+            raise ValueError(f"Invalid msgpack body: {e}")
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def available():
+    return {"json": "orjson" if orjson is not None else "json", "msgpack": msgpack is not None}
@@ -1,16 +1,48 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Header, Request, Response, WebSocket, WebSocketDisconnect, Query
+from pydantic import BaseModel, ValidationError
 from typing import List, Optional
 import uvicorn
 import os
 from memgraph_core import MemGraphCore
+from storage import create_backend
 from llm_interface import llm_client
+from profiler import RuntimeProfiler, ProfilerMiddleware, StageTimings
+from temporal import parse_temporal_window
+from cache import LRUCache
+from reindex import ReindexJob, EMBEDDERS
+import functools
+import hmac
+import asyncio
+from contextlib import asynccontextmanager
+import time
+import serialization
 import uuid
 
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+
+# MEMGRAPH_RAM_BUDGET_MB bounds resident L3 payloads; colder ones spill to MEMGRAPH_SPILL_DIR (default: temp dir)
+ram_budget_mb = float(os.getenv("MEMGRAPH_RAM_BUDGET_MB", "0"))
+memgraph = MemGraphCore(ram_budget_bytes=int(ram_budget_mb * 2**20) or None, spill_dir=os.getenv("MEMGRAPH_SPILL_DIR"))
+
+@asynccontextmanager
+async def lifespan(app):
+    # Explicit init: connect storage once the server starts, not at import time.
+    # MEMGRAPH_STORAGE: "supabase" (default), "sqlite:///memgraph.db", "memory" or "none"
+    backend = create_backend(os.getenv("MEMGRAPH_STORAGE", "supabase"))
+    if backend is not None:
+        memgraph.attach_backend(backend)
+        memgraph.restore_from_backend()
+    yield
+    memgraph.flush_writes()
+    if memgraph.backend is not None:
+        memgraph.backend.close()
+    if memgraph.cold is not None:
+        memgraph.cold.close()
 
 # Initialize App & Core
-app = FastAPI(title="MemGraph API", version="1.0")
+app = FastAPI(title="MemGraph API", version="1.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -20,12 +52,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-memgraph = MemGraphCore()
+# Runtime Profiler (idle unless an admin arms it)
+profiler = RuntimeProfiler()
+app.add_middleware(ProfilerMiddleware, profiler=profiler)
+ADMIN_TOKEN = os.getenv("MEMGRAPH_ADMIN_TOKEN")
+
+# Per-stage /chat latencies (reported under /stats "stages")
+stage_timings = StageTimings()
+
+# Session ID -> turns served; a session's first turn is timed separately ("first_turn" vs "turn")
+sessions = LRUCache(10000)
+_background_tasks = set()   # strong refs so running tasks are not garbage-collected
 
 # Data Models
 class ChatRequest(BaseModel):
     message: str
     api_key: Optional[str] = None
+    session_id: Optional[str] = None
 
 class MemoryResponse(BaseModel):
     id: str
@@ -38,6 +81,8 @@ class ChatResponse(BaseModel):
     active_memories: List[MemoryResponse]
     latency_ms: float
     cache_hit: bool
+    context_tokens: int = 0
+    tokens_saved: int = 0
 
 # State
 class GameState:
@@ -49,59 +94,313 @@ state = GameState()
 def health_check():
     return {"status": "online", "system": "MemGraph Nuclear Core"}
 
-@app.post("/chat", response_model=ChatResponse)
-async def chat_endpoint(req: ChatRequest):
-    import time
+def _open_session(session_id):
+    """Registers a session and warms L1 for it in the background (bounded by SessionWarmup's budget)."""
+    if session_id in sessions:
+        return
+    sessions.put(session_id, 0)
+    task = asyncio.create_task(memgraph.warmup.run_async(memgraph))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+def render(request, payload, status_code=200):
+    """
+    Encodes a plain-dict payload in the type the client Accepts (msgpack or JSON via orjson).
+    Returning a Response directly skips response-model validation and jsonable_encoder.
+    """
+    media_type = serialization.negotiate(request.headers.get("accept"))
+    return Response(serialization.dumps(payload, media_type), status_code=status_code, media_type=media_type)
+
+@app.post("/sessions")
+async def open_session(request: Request, session_id: Optional[str] = None):
+    """Opens a session and warms L1 for it in the background."""
+    session_id = session_id or uuid.uuid4().hex
+    _open_session(session_id)
+    return render(request, {"session_id": session_id})
+
+def _chat_turn(message, api_key=None, session_id=None):
+    """One chat turn. Returns (ChatResponse-shaped dict, user memory, assistant memory)."""
     start_time = time.time()
     
     # Configure LLM if key provided
-    if req.api_key:
-        llm_client.set_api_key(req.api_key)
+    if api_key:
+        llm_client.set_api_key(api_key)
     
-    # 1. Ingest
-    mem = memgraph.add_memory(req.message, role="user")
+    # 1. Ingest (every chat turn advances the engine clock that turn windows are measured in)
+    t0 = time.perf_counter()
+    memgraph.increment_turn()
+    mem = memgraph.add_memory(message, role="user")
+    t1 = time.perf_counter()
     
-    # 2. Retrieve
-    active_memories = memgraph.retrieve(req.message)
+    # 2. Retrieve ("five turns ago", "this morning"... put that window's memories first, then the usual hits)
+    window = parse_temporal_window(message, memgraph.global_turn)
+    active_memories = memgraph.retrieve(message)
+    if window:
+        windowed = memgraph.retrieve(message, **window)
+        active_memories = windowed + [m for m in active_memories if m not in windowed]
+    t2 = time.perf_counter()
     
     # 3. Generate
-    response_text = llm_client.generate_memgraph_response(req.message, active_memories)
+    response_text = llm_client.generate_memgraph_response(message, active_memories)
+    t3 = time.perf_counter()
     
     # 4. Store Response
-    memgraph.add_memory(response_text, role="assistant")
+    reply = memgraph.add_memory(response_text, role="assistant")
+    t4 = time.perf_counter()
     
     # 5. Maintenance (Background simplified for now)
     memgraph.run_pruning_cycle()
     memgraph.consolidate_memories()
+    memgraph.flush_writes()
+    t5 = time.perf_counter()
+
+    for stage, seconds in (("ingest", t1 - t0), ("retrieve", t2 - t1), ("generate", t3 - t2),
+                           ("store_response", t4 - t3), ("maintenance", t5 - t4)):
+        stage_timings.record(stage, seconds)
     
     end_time = time.time()
     latency = (end_time - start_time) * 1000
+
+    session_turn = None
+    if session_id:
+        session_turn = sessions.get(session_id, 0)
+        sessions.put(session_id, session_turn + 1)
+    stage_timings.record("first_turn" if session_turn == 0 else "turn", end_time - start_time)
     
-    # Format Response
-    mem_responses = []
-    for m in active_memories:
-        mem_responses.append(MemoryResponse(
-            id=m.internal_code,
-            tier=m.tier.value,
-            content=m.content,
-            score=m.half_life_score
-        ))
-        
-    return ChatResponse(
-        response=response_text,
-        active_memories=mem_responses,
-        latency_ms=latency,
-        cache_hit=(memgraph.neural_cache_hits > 0)
-    )
+    # Plain dicts in the ChatResponse shape; no per-memory model construction
+    payload = {
+        "response": response_text,
+        "active_memories": [{"id": m.internal_code, "tier": m.tier.value, "content": m.content,
+                             "score": m.half_life_score} for m in active_memories],
+        "latency_ms": latency,
+        "cache_hit": memgraph.neural_cache_hits > 0,
+        "context_tokens": llm_client.last_context_stats.get("tokens_used", 0),
+        "tokens_saved": llm_client.last_context_stats.get("tokens_saved", 0),
+    }
+    return payload, mem, reply
+
+_CHAT_BODY = {"required": True, "content": {
+    serialization.JSON: {"schema": ChatRequest.model_json_schema()},
+    serialization.MSGPACK: {"schema": ChatRequest.model_json_schema()},
+}}
+
+@app.post("/chat", response_model=ChatResponse, openapi_extra={"requestBody": _CHAT_BODY})
+async def chat_endpoint(request: Request):
+    """Takes a JSON or msgpack ChatRequest (by Content-Type) and answers in the type named by Accept."""
+    try:
+        req = ChatRequest(**serialization.loads(await request.body(), request.headers.get("content-type")))
+    except ValidationError as e:
+        # Same structured error list FastAPI returns for a declared body model
+        raise RequestValidationError(e.errors(include_url=False))
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    payload, _, _ = _chat_turn(req.message, req.api_key, req.session_id)
+    return render(request, payload)
+
+async def _send_frame(websocket, payload, media_type):
+    data = serialization.dumps(payload, media_type)
+    if media_type == serialization.MSGPACK:
+        await websocket.send_bytes(data)
+    else:
+        await websocket.send_text(data.decode())
+
+@app.websocket("/ws/chat")
+async def chat_socket(websocket: WebSocket, session_id: Optional[str] = None):
+    """
+    One connection per chat session. Each text frame (JSON) or binary frame (msgpack) carries
+    {"message": ..., "api_key"?: ...}; the server answers in the same encoding with a
+    {"type": "reply", ...ChatResponse fields} frame, then pushes {"type": "memory_update"} with the
+    memories the turn added, L1 promotions/demotions and tier sizes.
+    """
+    await websocket.accept()
+    session_id = session_id or uuid.uuid4().hex
+    _open_session(session_id)
+    await _send_frame(websocket, {"type": "session", "session_id": session_id}, serialization.JSON)
+    try:
+        while True:
+            frame = await websocket.receive()
+            if frame["type"] == "websocket.disconnect":
+                return
+            media_type = serialization.JSON if frame.get("text") is not None else serialization.MSGPACK
+            try:
+                data = serialization.loads(frame["text"] if media_type == serialization.JSON else frame["bytes"], media_type)
+                req = ChatRequest(**data)
+            except ValidationError as e:
+                await _send_frame(websocket, {"type": "error", "detail": jsonable_encoder(e.errors(include_url=False))}, serialization.JSON)
+                continue
+            except (ValueError, TypeError) as e:
+                await _send_frame(websocket, {"type": "error", "detail": str(e)}, serialization.JSON)
+                continue
+
+            l1_before = {m.internal_code for m in memgraph.l1_cache.values()}
+            payload, mem, reply = _chat_turn(req.message, req.api_key, session_id)
+            l1_after = {m.internal_code for m in memgraph.l1_cache.values()}
+            payload["type"] = "reply"
+            await _send_frame(websocket, payload, media_type)
+            await _send_frame(websocket, {
+                "type": "memory_update",
+                "added": [{"id": m.internal_code, "tier": m.tier.value, "role": m.role} for m in (mem, reply)],
+                "promoted": sorted(l1_after - l1_before),
+                "demoted": sorted(l1_before - l1_after),
+                "tiers": {"l1": len(memgraph.l1_cache), "l2": len(memgraph.l2_episodic), "l3": len(memgraph.l3_semantic)},
+            }, media_type)
+    except WebSocketDisconnect:
+        pass
 
 @app.get("/stats")
-def get_stats():
-    return {
+async def get_stats(request: Request):
+    return render(request, {
         "l1_count": len(memgraph.l1_cache),
         "l2_count": len(memgraph.l2_episodic),
         "l3_count": len(memgraph.l3_semantic),
-        "total_turns": memgraph.global_turn
-    }
+        "total_turns": memgraph.global_turn,
+        "context_tokens_saved": llm_client.total_tokens_saved,
+        "consolidation": memgraph.consolidator.stats(),
+        "dedup": memgraph.dedup_stats(),
+        "l3_vectors": memgraph.l3_vectors.memory_report(),
+        "row_cache": memgraph.row_cache.stats(),
+        "catalog": memgraph.catalog.stats(),
+        "bitmaps": memgraph.bitmaps.stats(),
+        "tiering": memgraph.tier_policy.stats(),
+        "retrieval_cache": memgraph.retrieval_cache.stats() if memgraph.retrieval_cache is not None else {"enabled": False},
+        "summary_tree": memgraph.summary_tree.stats(),
+        "warmup": memgraph.warmup.stats(),
+        "cold_storage": memgraph.cold.stats() if memgraph.cold is not None else {"enabled": False},
+        "serialization": serialization.available(),
+        "stages": stage_timings.summary()
+    })
+
+# Engine readers are async like /chat: they run on the event loop, never on the threadpool
+# concurrently with a chat turn (retrieve also writes: access stats, persist queue, result cache)
+@app.get("/memories")
+async def list_memories(request: Request, tier: Optional[str] = None, role: Optional[str] = None, entity: Optional[str] = None,
+                        turn_min: Optional[int] = None, turn_max: Optional[int] = None,
+                        cursor: Optional[str] = None, limit: int = 50):
+    """Filtered memory listing, oldest turn first. Pass `next_cursor` back as `cursor` for the next page."""
+    if not 0 < limit <= 500:
+        raise HTTPException(status_code=400, detail="limit must be in (0, 500]")
+    try:
+        items, next_cursor = memgraph.list_memories(tier=tier, role=role, entity=entity, turn_min=turn_min,
+                                                    turn_max=turn_max, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return render(request, {"items": [m.to_dict() for m in items], "next_cursor": next_cursor})
+
+@app.get("/memories/search")
+async def search_memories(request: Request, q: str, top_k: int = 5, role: Optional[List[str]] = Query(None),
+                          tier: Optional[List[str]] = Query(None), entity: Optional[List[str]] = Query(None),
+                          type: Optional[List[str]] = Query(None)):
+    """Ranked retrieval restricted by role/tier/entity/type (repeat a parameter to OR its values)."""
+    if not 0 < top_k <= 100:
+        raise HTTPException(status_code=400, detail="top_k must be in (0, 100]")
+    results = memgraph.retrieve(q, top_k=top_k, role=role, tier=tier, entity=entity, memory_type=type)
+    return render(request, {"items": [m.to_dict() for m in results]})
+
+@app.get("/memories/{memory_id}")
+async def get_memory(request: Request, memory_id: str):
+    mem = memgraph.memory_lookup.get(memory_id)
+    if mem is None:
+        raise HTTPException(status_code=404, detail="Memory not found")
+    return render(request, mem.to_dict())
+
+# --- Admin: Runtime Profiling ---
+def _require_admin(token):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints disabled (MEMGRAPH_ADMIN_TOKEN not set)")
+    # Constant-time compare; bytes so a non-ASCII header can't raise TypeError
+    if not hmac.compare_digest((token or "").encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+@app.post("/admin/profile/sample")
+async def profile_sample(seconds: float = 10.0, interval_ms: float = 5.0, x_admin_token: Optional[str] = Header(None)):
+    """Samples live request stacks for `seconds` and returns the collapsed stacks."""
+    _require_admin(x_admin_token)
+    if not 0 < seconds <= 120:
+        raise HTTPException(status_code=400, detail="seconds must be in (0, 120]")
+    if not 0 < interval_ms <= profiler.MAX_INTERVAL * 1000:
+        raise HTTPException(status_code=400, detail="interval_ms must be in (0, 1000]")
+    try:
+        profiler.start_sampling(seconds, interval=interval_ms / 1000)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    # Let the event loop keep serving traffic while the sampler thread runs
+    await asyncio.to_thread(profiler.wait)
+    return profiler.last_report
+
+@app.post("/admin/profile/requests")
+def profile_requests(count: int = 10, x_admin_token: Optional[str] = Header(None)):
+    """Arms deterministic profiling for the next `count` requests."""
+    _require_admin(x_admin_token)
+    if not 0 < count <= 10000:
+        raise HTTPException(status_code=400, detail="count must be in (0, 10000]")
+    try:
+        profiler.start_deterministic(count)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return profiler.status()
+
+@app.delete("/admin/profile")
+def profile_stop(x_admin_token: Optional[str] = Header(None)):
+    """Stops a running sampling or deterministic session early and returns what it collected."""
+    _require_admin(x_admin_token)
+    if not profiler.stop():
+        raise HTTPException(status_code=404, detail="Profiler is not running")
+    return {"status": profiler.status(), "report": profiler.last_report}
+
+# --- Admin: Online Re-embedding ---
+reindex_job = None
+reindex_task = None
+REINDEX_DIR = os.getenv("MEMGRAPH_REINDEX_DIR", "reindex_checkpoint")
+
+async def _run_reindex(job):
+    # Embedding runs on a worker thread + process pool; the swap and the write-back
+    # run here on the event loop, between requests
+    try:
+        if await asyncio.to_thread(job.build):
+            job.swap()
+            for _ in job.persist():
+                await asyncio.sleep(0)
+    except Exception as e:
+        print(f"[REINDEX] Failed: {e}")
+
+@app.post("/admin/reindex")
+async def start_reindex(model: str = "hashed", dim: int = 128, batch_size: int = 256,
+                        workers: Optional[int] = None, x_admin_token: Optional[str] = Header(None)):
+    """Re-embeds every memory with `model` in the background, resuming a matching checkpoint."""
+    global reindex_job, reindex_task
+    _require_admin(x_admin_token)
+    if model not in EMBEDDERS:
+        raise HTTPException(status_code=400, detail=f"Unknown model '{model}', expected one of {sorted(EMBEDDERS)}")
+    if not 0 < dim <= 4096 or not 0 < batch_size <= 10000:
+        raise HTTPException(status_code=400, detail="dim must be in (0, 4096], batch_size in (0, 10000]")
+    # Busy until the whole build/swap/persist task has finished, not just the build
+    if reindex_task is not None and not reindex_task.done():
+        raise HTTPException(status_code=409, detail="A reindex job is already running")
+    reindex_job = ReindexJob(memgraph, functools.partial(EMBEDDERS[model], dim=dim), f"{model}-{dim}", dim=dim,
+                             batch_size=batch_size, workers=workers, checkpoint_dir=REINDEX_DIR, embedder=model)
+    reindex_task = asyncio.create_task(_run_reindex(reindex_job))
+    _background_tasks.add(reindex_task)
+    reindex_task.add_done_callback(_background_tasks.discard)
+    return reindex_job.progress()
+
+@app.get("/admin/reindex")
+def reindex_status(x_admin_token: Optional[str] = Header(None)):
+    _require_admin(x_admin_token)
+    return reindex_job.progress() if reindex_job is not None else {"state": "idle"}
+
+@app.delete("/admin/reindex")
+def cancel_reindex(x_admin_token: Optional[str] = Header(None)):
+    """Stops the running build after its in-flight batches; the checkpoint is kept for a later resume."""
+    _require_admin(x_admin_token)
+    if reindex_job is None:
+        raise HTTPException(status_code=404, detail="No reindex job")
+    reindex_job.cancel()
+    return reindex_job.progress()
+
+@app.get("/admin/profile")
+def profile_report(x_admin_token: Optional[str] = Header(None)):
+    _require_admin(x_admin_token)
+    return {"status": profiler.status(), "report": profiler.last_report}
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
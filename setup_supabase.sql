@@ -41,3 +41,6 @@ begin
   );
 end;
 $$;
+
+-- Next: run migration_001_ann_tier_tenant.sql for the ANN index, tenant/tier filters
+-- and match_memories_v2 (enable in the app with MEMGRAPH_TENANT).
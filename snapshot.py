@@ -0,0 +1,196 @@
+"""
+Bulk export/import of a MemGraphCore's full memory store.
+
+A snapshot is a directory with three files:
+  manifest.json   format version, counts, vector dim, embedding model, engine counters
+  memories.jsonl  one row per memory (content, role, tier, metadata, stats); `vec` is its row in vectors.f32
+                  or null, `simhash` its dedup fingerprint, `in_l3` whether it sits in the L3 list;
+                  archived HIAGENT constituents follow their goals (tier L3_Archived_Leaf, metadata parent_code)
+  vectors.f32     embeddings as one contiguous little-endian float32 column, `dim` values per row
+                  (readable as-is with numpy.fromfile(path, "<f4").reshape(-1, dim))
+
+Both directions stream in chunks, so peak RAM beyond the engine itself stays at one chunk.
+Keyword/entity postings, the catalog and quantized L3 codes are rebuilt during import in the same
+single pass that loads each memory; dedup fingerprints are carried over so text is not re-hashed.
+"""
+import os
+import sys
+import json
+import time
+from array import array
+from memgraph_core import Memory, MemoryTier
+from storage import memory_to_record
+
+FORMAT_VERSION = 1
+MANIFEST, ROWS, VECTORS = "manifest.json", "memories.jsonl", "vectors.f32"
+
+
+def _iter_memories(mg):
+    """
+    Every memory once as (memory, in_l3): L3, then L2 (including L1-promoted), then L1 entries
+    evicted from L2, then the summary tree's archived leaves (after the goals they hang under).
+    """
+    seen = set()
+    sources = ((mg.l3_semantic, True), (mg.l2_episodic, False), (list(mg.l1_cache.values()), False),
+               (list(mg.summary_tree.leaves.values()), False))
+    for source, in_l3 in sources:
+        for mem in source:
+            if mem.internal_code not in seen:
+                seen.add(mem.internal_code)
+                yield mem, in_l3
+
+
+def export_snapshot(mg, path, chunk_size=4096):
+    """Writes every tier of `mg` to the snapshot directory `path`. Returns the manifest."""
+    os.makedirs(path, exist_ok=True)
+    counts = {tier.value: 0 for tier in MemoryTier}
+    dim = None
+    rows = vectors = 0
+    dedup = mg.deduplicator
+    start = time.perf_counter()
+    with open(os.path.join(path, ROWS), "w", encoding="utf-8") as rows_fh, open(os.path.join(path, VECTORS), "wb") as vec_fh:
+        lines, column = [], array("f")
+        for mem, in_l3 in _iter_memories(mg):
+            if mg.cold is not None:
+                mem = mg.cold.view(mem)   # spilled memories are read from disk, not faulted back in
+            embedding = mg.get_embedding(mem.internal_code)
+            if embedding is None:
+                embedding = mem.embedding
+            record = memory_to_record(mem, embedding)
+            record.pop("embedding")
+            record["last_access_at"] = mem.last_access_timestamp
+            record["in_l3"] = in_l3
+            record["vec"] = None
+            record["simhash"] = dedup.fingerprint(mem.internal_code) if dedup is not None else None
+            if embedding is not None:
+                if dim is None:
+                    dim = len(embedding)
+                record["vec"] = vectors
+                column.extend(embedding)
+                vectors += 1
+            lines.append(json.dumps(record, ensure_ascii=False))
+            counts[record["tier"]] += 1
+            rows += 1
+            if len(lines) >= chunk_size:
+                rows_fh.write("\n".join(lines) + "\n")
+                _write_column(vec_fh, column)
+                lines, column = [], array("f")
+        if lines:
+            rows_fh.write("\n".join(lines) + "\n")
+        _write_column(vec_fh, column)
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "rows": rows,
+        "vectors": vectors,
+        "dim": dim,
+        "embedding_model": mg.embedding_model,
+        "dtype": "<f4",
+        "tiers": counts,
+        "global_turn": mg.global_turn,
+        "neural_cache_hits": mg.neural_cache_hits,
+        "simhash_bits": dedup.bits if dedup is not None else None,
+        "created_at": time.time(),
+    }
+    with open(os.path.join(path, MANIFEST), "w") as fh:
+        json.dump(manifest, fh, indent=2)
+    print(f"[SNAPSHOT] Exported {rows} memories ({vectors} vectors) to {path} in {time.perf_counter() - start:.2f}s")
+    return manifest
+
+
+def _write_column(fh, column):
+    if sys.byteorder != "little":
+        column.byteswap()
+    fh.write(column.tobytes())
+
+
+def _read_vectors(fh, dim, count):
+    column = array("f")
+    column.frombytes(fh.read(dim * count * 4))
+    if sys.byteorder != "little":
+        column.byteswap()
+    return column
+
+
+def import_snapshot(mg, path, chunk_size=4096, persist=True):
+    """
+    Loads a snapshot into `mg` (normally a fresh engine) in one streaming pass: each chunk of rows
+    is paired with its slice of the vector column, placed into its tier and indexed.
+    With `persist` and a backend attached, each chunk is also written with one insert_batch call.
+    Returns the number of memories loaded.
+    """
+    with open(os.path.join(path, MANIFEST)) as fh:
+        manifest = json.load(fh)
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported snapshot format: {manifest.get('format_version')}")
+    dim = manifest["dim"]
+    # Switch to the exporter's embedder first, then refuse a mismatch before any row is loaded
+    mg._match_embedding_model(manifest.get("embedding_model"))
+    if dim is not None and dim != mg.l3_vectors.dim:
+        raise ValueError(f"Snapshot vectors have {dim} dims, index holds {mg.l3_vectors.dim}")
+    backend = mg.backend if persist else None
+    dedup = mg.deduplicator
+    reuse_fingerprints = dedup is not None and manifest.get("simhash_bits") == dedup.bits
+
+    loaded = 0
+    orphans = []    # archived leaves seen before their goal
+    start = time.perf_counter()
+    with open(os.path.join(path, ROWS), encoding="utf-8") as rows_fh, open(os.path.join(path, VECTORS), "rb") as vec_fh:
+        while True:
+            chunk = [json.loads(line) for _, line in zip(range(chunk_size), rows_fh)]
+            if not chunk:
+                break
+            n_vec = sum(1 for r in chunk if r["vec"] is not None)
+            column = _read_vectors(vec_fh, dim, n_vec) if n_vec else None
+            offset = 0
+            records = []
+            for record in chunk:
+                if record["vec"] is not None:
+                    record["embedding"] = column[offset * dim:(offset + 1) * dim].tolist()
+                    offset += 1
+                mem = Memory.from_record(record)
+                mem.last_access_timestamp = record.get("last_access_at", mem.creation_timestamp)
+                if mem.tier == MemoryTier.L3_ARCHIVED:
+                    if not mg.summary_tree.attach_leaf(mem.metadata.get("parent_code"), mem):
+                        orphans.append(mem)
+                else:
+                    mg._load_memory(mem, fingerprint=record.get("simhash") if reuse_fingerprints else None,
+                                    in_l3=record.get("in_l3"))
+                if backend is not None:
+                    records.append(memory_to_record(mem, record.get("embedding")))
+            if records:
+                backend.insert_batch(records)
+            loaded += len(chunk)
+
+    for leaf in orphans:
+        if not mg.attach_archived(leaf):
+            loaded -= 1
+    if backend is not None and mg.embedding_model is not None:
+        backend.put_setting("embedding_model", mg.embedding_model)
+    mg.global_turn = max(mg.global_turn, manifest.get("global_turn", 0))
+    mg.summary_tree.rollup()
+    elapsed = time.perf_counter() - start
+    rate = loaded / elapsed * 60 if elapsed else 0
+    print(f"[SNAPSHOT] Imported {loaded} memories from {path} in {elapsed:.2f}s ({rate:,.0f}/min)")
+    return loaded
+
+
+if __name__ == "__main__":
+    import argparse
+    from memgraph_core import MemGraphCore
+    from storage import create_backend
+
+    parser = argparse.ArgumentParser(description="Export/import a MemGraph store via a storage backend.")
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("snapshot", help="Snapshot directory")
+    parser.add_argument("--storage", default=None, help="Backend spec (default: $MEMGRAPH_STORAGE)")
+    args = parser.parse_args()
+
+    engine = MemGraphCore(backend=create_backend(args.storage))
+    if args.command == "export":
+        engine.restore_from_backend()
+        export_snapshot(engine, args.snapshot)
+    else:
+        import_snapshot(engine, args.snapshot)
+    if engine.backend is not None:
+        engine.backend.close()
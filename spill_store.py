@@ -0,0 +1,203 @@
+import os
+import json
+import shutil
+import tempfile
+import threading
+
+# Memory attributes that leave RAM when a memory is spilled; everything else (ID, tier, role,
+# scores, timestamps, access count) stays on the object as its index stub.
+SPILLED_FIELDS = ("content", "metadata", "embedding")
+
+
+class SegmentStore:
+    """
+    Append-only JSONL segment files for spilled payloads. Only (segment, offset, length) per key
+    stays in RAM. A new segment starts every `segment_bytes`; a sealed segment whose records are
+    all dead is deleted.
+    """
+
+    def __init__(self, directory=None, segment_bytes=64 * 1024 * 1024):
+        self._is_temp = directory is None
+        self.directory = directory or tempfile.mkdtemp(prefix="memgraph_spill_")
+        os.makedirs(self.directory, exist_ok=True)
+        self.segment_bytes = segment_bytes
+        self._index = {}        # key -> (segment, offset, length)
+        self._live = {}         # segment -> live record count
+        self._segment = 0
+        self._fh = None
+        self._lock = threading.Lock()
+
+    def _path(self, segment):
+        return os.path.join(self.directory, f"segment_{segment:06d}.jsonl")
+
+    def _active(self):
+        if self._fh is not None and self._fh.tell() >= self.segment_bytes:
+            self._fh.close()
+            self._fh = None
+            self._segment += 1
+            self._drop_if_dead(self._segment - 1)
+        if self._fh is None:
+            self._fh = open(self._path(self._segment), "ab")
+            self._fh.seek(0, os.SEEK_END)
+        return self._fh
+
+    def write(self, key, payload):
+        data = json.dumps(payload, ensure_ascii=False).encode() + b"\n"
+        with self._lock:
+            self._discard(key)
+            fh = self._active()
+            self._index[key] = (self._segment, fh.tell(), len(data))
+            self._live[self._segment] = self._live.get(self._segment, 0) + 1
+            fh.write(data)
+
+    def read(self, key):
+        entry = self._index.get(key)
+        if entry is None:
+            return None
+        segment, offset, length = entry
+        with self._lock:
+            if segment == self._segment and self._fh is not None:
+                self._fh.flush()
+            with open(self._path(segment), "rb") as fh:
+                fh.seek(offset)
+                return json.loads(fh.read(length))
+
+    def discard(self, key):
+        with self._lock:
+            self._discard(key)
+
+    def _discard(self, key):
+        entry = self._index.pop(key, None)
+        if entry is not None:
+            self._live[entry[0]] -= 1
+            self._drop_if_dead(entry[0])
+
+    def _drop_if_dead(self, segment):
+        if segment != self._segment and self._live.get(segment, 0) == 0:
+            self._live.pop(segment, None)
+            if os.path.exists(self._path(segment)):
+                os.remove(self._path(segment))
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def __len__(self):
+        return len(self._index)
+
+    def disk_bytes(self):
+        return sum(os.path.getsize(self._path(s)) for s in self._live if os.path.exists(self._path(s)))
+
+    def close(self):
+        """Closes the active segment; a store created in a temp directory is removed."""
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        if self._is_temp:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def payload_bytes(mem):
+    """Rough RAM held by a memory's spillable fields (str, dict, list of floats)."""
+    size = 49 + len(mem.content)
+    size += 232 + 120 * len(mem.metadata)
+    if mem.embedding is not None:
+        size += 56 + 32 * len(mem.embedding)
+    return size
+
+
+class ColdMemoryManager:
+    """
+    Keeps the payload RAM of spillable memories (L3 entries and archived summary-tree leaves)
+    under `budget_bytes`. When over budget, the lowest half-life memories are written to the
+    segment store and their payload fields dropped, down to `low_water` of the budget. Reading
+    any spilled field (Memory.__getattr__) faults the payload back in.
+    """
+
+    def __init__(self, budget_bytes, directory=None, low_water=0.9):
+        self.budget_bytes = budget_bytes
+        self.low_water = low_water
+        self.store = SegmentStore(directory)
+
+        # Metrics
+        self.spilled = 0
+        self.faults = 0
+        self.resident_bytes = 0
+
+    @staticmethod
+    def is_spilled(mem):
+        return "content" not in mem.__dict__
+
+    def spill(self, mem):
+        fields = {name: mem.__dict__[name] for name in SPILLED_FIELDS if mem.__dict__.get(name) is not None}
+        self.store.write(mem.internal_code, fields)
+        for name in fields:
+            del mem.__dict__[name]
+        mem.__dict__["_cold"] = self
+        self.spilled += 1
+
+    def fault_in(self, mem):
+        payload = self.store.read(mem.internal_code) or {}
+        for name in SPILLED_FIELDS:
+            # Fields assigned while spilled (e.g. a re-embedded vector) win over the stored copy
+            mem.__dict__.setdefault(name, payload.get(name))
+        mem.__dict__.pop("_cold", None)
+        self.store.discard(mem.internal_code)
+        self.faults += 1
+
+    def peek(self, mem, name):
+        """A field's value without faulting the memory back in."""
+        if name in mem.__dict__:
+            return mem.__dict__[name]
+        return (self.store.read(mem.internal_code) or {}).get(name)
+
+    def view(self, mem):
+        """A resident copy of `mem` for read-only use (export); `mem` itself stays spilled."""
+        if not self.is_spilled(mem):
+            return mem
+        copy = mem.__class__.__new__(mem.__class__)
+        copy.__dict__.update(mem.__dict__)
+        copy.__dict__.pop("_cold", None)
+        payload = self.store.read(mem.internal_code) or {}
+        for name in SPILLED_FIELDS:
+            copy.__dict__.setdefault(name, payload.get(name))
+        return copy
+
+    def forget(self, mem):
+        if self.is_spilled(mem):
+            self.store.discard(mem.internal_code)
+            mem.__dict__.pop("_cold", None)
+
+    def enforce(self, memories, pinned=()):
+        """Spills the coldest resident `memories` (skipping IDs in `pinned`) until under budget. Returns the count."""
+        resident = [(m.half_life_score, m.last_access_timestamp, payload_bytes(m), m)
+                    for m in memories if not self.is_spilled(m)]
+        self.resident_bytes = sum(r[2] for r in resident)
+        if self.resident_bytes <= self.budget_bytes:
+            return 0
+        target = self.budget_bytes * self.low_water
+        resident.sort(key=lambda r: (r[0], r[1]))
+        count = 0
+        for _, _, size, mem in resident:
+            if self.resident_bytes <= target:
+                break
+            if mem.internal_code in pinned:
+                continue
+            self.spill(mem)
+            self.resident_bytes -= size
+            count += 1
+        if count:
+            print(f"[SPILL] Spilled {count} cold memories to disk ({len(self.store)} on disk)")
+        return count
+
+    def close(self):
+        self.store.close()
+
+    def stats(self):
+        return {
+            "budget_bytes": self.budget_bytes,
+            "resident_bytes": self.resident_bytes,
+            "on_disk": len(self.store),
+            "disk_bytes": self.store.disk_bytes(),
+            "spilled": self.spilled,
+            "faults": self.faults,
+        }
@@ -0,0 +1,411 @@
+import os
+import json
+import time
+import uuid
+import heapq
+import sqlite3
+import threading
+from array import array
+from datetime import datetime, timezone
+from vector_ops import cosine_similarity
+
+
+def memory_to_record(mem, embedding=None):
+    """Flattens a Memory into the backend-neutral record shape."""
+    return {
+        "id": mem.internal_code,
+        "content": mem.content,
+        "role": mem.role,
+        "tier": mem.tier.value,
+        "embedding": embedding if embedding is not None else mem.embedding,
+        "metadata": mem.metadata,
+        "access_count": mem.access_count,
+        "half_life_score": mem.half_life_score,
+        "created_at": mem.creation_timestamp,
+    }
+
+
+class StorageBackend:
+    """
+    Persistence interface for MemGraphCore.
+
+    Records are dicts with: id, content, role, tier, embedding, metadata,
+    access_count, half_life_score, created_at.
+    `insert_batch` has upsert semantics so tier moves and access stats can be re-written.
+    """
+    name = "base"
+    serves_retrieval = False    # True when the backend (not local tiers) answers retrieve()
+
+    def db_id(self, record_id):
+        """Key the backend uses for a memory ID (identity unless the store remaps IDs)."""
+        return record_id
+
+    def insert_batch(self, records):
+        raise NotImplementedError
+
+    def get(self, record_id):
+        raise NotImplementedError
+
+    def vector_top_k(self, query_vec, k, tier=None):
+        """Returns [(record, similarity)] best first."""
+        raise NotImplementedError
+
+    def delete(self, ids):
+        raise NotImplementedError
+
+    def scan_tier(self, tier, limit=None):
+        """Yields records in `tier`, oldest first."""
+        raise NotImplementedError
+
+    def count(self):
+        raise NotImplementedError
+
+    def get_setting(self, key):
+        """Engine setting stored alongside the rows (e.g. the embedding model), or None."""
+        return None
+
+    def put_setting(self, key, value):
+        """Stores a JSON-able engine setting; backends without a settings store keep nothing."""
+
+    def close(self):
+        pass
+
+
+class InMemoryBackend(StorageBackend):
+    name = "memory"
+
+    def __init__(self):
+        self._rows = {}
+        self._settings = {}
+        self._lock = threading.Lock()
+
+    def insert_batch(self, records):
+        with self._lock:
+            for r in records:
+                row = dict(r)
+                if row.get("embedding") is None and r["id"] in self._rows:
+                    row["embedding"] = self._rows[r["id"]].get("embedding")   # metadata-only update
+                self._rows[r["id"]] = row
+
+    def get(self, record_id):
+        row = self._rows.get(record_id)
+        return dict(row) if row else None
+
+    def vector_top_k(self, query_vec, k, tier=None):
+        rows = [r for r in self._rows.values() if tier is None or r["tier"] == tier]
+        best = heapq.nlargest(k, ((cosine_similarity(query_vec, r["embedding"]), r["id"]) for r in rows if r.get("embedding")))
+        return [(dict(self._rows[rid]), score) for score, rid in best]
+
+    def delete(self, ids):
+        with self._lock:
+            for rid in ids:
+                self._rows.pop(rid, None)
+
+    def scan_tier(self, tier, limit=None):
+        rows = sorted((r for r in self._rows.values() if r["tier"] == tier), key=lambda r: r["created_at"])
+        for r in rows[:limit]:
+            yield dict(r)
+
+    def count(self):
+        return len(self._rows)
+
+    def get_setting(self, key):
+        value = self._settings.get(key)
+        return json.loads(value) if value is not None else None
+
+    def put_setting(self, key, value):
+        self._settings[key] = json.dumps(value)
+
+
+class SQLiteBackend(StorageBackend):
+    """
+    Embedded single-node store.
+    WAL journal + synchronous=NORMAL, one transaction per batch, and embeddings packed as
+    float32 BLOBs in their own table so row scans never touch vector bytes.
+    """
+    name = "sqlite"
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS memories (
+        id TEXT PRIMARY KEY,
+        content TEXT NOT NULL,
+        role TEXT,
+        tier TEXT NOT NULL,
+        metadata TEXT,
+        access_count INTEGER DEFAULT 1,
+        half_life_score REAL DEFAULT 1.0,
+        created_at REAL
+    );
+    CREATE INDEX IF NOT EXISTS idx_memories_tier_created ON memories (tier, created_at);
+    CREATE TABLE IF NOT EXISTS memory_vectors (
+        id TEXT PRIMARY KEY REFERENCES memories(id) ON DELETE CASCADE,
+        dim INTEGER NOT NULL,
+        vec BLOB NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS settings (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    );
+    """
+
+    def __init__(self, path="memgraph.db"):
+        self.path = path
+        # One connection shared across threads, serialized by our own lock
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(self.SCHEMA)
+
+    @staticmethod
+    def _pack(vec):
+        return array("f", vec).tobytes()
+
+    @staticmethod
+    def _unpack(blob):
+        vec = array("f")
+        vec.frombytes(blob)
+        return vec.tolist()
+
+    def _row_to_record(self, row, embedding=None):
+        rid, content, role, tier, metadata, access_count, score, created_at = row
+        return {
+            "id": rid,
+            "content": content,
+            "role": role,
+            "tier": tier,
+            "embedding": embedding,
+            "metadata": json.loads(metadata) if metadata else {},
+            "access_count": access_count,
+            "half_life_score": score,
+            "created_at": created_at,
+        }
+
+    def insert_batch(self, records):
+        if not records:
+            return
+        rows, vectors = [], []
+        for r in records:
+            rows.append((r["id"], r["content"], r.get("role"), r["tier"], json.dumps(r.get("metadata") or {}),
+                         r.get("access_count", 1), r.get("half_life_score", 1.0), r.get("created_at", time.time())))
+            if r.get("embedding") is not None:
+                vectors.append((r["id"], len(r["embedding"]), self._pack(r["embedding"])))
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO memories (id, content, role, tier, metadata, access_count, half_life_score, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(id) DO UPDATE SET content=excluded.content, role=excluded.role, tier=excluded.tier, "
+                    "metadata=excluded.metadata, access_count=excluded.access_count, half_life_score=excluded.half_life_score",
+                    rows)
+                self._conn.executemany("INSERT OR REPLACE INTO memory_vectors (id, dim, vec) VALUES (?, ?, ?)", vectors)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    _COLUMNS = "m.id, m.content, m.role, m.tier, m.metadata, m.access_count, m.half_life_score, m.created_at"
+
+    def get(self, record_id):
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {self._COLUMNS}, v.vec FROM memories m LEFT JOIN memory_vectors v ON v.id = m.id WHERE m.id = ?",
+                (record_id,)).fetchone()
+        if row is None:
+            return None
+        return self._row_to_record(row[:-1], self._unpack(row[-1]) if row[-1] else None)
+
+    def vector_top_k(self, query_vec, k, tier=None):
+        sql = "SELECT v.id, v.vec FROM memory_vectors v"
+        params = ()
+        if tier is not None:
+            sql += " JOIN memories m ON m.id = v.id WHERE m.tier = ?"
+            params = (tier,)
+        with self._lock:
+            scored = heapq.nlargest(k, ((cosine_similarity(query_vec, self._unpack(blob)), rid)
+                                        for rid, blob in self._conn.execute(sql, params)))
+        return [(self.get(rid), score) for score, rid in scored]
+
+    def delete(self, ids):
+        ids = list(ids)
+        if not ids:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany("DELETE FROM memories WHERE id = ?", [(i,) for i in ids])
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def scan_tier(self, tier, limit=None):
+        sql = (f"SELECT {self._COLUMNS}, v.vec FROM memories m LEFT JOIN memory_vectors v ON v.id = m.id "
+               "WHERE m.tier = ? ORDER BY m.created_at")
+        params = (tier,)
+        if limit is not None:
+            sql += " LIMIT ?"
+            params = (tier, limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        for row in rows:
+            yield self._row_to_record(row[:-1], self._unpack(row[-1]) if row[-1] else None)
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM memories").fetchone()[0]
+
+    def get_setting(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_setting(self, key, value):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class SupabaseBackend(StorageBackend):
+    """
+    Wraps the Supabase client (memgraph_memories table + match_memories RPC).
+    With `tenant_id` set the schema from migration_001_ann_tier_tenant.sql is assumed:
+    rows carry tenant/half-life columns and search goes through match_memories_v2.
+    """
+    name = "supabase"
+    serves_retrieval = True
+    TABLE = "memgraph_memories"
+
+    def __init__(self, client, match_threshold=0.5, tenant_id=None, half_life_hours=24):
+        self.client = client
+        self.match_threshold = match_threshold
+        self.tenant_id = tenant_id
+        self.half_life_hours = half_life_hours
+
+    def db_id(self, record_id):
+        return self._db_id(record_id)
+
+    @staticmethod
+    def _db_id(record_id):
+        """The table keys rows by UUID; internal codes map to a stable UUIDv5."""
+        try:
+            return str(uuid.UUID(str(record_id)))
+        except ValueError:
+            return str(uuid.uuid5(uuid.NAMESPACE_URL, record_id))
+
+    def _to_row(self, r):
+        # Keep our code-addressable ID (and fields the table has no column for) in metadata
+        metadata = dict(r.get("metadata") or {})
+        metadata["internal_code"] = r["id"]
+        metadata["role"] = r.get("role")
+        metadata["access_count"] = r.get("access_count", 1)
+        metadata["half_life_score"] = r.get("half_life_score", 1.0)
+        row = {
+            "id": self._db_id(r["id"]),
+            "content": r["content"],
+            "tier": r["tier"],
+            "metadata": metadata,
+        }
+        if self.tenant_id is not None:
+            row["tenant_id"] = self.tenant_id
+            row["half_life_score"] = metadata["half_life_score"]
+            # Rows are re-written on creation and on access-stat write-back
+            row["last_access_at"] = datetime.now(timezone.utc).isoformat()
+        # Access-stat write-backs carry no vector; never overwrite the stored embedding with NULL
+        if r.get("embedding") is not None:
+            row["embedding"] = r["embedding"]
+        return row
+
+    @staticmethod
+    def _from_row(row):
+        metadata = row.get("metadata") or {}
+        return {
+            "db_id": str(row["id"]),
+            "id": metadata.get("internal_code") or str(row["id"]),
+            "content": row["content"],
+            "role": metadata.get("role", "user"),
+            "tier": row.get("tier"),
+            "embedding": row.get("embedding"),
+            "metadata": metadata,
+            "access_count": metadata.get("access_count", 1),
+            "half_life_score": metadata.get("half_life_score", 1.0),
+            "created_at": row.get("created_at"),
+        }
+
+    def insert_batch(self, records):
+        if records:
+            self.client.table(self.TABLE).upsert([self._to_row(r) for r in records]).execute()
+
+    def get(self, record_id):
+        response = self.client.table(self.TABLE).select("*").eq("id", self._db_id(record_id)).limit(1).execute()
+        return self._from_row(response.data[0]) if response.data else None
+
+    def vector_top_k(self, query_vec, k, tier=None):
+        if self.tenant_id is not None:
+            # Tier filter and half-life weighting run server-side, behind the HNSW index
+            response = self.client.rpc("match_memories_v2", {
+                "query_embedding": query_vec,
+                "match_count": k,
+                "filter_tenant": self.tenant_id,
+                "filter_tiers": [tier] if tier is not None else None,
+                "match_threshold": self.match_threshold,
+                "half_life_hours": self.half_life_hours,
+            }).execute()
+            return [(self._from_row(r), r.get("similarity", 0.0)) for r in response.data or []]
+        response = self.client.rpc("match_memories", {
+            "query_embedding": query_vec,
+            "match_threshold": self.match_threshold,
+            "match_count": k
+        }).execute()
+        rows = response.data or []
+        if tier is not None:
+            rows = [r for r in rows if r.get("tier") == tier]
+        return [(self._from_row(r), r.get("similarity", 0.0)) for r in rows]
+
+    def delete(self, ids):
+        ids = list(ids)
+        if ids:
+            self.client.table(self.TABLE).delete().in_("id", [self._db_id(i) for i in ids]).execute()
+
+    def scan_tier(self, tier, limit=None):
+        query = self.client.table(self.TABLE).select("*").eq("tier", tier)
+        if self.tenant_id is not None:
+            query = query.eq("tenant_id", self.tenant_id)
+        query = query.order("created_at")
+        if limit is not None:
+            query = query.limit(limit)
+        for row in query.execute().data or []:
+            yield self._from_row(row)
+
+    def count(self):
+        query = self.client.table(self.TABLE).select("id", count="exact")
+        if self.tenant_id is not None:
+            query = query.eq("tenant_id", self.tenant_id)
+        response = query.limit(1).execute()
+        return response.count or 0
+
+
+def create_backend(spec=None):
+    """
+    Builds a backend from a spec string (default: $MEMGRAPH_STORAGE):
+      "memory", "sqlite" / "sqlite:///path/to.db", "supabase", or "" / "none" for no persistence.
+    Setting $MEMGRAPH_TENANT switches Supabase to the migrated (tenant-aware) schema.
+    """
+    spec = os.getenv("MEMGRAPH_STORAGE", "") if spec is None else spec
+    if not spec or spec == "none":
+        return None
+    if spec == "memory":
+        return InMemoryBackend()
+    if spec.startswith("sqlite"):
+        path = spec.split("sqlite:///", 1)[1] if "sqlite:///" in spec else "memgraph.db"
+        return SQLiteBackend(path)
+    if spec == "supabase":
+        from supabase_config import get_supabase_client
+        client = get_supabase_client()
+        return SupabaseBackend(client, tenant_id=os.getenv("MEMGRAPH_TENANT") or None) if client else None
+    raise ValueError(f"Unknown storage backend spec: {spec}")
@@ -0,0 +1,205 @@
+import re
+from vector_ops import centroid, cosine_similarity
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def _terms(text):
+    return set(_WORD_RE.findall(text.lower()))
+
+
+class TreeNode:
+    __slots__ = ("memory", "level", "children", "parent", "terms", "vector")
+
+    def __init__(self, memory, level, children=(), terms=None, vector=None):
+        self.memory = memory
+        self.level = level
+        self.children = list(children)   # node codes (level >= 2) or archived leaf codes (level 1)
+        self.parent = None
+        self.terms = terms if terms is not None else _terms(memory.content)
+        self.vector = vector             # kept only for rolled-up summaries; L3 vectors live in the core index
+
+
+class SummaryTree:
+    """
+    Multi-level HIAGENT summary tree over L3.
+
+    Level 1 holds every L3 entry (goal summaries and promoted singletons); a goal's children are the
+    constituent memories it replaced, archived here as leaves. Whenever `fanout` level-k nodes are
+    still unparented, they are rolled up into one level-(k+1) summary (batched LLM call, centroid
+    vector, union of child terms for routing). Search scores the unparented roots, then descends
+    only into the best `beam` branches per level, so a query touches O(fanout * beam * depth) nodes
+    instead of all of L3, and can still return fine-grained constituents.
+    """
+
+    def __init__(self, llm, vector_of, fanout=8, beam=2, vector_weight=0.5, peek=getattr):
+        self.llm = llm
+        self.vector_of = vector_of       # code -> full-precision vector for level-1 nodes
+        self.peek = peek                 # (memory, field) -> value, without faulting a spilled memory in
+        self.fanout = fanout
+        self.beam = beam
+        self.vector_weight = vector_weight
+        self.nodes = {}                  # code -> TreeNode
+        self.leaves = {}                 # code -> archived constituent Memory
+        self._unparented = {}            # level -> [codes], oldest first
+
+        # Metrics
+        self.rollups = 0
+        self.summarization_calls = 0
+        self.last_visited = 0
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def add_entry(self, memory, constituents=()):
+        """Adds an L3 memory as a level-1 node; `constituents` become its archived leaves."""
+        node = TreeNode(memory, 1, children=[m.internal_code for m in constituents])
+        for leaf in constituents:
+            self.leaves[leaf.internal_code] = leaf
+            node.terms |= _terms(leaf.content)
+        self.nodes[memory.internal_code] = node
+        self._unparented.setdefault(1, []).append(memory.internal_code)
+
+    def attach_leaf(self, parent_code, leaf):
+        """Re-links an archived constituent under its level-1 entry (restore/import). False if the entry is gone."""
+        node = self.nodes.get(parent_code)
+        if node is None or node.level != 1:
+            return False
+        if leaf.internal_code not in node.children:
+            node.children.append(leaf.internal_code)
+        self.leaves[leaf.internal_code] = leaf
+        node.terms |= _terms(leaf.content)
+        return True
+
+    def remove(self, code):
+        """Drops a node and its archived leaves (returned); ancestors just lose the child link."""
+        node = self.nodes.pop(code, None)
+        if node is None:
+            return []
+        if node.parent is not None and node.parent in self.nodes:
+            self.nodes[node.parent].children.remove(code)
+        else:
+            pending = self._unparented.get(node.level, [])
+            if code in pending:
+                pending.remove(code)
+        dropped = []
+        for child in node.children:
+            if node.level == 1:
+                leaf = self.leaves.pop(child, None)
+                if leaf is not None:
+                    dropped.append(leaf)
+            elif child in self.nodes:
+                self.nodes[child].parent = None
+                self._unparented.setdefault(node.level - 1, []).append(child)
+        return dropped
+
+    def _node_vector(self, node):
+        return node.vector if node.vector is not None else self.vector_of(node.memory.internal_code)
+
+    def rollup(self, batch_size=32):
+        """Forms summaries of summaries for every level that has `fanout` unparented nodes. Returns new nodes."""
+        from memgraph_core import Memory, MemoryTier
+        created = []
+        level = 1
+        while level in self._unparented:
+            pending = self._unparented[level]
+            groups = []
+            while len(pending) >= self.fanout:
+                groups.append(pending[:self.fanout])
+                del pending[:self.fanout]
+            for start in range(0, len(groups), batch_size):
+                batch = groups[start:start + batch_size]
+                summaries = self.llm.summarize_clusters([[self.peek(self.nodes[c].memory, "content") for c in g] for g in batch])
+                self.summarization_calls += 1
+                for group, summary in zip(batch, summaries):
+                    children = [self.nodes[c] for c in group]
+                    vectors = [v for v in (self._node_vector(c) for c in children) if v is not None]
+                    memory = Memory(summary, role="system", embedding=centroid(vectors) if vectors else None, metadata={
+                        "type": "HIAGENT_Summary",
+                        "level": level + 1,
+                        "constituent_codes": list(group),
+                        "creation_turn": max(c.memory.metadata.get("creation_turn", 0) for c in children),
+                    })
+                    memory.tier = MemoryTier.L3_SEMANTIC
+                    terms = set().union(*(c.terms for c in children))
+                    parent = TreeNode(memory, level + 1, children=group, terms=terms, vector=memory.embedding)
+                    for child in children:
+                        child.parent = memory.internal_code
+                    self.nodes[memory.internal_code] = parent
+                    self._unparented.setdefault(level + 1, []).append(memory.internal_code)
+                    created.append(memory)
+            level += 1
+        if created:
+            self.rollups += len(created)
+            print(f"[HIAGENT] Rolled up {len(created)} summary nodes (depth {self.depth()})")
+        return created
+
+    def refresh_vectors(self):
+        """Recomputes summary centroids bottom-up (after the underlying vectors were re-embedded)."""
+        for node in sorted((n for n in self.nodes.values() if n.level > 1), key=lambda n: n.level):
+            vectors = [v for v in (self._node_vector(self.nodes[c]) for c in node.children if c in self.nodes) if v is not None]
+            node.vector = node.memory.embedding = centroid(vectors) if vectors else None
+
+    def depth(self):
+        return max((n.level for n in self.nodes.values()), default=0)
+
+    def roots(self):
+        return [code for codes in self._unparented.values() for code in codes]
+
+    def _score(self, terms, vector, node_terms, node_vector):
+        lexical = len(terms & node_terms) / len(terms) if terms else 0.0
+        semantic = cosine_similarity(vector, node_vector) if vector is not None and node_vector is not None else 0.0
+        return lexical + self.vector_weight * semantic
+
+    def search(self, query, query_vec=None, top_k=3, beam=None):
+        """
+        Coarse-to-fine search. Returns [(score, Memory)] over level-1 entries and archived leaves,
+        best first.
+        """
+        beam = beam or self.beam
+        terms = _terms(query)
+        found = []
+        visited = 0
+        frontier = self.roots()
+        while frontier:
+            scored = []
+            for code in frontier:
+                node = self.nodes[code]
+                scored.append((self._score(terms, query_vec, node.terms, self._node_vector(node)), code))
+            visited += len(scored)
+            scored.sort(reverse=True)
+            next_frontier = []
+            for score, code in scored:
+                node = self.nodes[code]
+                if node.level == 1:
+                    if node.children:
+                        # Routing terms include the constituents'; rank the entry by its own text
+                        score = self._score(terms, query_vec, _terms(self.peek(node.memory, "content")), self._node_vector(node))
+                    found.append((score, node.memory))
+            for score, code in scored[:beam]:
+                node = self.nodes[code]
+                if node.level > 1:
+                    next_frontier.extend(node.children)
+                else:
+                    # Best level-1 branches: score their archived constituents too
+                    for leaf_code in node.children:
+                        leaf = self.leaves.get(leaf_code)
+                        if leaf is not None:
+                            found.append((self._score(terms, query_vec, _terms(self.peek(leaf, "content")),
+                                                      self.peek(leaf, "embedding")), leaf))
+                            visited += 1
+            frontier = next_frontier
+        self.last_visited = visited
+        found.sort(key=lambda x: x[0], reverse=True)
+        return found[:top_k]
+
+    def stats(self):
+        return {
+            "nodes": len(self.nodes),
+            "leaves": len(self.leaves),
+            "depth": self.depth(),
+            "roots": len(self.roots()),
+            "rollups": self.rollups,
+            "summarization_calls": self.summarization_calls,
+            "last_visited": self.last_visited,
+        }
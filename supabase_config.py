@@ -1,5 +1,5 @@
 import os
-from supabase import create_client, Client
+import threading
 
 # User Provided Credentials (Hackathon Mode)
 # Project ID: twqskvagxyxexyyjptvk
@@ -15,12 +15,29 @@ if os.environ.get("SUPABASE_URL"):
     SUPABASE_URL = os.environ.get("SUPABASE_URL")
 if os.environ.get("SUPABASE_KEY"):
     SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
-try:
-    if SUPABASE_URL and SUPABASE_KEY:
-        supabase_client: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-    else:
-        supabase_client = None
-except Exception as e:
-    print(f"Failed to init Supabase: {e}")
-    supabase_client = None
-# supabase_client is initialized above
+
+_client = None
+_client_lock = threading.Lock()
+_client_initialized = False
+
+def get_supabase_client():
+    """
+    Creates the Supabase client on first call and caches it.
+    Returns None if the SDK is missing or the connection fails.
+    Nothing touches the network at import time.
+    """
+    global _client, _client_initialized
+    if _client_initialized:
+        return _client
+    with _client_lock:
+        if _client_initialized:
+            return _client
+        try:
+            if SUPABASE_URL and SUPABASE_KEY:
+                from supabase import create_client
+                _client = create_client(SUPABASE_URL, SUPABASE_KEY)
+        except Exception as e:
+            print(f"Failed to init Supabase: {e}")
+            _client = None
+        _client_initialized = True
+    return _client
@@ -0,0 +1,55 @@
+import re
+import time
+from datetime import datetime, timedelta
+
+_NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10,
+}
+_N = r"(\d+|" + "|".join(_NUMBER_WORDS) + r")"
+
+_TURNS_AGO = re.compile(rf"\b{_N} (?:turns?|messages?) ago\b")
+_LAST_TURNS = re.compile(rf"\b(?:last|past|previous) {_N} (?:turns?|messages?)\b")
+_LAST_SPAN = re.compile(rf"\b(?:last|past) (?:{_N} )?(minutes?|hours?)\b")
+_CALENDAR = re.compile(r"\b(this morning|yesterday|today)\b")
+# Calendar words are common in plain statements ("I'm tired today"); only a recall question scopes by them
+_RECALL = re.compile(r"\b(?:what|when|which|did|recap|remind|recall|remember|said|told|mentioned|talked|discussed|asked)\b")
+
+
+def _number(token):
+    return int(token) if token.isdigit() else _NUMBER_WORDS[token]
+
+
+def parse_temporal_window(text, current_turn, now=None):
+    """
+    Maps time-scoped phrasing to retrieve() window kwargs, or None when the text has no temporal cue.
+      "five turns ago"  -> {"turn_window": (t-5, t-5)}
+      "last 3 turns"    -> {"turn_window": (t-3, t)}
+      "past 2 hours"    -> {"time_window": (now-7200, now)}
+      "this morning", "today", "yesterday" -> calendar windows in local time, only in a recall
+                                               question ("what did I say yesterday?")
+    """
+    text = text.lower()
+    now = time.time() if now is None else now
+
+    m = _TURNS_AGO.search(text)
+    if m:
+        turn = current_turn - _number(m.group(1))
+        return {"turn_window": (turn, turn)}
+    m = _LAST_TURNS.search(text)
+    if m:
+        return {"turn_window": (current_turn - _number(m.group(1)), current_turn)}
+    m = _LAST_SPAN.search(text)
+    if m:
+        span = (_number(m.group(1)) if m.group(1) else 1) * (3600 if m.group(2).startswith("hour") else 60)
+        return {"time_window": (now - span, now)}
+
+    m = _CALENDAR.search(text)
+    if m is None or not _RECALL.search(text):
+        return None
+    midnight = datetime.fromtimestamp(now).replace(hour=0, minute=0, second=0, microsecond=0)
+    if m.group(1) == "this morning":
+        return {"time_window": (midnight.timestamp(), (midnight + timedelta(hours=12)).timestamp())}
+    if m.group(1) == "yesterday":
+        return {"time_window": ((midnight - timedelta(days=1)).timestamp(), midnight.timestamp())}
+    return {"time_window": (midnight.timestamp(), now)}
@@ -0,0 +1,99 @@
+import os
+import json
+import pytest
+
+os.environ.setdefault("MEMGRAPH_STORAGE", "none")
+from fastapi.testclient import TestClient
+import serialization
+import server
+
+
+def test_chat_content_negotiation():
+    print("\n[Test] API Content Negotiation")
+    client = TestClient(server.app)
+    r = client.post("/chat", json={"message": "Negotiation test"})
+    assert r.status_code == 200 and r.headers["content-type"] == serialization.JSON
+    body = r.json()
+    assert {"response", "active_memories", "latency_ms", "cache_hit"} <= set(body)
+    assert all(set(m) == {"id", "tier", "content", "score"} for m in body["active_memories"])
+
+    # Bad bodies are rejected like before; msgpack without the package falls back to JSON
+    assert client.post("/chat", content=b"{not json", headers={"content-type": serialization.JSON}).status_code == 422
+    r = client.post("/chat", json={"text": "no message field"})
+    assert r.status_code == 422
+    assert [(e["type"], e["loc"]) for e in r.json()["detail"]] == [("missing", ["message"])]
+    r = client.get("/stats", headers={"accept": serialization.MSGPACK})
+    expected = serialization.MSGPACK if serialization.msgpack is not None else serialization.JSON
+    assert r.headers["content-type"] == expected
+    print(f"✅ encoders: {serialization.available()}")
+
+
+def test_msgpack_round_trip():
+    pytest.importorskip("msgpack")
+    client = TestClient(server.app)
+    body = serialization.dumps({"message": "Packed hello"}, serialization.MSGPACK)
+    r = client.post("/chat", content=body, headers={"content-type": serialization.MSGPACK,
+                                                    "accept": serialization.MSGPACK})
+    assert r.headers["content-type"] == serialization.MSGPACK
+    assert "response" in serialization.loads(r.content, serialization.MSGPACK)
+
+
+def test_websocket_session():
+    print("\n[Test] WebSocket Chat Session")
+    client = TestClient(server.app)
+    with client.websocket_connect("/ws/chat?session_id=ws-test") as ws:
+        assert ws.receive_json() == {"type": "session", "session_id": "ws-test"}
+        for text in ["My name is Grace.", "What is my name?"]:
+            ws.send_text(json.dumps({"message": text}))
+            reply = ws.receive_json()
+            assert reply["type"] == "reply" and reply["response"]
+            update = ws.receive_json()
+            assert update["type"] == "memory_update"
+            assert [m["role"] for m in update["added"]] == ["user", "assistant"]
+            assert update["tiers"]["l2"] >= 2
+        ws.send_text("{broken")
+        assert ws.receive_json()["type"] == "error"
+    assert server.sessions.get("ws-test") == 2
+    print("✅ Two turns over one connection")
+
+
+def test_chat_turns_advance_window():
+    client = TestClient(server.app)
+    start = server.memgraph.global_turn
+    for i in range(6):
+        client.post("/chat", json={"message": f"Window marker number {i} zebra{i}"})
+    assert server.memgraph.global_turn == start + 6
+    body = client.post("/chat", json={"message": "what did I say five turns ago?"}).json()
+    assert "Window marker number 1 zebra1" in [m["content"] for m in body["active_memories"]]
+
+
+def test_reindex_refused_until_write_back_finishes(monkeypatch):
+    class Persisting:                      # swapped, still writing rows back
+        def done(self):
+            return False
+    monkeypatch.setattr(server, "ADMIN_TOKEN", "t")
+    monkeypatch.setattr(server, "reindex_task", Persisting())
+    client = TestClient(server.app)
+    assert client.post("/admin/reindex", headers={"x-admin-token": "t"}).status_code == 409
+
+
+def test_lifespan_attaches_and_flushes_storage(monkeypatch, tmp_path):
+    from memgraph_core import MemGraphCore
+    from storage import SQLiteBackend
+    path = str(tmp_path / "life.db")
+    monkeypatch.setenv("MEMGRAPH_STORAGE", f"sqlite:///{path}")
+    monkeypatch.setattr(server, "memgraph", MemGraphCore())
+    with TestClient(server.app) as client:
+        assert isinstance(server.memgraph.backend, SQLiteBackend)
+        client.post("/chat", json={"message": "Lifespan check"})
+    backend = SQLiteBackend(path)
+    assert backend.count() >= 2                  # flushed on shutdown
+    backend.close()
+
+
+def test_bench_smoke():
+    from bench_api import main
+    report = main(["--iterations", "50", "--turns", "3", "--memories", "5"])
+    enc = report["encoding"]
+    assert enc["pydantic+json"]["us_per_msg"] > 0 and len(enc) >= 2
+    assert set(report["transport"]) == {"http_overhead_ms_p50", "ws_overhead_ms_p50"}
@@ -0,0 +1,73 @@
+from collections import deque
+from bitmap_index import Bitmap
+from memgraph_core import MemGraphCore, MemoryTier
+from reindex import hashed_embedding
+
+
+def test_bitmap_ops():
+    a = Bitmap([1, 5, 70_000, 200_000])
+    b = Bitmap([5, 70_000, 3])
+    assert list(a & b) == [5, 70_000]
+    assert list(a | b) == [1, 3, 5, 70_000, 200_000]
+    a.discard(200_000)
+    assert 200_000 not in a and len(a) == 3 and 70_000 in a
+    assert not (Bitmap([1]) & Bitmap([1 << 17]))
+
+
+def _populated(embedder=None):
+    mg = MemGraphCore(embedder=embedder)
+    mg.retrieval_cache = None
+    mg.l2_episodic = deque(maxlen=500)
+    topics = ["Python", "Rust", "Go"]
+    for i in range(240):
+        mg.increment_turn()
+        role = "assistant" if i % 2 else "user"
+        mg.add_memory(f"note {i} about {topics[i % 3].lower()} tooling", role=role, entities=[topics[i % 3]])
+    return mg
+
+
+def test_filtered_retrieve():
+    print("\n[Test] Bitmap-Filtered Retrieval")
+    mg = _populated()
+    matching = mg.bitmaps.select(role="assistant", entity="Rust")
+    assert 0 < len(matching) < len(mg.bitmaps) // 4
+
+    # Filters are applied before scoring: top_k fills from matching memories only
+    results = mg.retrieve("tooling", top_k=8, role="assistant", entity="Rust")
+    assert len(results) == 8
+    assert all(m.role == "assistant" and "Rust" in m.metadata["entities"] for m in results)
+
+    # OR within a field, AND across fields; an empty match short-circuits
+    either = mg.retrieve("tooling", top_k=100, entity=["Rust", "Go"], role="user")
+    assert either and all(m.role == "user" and m.metadata["entities"][0] in ("Rust", "Go") for m in either)
+    assert mg.retrieve("tooling", entity="Haskell") == []
+
+    # Temporal window and filters combine
+    recent = mg.retrieve("tooling", top_k=100, turn_window=(200, 240), entity="Go")
+    assert recent and all(m.metadata["creation_turn"] >= 200 and m.metadata["entities"] == ["Go"] for m in recent)
+    print(f"✅ {len(matching)} of {len(mg.bitmaps)} memories scored")
+
+
+def test_filtered_vector_search():
+    mg = _populated(embedder=lambda texts: hashed_embedding(texts, 128))
+    results = mg.retrieve("rust tooling", top_k=5, role="user", entity="Rust")
+    assert len(results) == 5 and all(m.role == "user" and m.metadata["entities"] == ["Rust"] for m in results)
+
+
+def test_bitmaps_follow_tier_moves_and_removal(echo_llm):
+    mg = _populated()
+    mg.consolidator.llm = mg.summary_tree.llm = echo_llm
+    mg.consolidate_memories(force=True)
+
+    l3 = mg.retrieve("tooling", top_k=1000, tier=MemoryTier.L3_SEMANTIC)
+    assert l3 and all(m.tier == MemoryTier.L3_SEMANTIC for m in l3)
+    l2 = mg.retrieve("tooling", top_k=1000, tier=MemoryTier.L2_EPISODIC.value)
+    assert all(m.tier == MemoryTier.L2_EPISODIC for m in l2) and len(l2) + len(l3) <= len(mg.memory_lookup)
+    goals = mg.retrieve("tooling", top_k=1000, memory_type="HIAGENT_Goal")
+    assert all(m.metadata["type"] == "HIAGENT_Goal" for m in goals)
+    assert len(mg.bitmaps) == len(mg.memory_lookup)
+
+    gone = l3[0]
+    mg._forget(gone)
+    assert mg.bitmaps.slot_of(gone.internal_code) is None
+    assert gone not in mg.retrieve("tooling", top_k=1000, tier=MemoryTier.L3_SEMANTIC)
@@ -0,0 +1,39 @@
+from memgraph_core import Memory
+from context_packer import ContextPacker, estimate_tokens
+
+
+def _mem(content, turn):
+    return Memory(content, metadata={"creation_turn": turn})
+
+
+def test_context_packer_budget_dedupe_and_order():
+    print("\n[Test] Context Packing")
+    memories = [
+        _mem("My name is Priranshu.", 3),
+        _mem("my name is Priranshu", 5),                 # near-duplicate
+        _mem("I am building a memory system. " * 60, 1),  # long
+        _mem("I like coding in Python.", 2),
+    ]
+    packer = ContextPacker(token_budget=200, max_memory_tokens=50)
+    packed = packer.pack(memories)
+
+    assert packed.deduped == 1
+    assert packed.truncated == 1
+    assert packed.tokens_used <= 200
+    assert packed.tokens_saved > 0
+    # Chronological, not relevance, order
+    turns = [m.metadata["creation_turn"] for m in packed.memories]
+    assert turns == sorted(turns)
+    print(f"✅ {packed.stats()}")
+
+
+def test_context_packer_is_deterministic_across_turns():
+    a, b, c = _mem("Alpha fact.", 1), _mem("Beta fact.", 2), _mem("Gamma fact.", 3)
+    packer = ContextPacker()
+    # Same memories retrieved in a different relevance order produce the same block
+    assert packer.pack([c, a, b]).text == packer.pack([b, c, a]).text
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert 2 <= estimate_tokens("hello world") <= 4
@@ -0,0 +1,167 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from llm_transport import CircuitBreaker, CircuitOpenError, ProviderTransport, TransportError
+from llm_interface import LLMInterface
+
+
+class StubProvider(BaseHTTPRequestHandler):
+    """Local stand-in for an LLM REST endpoint. Behaviour is scripted per test."""
+    protocol_version = "HTTP/1.1"  # keep-alive
+    script = []            # status codes to return in order; 200 once exhausted
+    delay = 0.0
+    hits = 0
+    connections = set()
+
+    def do_POST(self):
+        cls = type(self)
+        cls.hits += 1
+        cls.connections.add(self.client_address)
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if cls.delay:
+            time.sleep(cls.delay)
+        status = cls.script.pop(0) if cls.script else 200
+        body = json.dumps({"response": "stub reply"}).encode()
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client gave up (deadline tests)
+
+    def log_message(self, *args):
+        pass
+
+
+def _start_stub(script=None, delay=0.0):
+    StubProvider.script = list(script or [])
+    StubProvider.delay = delay
+    StubProvider.hits = 0
+    StubProvider.connections = set()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubProvider)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_transport_pools_connections_and_retries():
+    print("\n[Test] Pooled Transport + Retries")
+    server, url = _start_stub(script=[503, 503])
+    try:
+        t = ProviderTransport("stub", max_retries=2, backoff_base=0.01)
+        assert t.post_json(f"{url}/api/generate", {"prompt": "x"})["response"] == "stub reply"
+        assert t.retries == 2 and StubProvider.hits == 3
+
+        for _ in range(5):
+            t.post_json(f"{url}/api/generate", {"prompt": "x"})
+        # All sequential calls reuse the single keep-alive connection
+        assert len(StubProvider.connections) == 1
+        print(f"✅ {StubProvider.hits} calls over {len(StubProvider.connections)} connection")
+    finally:
+        server.shutdown()
+
+
+def test_circuit_breaker_short_circuits_slow_provider():
+    print("\n[Test] Circuit Breaker + Deadline")
+    server, url = _start_stub(delay=0.5)
+    try:
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        t = ProviderTransport("stub", deadline=0.2, attempt_timeout=0.2, max_retries=0, breaker=breaker)
+
+        for _ in range(2):
+            start = time.monotonic()
+            try:
+                t.post_json(url, {})
+                assert False, "Expected timeout"
+            except TransportError:
+                pass
+            assert time.monotonic() - start < 0.45  # deadline honoured, not the 30s of old
+
+        assert breaker.state == CircuitBreaker.OPEN
+        start = time.monotonic()
+        try:
+            t.post_json(url, {})
+            assert False, "Expected open circuit"
+        except CircuitOpenError:
+            pass
+        assert time.monotonic() - start < 0.01
+        assert t.short_circuits == 1
+        print("✅ Open circuit fails fast")
+    finally:
+        server.shutdown()
+
+
+def test_circuit_half_open_probe_closes_on_success():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=lambda: now[0])
+    breaker.record_failure()
+    assert not breaker.allow_request()
+    now[0] = 11
+    assert breaker.allow_request()       # the probe
+    assert not breaker.allow_request()   # only one probe at a time
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_ollama_falls_back_to_mock_when_unhealthy():
+    server, url = _start_stub(script=[500] * 20)
+    try:
+        llm = LLMInterface(provider="ollama", model="stub")
+        llm.ollama_url = url
+        llm._transports["ollama"] = ProviderTransport(
+            "ollama", max_retries=0, breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60))
+
+        first = llm.generate_memgraph_response("hello", [])
+        hits = StubProvider.hits
+        second = llm.generate_memgraph_response("hello", [])
+        assert first and second
+        assert StubProvider.hits == hits  # second call never reached the provider
+    finally:
+        server.shutdown()
+
+
+class _RaisingSession:
+    def __init__(self, error):
+        self.error = error
+        self.calls = 0
+
+    def post(self, *args, **kwargs):
+        self.calls += 1
+        raise self.error
+
+
+def test_any_requests_error_counts_and_releases_probe():
+    import requests
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=lambda: now[0])
+    t = ProviderTransport("stub", max_retries=1, backoff_base=0.0, breaker=breaker)
+    t._session = _RaisingSession(requests.exceptions.ChunkedEncodingError("truncated body"))
+    try:
+        t.post_json("http://stub", {})
+        assert False, "Expected TransportError"
+    except TransportError:
+        pass
+    assert t._session.calls == 2 and t.failures == 1 and breaker.state == CircuitBreaker.OPEN
+
+    # An unexpected error during the half-open probe must not wedge the breaker
+    now[0] = 11
+    t._session = _RaisingSession(RuntimeError("boom"))
+    try:
+        t.post_json("http://stub", {})
+        assert False, "Expected RuntimeError"
+    except RuntimeError:
+        pass
+    assert breaker.allow_request()
+
+
+def test_null_provider_response_falls_back_to_mock():
+    class NullTransport:
+        def post_json(self, *args, **kwargs):
+            return {"response": None}
+
+    llm = LLMInterface(provider="ollama", model="stub")
+    llm._transports["ollama"] = NullTransport()
+    assert llm.generate_memgraph_response("hello", [])
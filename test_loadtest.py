@@ -0,0 +1,36 @@
+import os
+import pytest
+from llm_interface import llm_client
+from mock_llm import LatencyModel
+from loadtest import main, synthetic_transcripts
+
+
+@pytest.fixture
+def harness_state(monkeypatch):
+    """The in-process harness reconfigures the shared LLM client and storage env; undo it afterwards."""
+    monkeypatch.setattr(llm_client, "mock_latency", llm_client.mock_latency)
+    monkeypatch.setattr(llm_client, "provider", llm_client.provider)
+    monkeypatch.setattr(llm_client, "api_key", "sk-should-never-be-used")
+    monkeypatch.setenv("MEMGRAPH_STORAGE", "supabase")
+
+
+def test_latency_model_is_deterministic():
+    a = LatencyModel.from_spec("lognormal:100:0.5", seed=1)
+    b = LatencyModel.from_spec("lognormal:100:0.5", seed=1)
+    assert [a.sample() for _ in range(20)] == [b.sample() for _ in range(20)]
+    tail = LatencyModel.from_spec("bimodal:10:500:0.1", seed=2)
+    samples = [tail.sample() for _ in range(1000)]
+    assert set(samples) == {0.01, 0.5} and 50 < samples.count(0.5) < 150
+    assert LatencyModel.from_spec("") is None
+    assert synthetic_transcripts(3, 6, seed=4) == synthetic_transcripts(3, 6, seed=4)
+
+
+def test_closed_loop_smoke(harness_state):
+    print("\n[Test] Load Harness")
+    report = main(["--users", "2", "--duration", "1", "--turns", "4", "--llm-latency", "constant:5"])
+    assert report["requests"] > 0 and report["error_rate"] == 0.0
+    assert report["p50_ms"] <= report["p95_ms"] <= report["p99_ms"]
+    assert report["server_stages"]["generate"]["p50_ms"] >= 5
+    assert report["server_stages"]["first_turn"]["count"] >= 2      # one per replayed session
+    assert llm_client.provider == "mock" and os.environ["MEMGRAPH_STORAGE"] == "none"
+    print(f"✅ {report['requests']} requests, p99={report['p99_ms']}ms")
@@ -1,4 +1,5 @@
 import time
+import pytest
 from memgraph_core import MemGraphCore, MemoryTier
 
 def test_memgraph_core():
@@ -21,21 +22,19 @@ def test_memgraph_core():
 
     # 3. Test Neural Caching (L1)
     print("\n[Test 3] Neural Prompt Caching")
-    # Add a preference which should auto-promote to L1
+    # Memories earn L1 through repeated access (Count-Min sketch policy), not at ingest
     m2 = mg.add_memory("I prefer coding in Python.", entities=["Python"])
-    # Check if it was promoted (logic in add_memory promotes if "preference" in text)
-    if m2.tier == MemoryTier.L1_FAST_REACTOR:
-        print("✅ Immediate promotion to L1 worked.")
-    else:
-        print(f"ℹ️ Memory in {m2.tier}, checking retrieval promotion...")
-        
+    assert m2.tier == MemoryTier.L2_EPISODIC
+    for _ in range(3):
+        mg.retrieve("prefer coding Python")
+    promoted, _ = mg.run_tier_migration()
+    assert m2.internal_code in promoted and m2.tier == MemoryTier.L1_FAST_REACTOR
+
     # Retrieve it multiple times to verify cache hits
     mg.retrieve("I prefer coding in Python.")
     mg.retrieve("I prefer coding in Python.")
-    if mg.neural_cache_hits > 0:
-        print(f"✅ Cache Hits recorded: {mg.neural_cache_hits}")
-    else:
-        print("❌ No cache hits recorded.")
+    assert mg.neural_cache_hits >= 2
+    print(f"✅ Cache Hits recorded: {mg.neural_cache_hits}")
 
     # 4. Test HIAGENT Chunking
     print("\n[Test 4] HIAGENT Chunking")
@@ -43,7 +42,7 @@ def test_memgraph_core():
     for i in range(5):
         mg.add_memory(f"Turn {i} interaction details.")
     
-    mg.consolidate_memories()
+    mg.consolidate_memories(force=True)
     
     # Check if L3 has the summary
     if len(mg.l3_semantic) > 0:
@@ -67,5 +66,266 @@ def test_memgraph_core():
     else:
         print(f"❌ Memory not pruned. Score: {m1.half_life_score}")
 
+def test_clustered_consolidation():
+    print("\n[Test] Clustered Batch Consolidation")
+
+    class CountingLLM:
+        calls = 0
+        def summarize_clusters(self, clusters):
+            CountingLLM.calls += 1
+            return [f"Goal: {texts[0]}" for texts in clusters]
+
+    mg = MemGraphCore()
+    mg.consolidator.llm = CountingLLM()
+    topics = [("Python", "I write Python scripts"), ("Hackathon", "The hackathon deadline is close"), ("Memory", "The memory system needs scaling")]
+
+    turns = 1000
+    for turn in range(turns):
+        mg.increment_turn()
+        entity, text = topics[turn % len(topics)]
+        mg.add_memory(f"{text} turn {turn}", entities=[entity])
+        mg.add_memory(f"Reply about {entity} {text.lower()}", role="assistant", entities=[entity])
+        mg.consolidate_memories()
+
+    # Old scheme: one call per 3 memories consolidated
+    old_calls = (2 * turns) // 3
+    assert CountingLLM.calls * 10 <= old_calls, f"{CountingLLM.calls} calls vs {old_calls}"
+    goals = [m for m in mg.l3_semantic if m.metadata.get("type") == "HIAGENT_Goal"]
+    assert goals
+    # Clusters stay on topic
+    for goal in goals[:10]:
+        assert len(set(goal.metadata.get("entities", []))) == 1
+    print(f"✅ {CountingLLM.calls} summarization calls for {turns} turns (old scheme: {old_calls})")
+
+def test_near_duplicate_merge():
+    print("\n[Test] Near-Duplicate Suppression")
+    mg = MemGraphCore()
+    first = mg.add_memory("What is my name?")
+    mg.increment_turn()
+    again = mg.add_memory("what is my name")
+    other = mg.add_memory("What is your name?")
+    reply = mg.add_memory("What is my name?", role="assistant")
+
+    assert again is first
+    assert first.access_count == 2
+    assert first.metadata["last_access_turn"] == 1
+    assert other is not first and reply is not first  # different text / different role
+    assert len(mg.l2_episodic) == 3
+    assert mg.dedup_stats()["merged"] == 1
+
+    # Threshold is configurable; None disables suppression
+    mg_off = MemGraphCore(dedup_threshold=None)
+    mg_off.add_memory("What is my name?")
+    mg_off.add_memory("What is my name?")
+    assert len(mg_off.l2_episodic) == 2
+    print(f"✅ Dedup stats: {mg.dedup_stats()}")
+
+def test_tiered_quantized_vectors():
+    print("\n[Test] Quantized L3 Vectors")
+    import random
+    from quantized_index import evaluate_recall
+
+    random.seed(3)
+    data = {f"MEM_{i}": [random.random() for _ in range(128)] for i in range(300)}
+    queries = [[random.random() for _ in range(128)] for _ in range(5)]
+    report = evaluate_recall(data, queries, top_k=5)
+    assert report["int8"]["recall_at_k"] >= 0.9
+    assert report["binary"]["bytes_per_vector"] < report["int8"]["bytes_per_vector"] < report["float32"]["bytes_per_vector"]
+
+    mg = MemGraphCore(l3_vector_mode="binary")
+    # Unrelated texts stay singletons, so they move to L3 unchanged
+    mems = [mg.add_memory(text) for text in ["Alpha launch", "Bravo dinner", "Charlie flight", "Delta invoice"]]
+    target = mems[2].embedding
+    mg.consolidate_memories(force=True)
+
+    l3_codes = {m.internal_code for m in mg.l3_semantic}
+    assert mems[2].internal_code in l3_codes
+    assert all(code in mg.l3_vectors for code in l3_codes)
+    assert all(m.embedding is None for m in mg.l3_semantic)   # no full-precision copy in RAM
+    assert not (l3_codes & set(mg.vector_index))
+    # Exact vector comes back from disk (float32 round-trip)
+    assert mg.get_embedding(mems[2].internal_code) == pytest.approx(target, rel=1e-6)
+    assert mg.vector_search(target, top_k=1)[0][0] is mems[2]
+    mg.l3_vectors.close()
+    print(f"✅ {report}")
+
+def test_vector_store_compaction():
+    import os
+    mg = MemGraphCore()
+    mems = [mg.add_memory(text) for text in ["Alpha launch", "Bravo dinner", "Charlie flight", "Delta invoice"]]
+    mg.consolidate_memories(force=True)
+    store = mg.l3_vectors.full_store
+    store.min_compact_bytes = 0
+    vectors = {m.internal_code: mg.get_embedding(m.internal_code) for m in mems}
+
+    # Promote/demote cycles move vectors out of and back into the store; the file stays bounded
+    for _ in range(50):
+        mg._promote_to_l1(mems[0])
+        mg._demote_from_l1(mems[0])
+    store.sync()
+    assert os.path.getsize(store.path) <= 2 * len(mems) * store._record_bytes
+    assert store.compactions > 0 and store.file_bytes() == os.path.getsize(store.path)
+    for code, vec in vectors.items():
+        assert mg.get_embedding(code) == pytest.approx(vec, rel=1e-6)
+    mg.l3_vectors.close()
+
+def test_tier_page():
+    print("\n[Test] Tier Pagination")
+    mg = MemGraphCore(dedup_threshold=None)
+    mems = [mg.add_memory(f"note {i}") for i in range(30)]
+    page, total = mg.tier_page("L2_Episodic_Log", offset=10, limit=5)
+    assert total == 30 and page == mems[10:15]
+    mg.consolidate_memories(force=True)
+    page, total = mg.tier_page(MemoryTier.L3_SEMANTIC, offset=25, limit=10)
+    assert total == len(mg.l3_semantic) and page == mg.l3_semantic[25:]
+    assert mg.tier_page("L4_Neo4j_Graph") == ([], 0)
+    print(f"✅ Paged {total} L3 memories")
+
+def test_tier_migration_policy():
+    print("\n[Test] Adaptive Tier Migration")
+    from tier_policy import CountMinSketch, TierMigrationPolicy
+
+    sketch = CountMinSketch(width=64, depth=4)
+    for i in range(200):
+        sketch.add(f"k{i % 20}")
+    assert all(sketch.estimate(f"k{i}") >= 10 for i in range(20))   # never undercounts
+    sketch.decay()
+    assert sketch.estimate("k0") >= 5
+
+    mg = MemGraphCore(dedup_threshold=None)
+    mg.tier_policy = TierMigrationPolicy(l1_capacity=2, promote_threshold=3, batch_interval=4, decay_interval=16)
+    hot = [mg.add_memory(text) for text in ["Alpha launch", "Bravo dinner", "Charlie flight"]]
+    mg.consolidate_memories(force=True)       # singletons move to L3
+    for mem in hot:
+        for _ in range(3 + hot.index(mem)):
+            mg.tier_policy.record_access(mem.internal_code)
+    mg.run_tier_migration()
+    # Capacity 2: the two hottest win
+    assert {m.internal_code for m in mg.l1_cache.values()} == {hot[1].internal_code, hot[2].internal_code}
+    assert hot[0].tier == MemoryTier.L3_SEMANTIC
+
+    # No more traffic: counters decay and residents return home to L3, vectors re-quantized
+    for _ in range(80):
+        mg.tier_policy.record_access("background")
+    _, demoted = mg.run_tier_migration()
+    assert set(demoted) == {hot[1].internal_code, hot[2].internal_code}
+    assert not mg.l1_cache and all(m.tier == MemoryTier.L3_SEMANTIC for m in hot)
+    assert all(m.internal_code in mg.l3_vectors for m in hot)
+    print(f"✅ Tiering stats: {mg.tier_policy.stats()}")
+
+def test_retrieval_result_cache():
+    print("\n[Test] Retrieval Result Cache")
+    mg = MemGraphCore()
+    python = mg.add_memory("I like coding in Python.")
+    mg.add_memory("My favourite food is ramen.")
+
+    first = mg.retrieve("Python coding?")
+    assert mg.retrieve("  python CODING ") == first          # normalized key
+    assert mg.retrieval_cache.hits == 1
+    assert python.access_count == 3                          # hits still count as accesses
+
+    # A write sharing no term with the query leaves the entry valid
+    mg.add_memory("Weekend plan: hiking.")
+    assert mg.retrieve("python coding") == first and mg.retrieval_cache.hits == 2
+
+    # Substrings are not terms: they neither boost the score nor invalidate the entry
+    mg.add_memory("Pythonic codingstyle tips.")
+    assert mg.retrieve("python coding") == first and mg.retrieval_cache.hits == 3
+
+    # A write touching a query term invalidates it
+    mg.add_memory("Python 3.12 added better error messages.")
+    mg.retrieve("python coding")
+    assert mg.retrieval_cache.hits == 3 and mg.retrieval_cache.stale >= 1
+
+    # Different top_k is a different entry
+    mg.retrieve("python coding", top_k=1)
+    stats = mg.retrieval_cache.stats()
+    assert stats["misses"] == 3 and stats["latency_saved_ms"] > 0
+    print(f"✅ {stats}")
+
+def test_intent_boost_matches_whole_terms():
+    mg = MemGraphCore(dedup_threshold=None)
+    mg.increment_turn()
+    cat = mg.add_memory("Feeding my cat")
+    mg.increment_turn()
+    mg.add_memory("Concatenate the strings")   # newer, so it wins a tie
+    assert mg.retrieve("cat", top_k=1, turn_window=(0, 5)) == [cat]
+
+def test_summary_tree(echo_llm):
+    print("\n[Test] Hierarchical Summary Tree")
+    mg = MemGraphCore()
+    mg.consolidator.llm = mg.summary_tree.llm = echo_llm
+    topics = [("Python", "I write Python scripts"), ("Hackathon", "The hackathon deadline is close"), ("Memory", "The memory system needs scaling")]
+    for turn in range(400):
+        mg.increment_turn()
+        entity, text = topics[turn % len(topics)]
+        suffix = " in Zanzibar" if turn == 7 else ""
+        mg.add_memory(f"{text} turn {turn}{suffix}", entities=[entity])
+        mg.consolidate_memories()
+    mg.consolidate_memories(force=True)
+
+    tree = mg.summary_tree
+    assert len(mg.l3_semantic) >= 32 and tree.depth() >= 3
+    assert len(tree.roots()) < len(mg.l3_semantic)
+
+    # Coarse-to-fine: the constituent with the unique term is found without scanning all of L3
+    hits = tree.search("zanzibar", top_k=1)
+    assert "Zanzibar" in hits[0][1].content
+    assert tree.last_visited < len(mg.l3_semantic) + len(tree.leaves)
+    assert any("Zanzibar" in m.content for m in mg.retrieve("zanzibar", top_k=100))
+
+    # Pruning a goal drops its archived leaves with it
+    goal = next(m for m in mg.l3_semantic if m.metadata.get("type") == "HIAGENT_Goal")
+    leaves = len(tree.leaves)
+    mg._forget(goal, delete=True)
+    assert goal.internal_code not in tree.nodes and len(tree.leaves) == leaves - len(goal.metadata["constituent_codes"])
+    print(f"✅ {tree.stats()} for {len(mg.l3_semantic)} L3 entries")
+
+def test_consolidation_archives_l1_residents(echo_llm):
+    mg = MemGraphCore(dedup_threshold=None)
+    mg.consolidator.llm = mg.summary_tree.llm = echo_llm
+    mems = [mg.add_memory(f"I write Python scripts turn {i}", entities=["Python"]) for i in range(6)]
+    mg._promote_to_l1(mems[2])
+    assert mg.consolidate_memories(force=True)
+    assert mems[2].tier == MemoryTier.L3_ARCHIVED and mems[2].content not in mg.l1_cache
+    # The exact text now reaches the leaf through its goal, not the L1 fast path
+    mg.retrieve(mems[2].content)
+    assert mg.neural_cache_hits == 0
+
+def test_session_warmup():
+    print("\n[Test] Session Warm-Up")
+    mg = MemGraphCore(dedup_threshold=None)
+    hot = mg.add_memory("Deploy checklist for the API", entities=["API"])
+    filler = [mg.add_memory(text) for text in ["Bravo dinner", "Charlie flight", "Delta invoice", "Echo garden"]]
+    mg.consolidate_memories(force=True)       # unrelated singletons move to L3
+    name = mg.add_memory("My name is Ada.", entities=["Ada"])
+    likes = mg.add_memory("I prefer tea over coffee.")
+    neighbour = mg.add_memory("The API uses FastAPI", entities=["API"])
+    for _ in range(5):
+        hot.update_access()
+        mg.tier_policy.record_access(hot.internal_code)
+
+    mg.warmup.limit = 4
+    assert mg.warm_up() == 4
+    warmed = {m.internal_code for m in mg.l1_cache.values()}
+    assert warmed == {name.internal_code, likes.internal_code, hot.internal_code, neighbour.internal_code}
+    assert not any(m.tier == MemoryTier.L1_FAST_REACTOR for m in filler)
+    # Vectors of prefetched L3 memories are cached in RAM at full precision
+    assert hot.internal_code in mg.vector_index and hot.internal_code not in mg.l3_vectors
+
+    # Seeded in the access sketch, so the next migration batch keeps them
+    _, demoted = mg.run_tier_migration()
+    assert not demoted
+    assert mg.retrieve("My name is Ada.") == [name] and mg.neural_cache_hits == 1
+    print(f"✅ {mg.warmup.stats()}")
+
 if __name__ == "__main__":
     test_memgraph_core()
+    test_clustered_consolidation()
+    test_near_duplicate_merge()
+    test_tiered_quantized_vectors()
+    test_tier_page()
+    test_tier_migration_policy()
+    test_retrieval_result_cache()
+    test_summary_tree()
+    test_session_warmup()
@@ -0,0 +1,91 @@
+import pytest
+from memgraph_core import MemGraphCore, MemoryTier
+from memory_catalog import MemoryCatalog
+
+
+def _build(n=120):
+    mg = MemGraphCore(dedup_threshold=None)
+    mg.l2_episodic = type(mg.l2_episodic)(maxlen=None)   # keep everything live for the test
+    mems = []
+    for i in range(n):
+        if i % 4 == 0:
+            mg.increment_turn()
+        role = "user" if i % 2 == 0 else "assistant"
+        mems.append(mg.add_memory(f"entry {i}", role=role, entities=["Python"] if i % 5 == 0 else None))
+    return mg, mems
+
+
+def test_cursor_pagination_matches_full_scan():
+    print("\n[Test] Memory Catalog Pagination")
+    mg, mems = _build()
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = mg.list_memories(role="user", turn_min=5, turn_max=20, cursor=cursor, limit=7)
+        seen.extend(page)
+        if cursor is None:
+            break
+    expected = [m for m in mems if m.role == "user" and 5 <= m.metadata["creation_turn"] <= 20]
+    assert seen == expected
+
+    page, cursor = mg.list_memories(entity="Python", limit=100)
+    assert page == [m for m in mems if "Python" in (m.metadata.get("entities") or [])] and cursor is None
+    assert mg.list_memories(entity="Rust") == ([], None)
+    print(f"✅ Paged {len(seen)} memories; catalog {mg.catalog.stats()}")
+
+
+def test_catalog_tracks_tier_moves_and_forgetting():
+    mg, mems = _build(12)
+    mg.consolidate_memories(force=True)
+    l3 = mg.list_memories(tier="L3_Vector_Store", limit=100)[0]
+    assert {m.internal_code for m in l3} == {m.internal_code for m in mg.l3_semantic if m.tier == MemoryTier.L3_SEMANTIC}
+    assert mg.list_memories(tier=MemoryTier.L2_EPISODIC.value)[0] == []
+    assert len(mg.catalog) == len(mg.memory_lookup)
+
+    with pytest.raises(ValueError):
+        mg.list_memories(cursor="garbage")
+
+
+def test_update_keeps_position():
+    cat = MemoryCatalog()
+    mg = MemGraphCore(dedup_threshold=None)
+    a, b = mg.add_memory("first"), mg.add_memory("second")
+    cat.add(a)
+    cat.add(b)
+    a.tier = MemoryTier.L3_SEMANTIC
+    cat.update(a)
+    assert cat.query()[0] == [a, b]
+    assert cat.query(tier="L3_Vector_Store")[0] == [a]
+    cat.remove(a.internal_code)
+    assert cat.query()[0] == [b] and a.internal_code not in cat
+
+
+def test_temporal_retrieval_touches_only_window():
+    print("\n[Test] Temporal Retrieval")
+    from temporal import parse_temporal_window
+    mg, mems = _build(200)      # 50 turns, 4 memories each
+    window = parse_temporal_window("what did I say five turns ago?", mg.global_turn)
+    assert window == {"turn_window": (45, 45)}
+
+    hits = mg.retrieve("entry", top_k=10, **window)
+    assert hits and all(m.metadata["creation_turn"] == 45 for m in hits)
+    assert len(list(mg.catalog.window(45, 45))) == 4
+
+    # Recency weighting: with equal relevance the newest turn wins
+    recent = mg.retrieve("entry", top_k=1, turn_window=(40, 50))
+    assert recent[0].metadata["creation_turn"] == 50
+
+    # Wall-clock window
+    cutoff = mems[150].creation_timestamp
+    timed = mg.retrieve("entry", top_k=500, time_window=(cutoff, None))
+    assert {m.internal_code for m in mems[150:]} <= {m.internal_code for m in timed}
+    assert all(m.creation_timestamp >= cutoff for m in timed)
+
+    now = 1_700_000_000
+    assert parse_temporal_window("anything from the last 2 hours", 9, now=now) == {"time_window": (now - 7200, now)}
+    assert parse_temporal_window("last three turns", 9) == {"turn_window": (6, 9)}
+    assert parse_temporal_window("what is my name", 9) is None
+    assert parse_temporal_window("I feel great today", 9, now=now) is None
+    assert parse_temporal_window("Todays plan", 9, now=now) is None
+    assert parse_temporal_window("what did I say yesterday?", 9, now=now)["time_window"][1] <= now
+    print(f"✅ Window retrieval returned {len(hits)} memories from turn 45")
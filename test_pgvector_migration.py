@@ -0,0 +1,100 @@
+import os
+import random
+import pytest
+
+pgserver = pytest.importorskip("pgserver")
+psycopg2 = pytest.importorskip("psycopg2")
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+ROWS = 20000
+TENANTS = 50
+
+
+def _vec(v):
+    return "[" + ",".join(f"{x:.6f}" for x in v) + "]"
+
+
+@pytest.fixture(scope="module")
+def db(tmp_path_factory):
+    """Local Postgres + pgvector standing in for Supabase, with setup + migration applied."""
+    srv = pgserver.get_server(str(tmp_path_factory.mktemp("pg")), cleanup_mode="stop")
+    conn = psycopg2.connect(srv.get_uri())
+    conn.autocommit = True
+    cur = conn.cursor()
+    cur.execute("drop table if exists memgraph_memories cascade")
+    for name in ("setup_supabase.sql", "migration_001_ann_tier_tenant.sql"):
+        with open(os.path.join(ROOT, name)) as fh:
+            cur.execute(fh.read())
+    # Migration is idempotent
+    with open(os.path.join(ROOT, "migration_001_ann_tier_tenant.sql")) as fh:
+        cur.execute(fh.read())
+
+    random.seed(3)
+    rows = []
+    for i in range(ROWS):
+        tier = "L3_Vector_Store" if (i // TENANTS) % 2 else "L2_Episodic_Log"
+        tenant = f"t{i % TENANTS}" if i < ROWS // 2 else "shared"   # 50 small tenants + one large one
+        rows.append((f"m{i}", _vec([random.random() for _ in range(128)]), tier, tenant))
+    cur.executemany(
+        "insert into memgraph_memories (content, embedding, tier, metadata, tenant_id) "
+        "values (%s, %s::vector, %s, '{}', %s)", rows)
+    cur.execute("analyze memgraph_memories")
+    yield cur
+    conn.close()
+
+
+def _hnsw_scans(db):
+    db.execute("select pg_stat_force_next_flush()")
+    db.execute("select pg_stat_clear_snapshot()")
+    db.execute("select idx_scan from pg_stat_user_indexes where indexrelname = 'memgraph_memories_embedding_hnsw'")
+    return db.fetchone()[0]
+
+
+def test_ann_index_used_for_filtered_search(db):
+    print("\n[Test] pgvector Index Use")
+    q = _vec([random.random() for _ in range(128)])
+    before = _hnsw_scans(db)
+    db.execute("select id from match_memories_v2(%s::vector, 10, 'shared', array['L3_Vector_Store'])", (q,))
+    assert len(db.fetchall()) == 10
+    assert _hnsw_scans(db) > before
+    print("✅ match_memories_v2 candidates come from the HNSW index")
+
+
+def test_selective_filter_still_returns_k(db):
+    print("\n[Test] match_memories_v2 under a selective filter")
+    k = 10
+    for _ in range(5):
+        q = _vec([random.random() for _ in range(128)])
+        db.execute("select tier from match_memories_v2(%s::vector, %s, 't7', array['L3_Vector_Store'])", (q, k))
+        rows = db.fetchall()
+        assert len(rows) == k and all(tier == "L3_Vector_Store" for (tier,) in rows)
+
+    # Fewer eligible rows than k: all of them, not an empty or partial ANN page
+    db.execute("select count(*) from memgraph_memories where tenant_id = 't7' and tier = 'L3_Vector_Store'")
+    eligible = db.fetchone()[0]
+    db.execute("select count(*) from match_memories_v2(%s::vector, %s, 't7', array['L3_Vector_Store'])", (q, eligible + 5))
+    assert db.fetchone()[0] == eligible
+    print(f"✅ k results from {eligible} eligible rows out of {ROWS}")
+
+
+def test_match_memories_v2_filters_and_weights(db):
+    print("\n[Test] match_memories_v2")
+    db.execute("select embedding::text from memgraph_memories where content = 'm4'")
+    target = db.fetchone()[0]
+
+    db.execute("select content, tier, similarity, score from match_memories_v2(%s::vector, 5, 't4', array['L2_Episodic_Log'])",
+               (target,))
+    rows = db.fetchall()
+    assert len(rows) == 5 and rows[0][0] == "m4"
+    assert all(tier == "L2_Episodic_Log" for _, tier, _, _ in rows)
+    assert all(int(content[1:]) % TENANTS == 4 for content, _, _, _ in rows)
+
+    # A stale, decayed row drops below fresher neighbours
+    db.execute("update memgraph_memories set last_access_at = now() - interval '240 hours' where content = 'm4'")
+    db.execute("select content from match_memories_v2(%s::vector, 5, 't4', array['L2_Episodic_Log'])", (target,))
+    assert "m4" not in [r[0] for r in db.fetchall()]
+
+    # Legacy function: nearest first, threshold applied afterwards
+    db.execute("select content from match_memories(%s::vector, 0.5, 3)", (target,))
+    assert db.fetchone()[0] == "m4"
+    print("✅ Tenant/tier filters and half-life weighting applied server-side")
@@ -0,0 +1,127 @@
+import asyncio
+import threading
+from profiler import RuntimeProfiler, ProfilerMiddleware
+
+
+def _busy_work(stop):
+    while not stop.is_set():
+        sum(i * i for i in range(1000))
+
+
+def test_sampling_profiler():
+    print("\n[Test] Sampling Profiler")
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy_work, args=(stop,), daemon=True)
+    worker.start()
+
+    prof = RuntimeProfiler()
+    prof.start_sampling(0.3, interval=0.002)
+    report = prof.wait(timeout=5)
+    stop.set()
+
+    assert report["mode"] == "sampling"
+    assert not prof.running
+    assert "_busy_work" in report["collapsed"]
+    assert any("_busy_work" in f["function"] for f in report["top_functions"])
+    print(f"✅ Sampled {report['ticks']} ticks, top: {report['top_functions'][0]['function']}")
+
+
+def test_deterministic_profiler_via_middleware():
+    print("\n[Test] Deterministic Profiler")
+    calls = []
+
+    async def app(scope, receive, send):
+        calls.append(scope["path"])
+        sum(i for i in range(5000))
+
+    prof = RuntimeProfiler()
+    middleware = ProfilerMiddleware(app, prof)
+
+    async def drive():
+        # Idle: nothing is profiled
+        await middleware({"type": "http", "path": "/chat"}, None, None)
+        assert prof.last_report is None
+
+        prof.start_deterministic(2)
+        await middleware({"type": "http", "path": "/admin/profile"}, None, None)  # excluded
+        assert prof.armed
+        await middleware({"type": "http", "path": "/chat"}, None, None)
+        await middleware({"type": "http", "path": "/chat"}, None, None)
+
+    asyncio.run(drive())
+
+    assert not prof.armed and not prof.running
+    report = prof.last_report
+    assert report["requests"] == 2
+    assert report["top_functions"]
+    assert ";" in report["collapsed"]
+    print(f"✅ Profiled {report['requests']} requests, {len(report['top_functions'])} functions")
+
+
+def test_profiler_rejects_concurrent_sessions():
+    prof = RuntimeProfiler()
+    prof.start_deterministic(1)
+    try:
+        prof.start_sampling(0.1)
+        assert False, "Expected RuntimeError"
+    except RuntimeError:
+        pass
+
+
+def test_admin_token_check(monkeypatch):
+    import os
+    os.environ.setdefault("MEMGRAPH_STORAGE", "none")
+    from fastapi import HTTPException
+    import server
+    monkeypatch.setattr(server, "ADMIN_TOKEN", "s3cret")
+    server._require_admin("s3cret")
+    for token in (None, "", "s3cre", "s3cret!", "sëcret"):
+        try:
+            server._require_admin(token)
+            assert False, f"Accepted {token!r}"
+        except HTTPException as e:
+            assert e.status_code == 401
+
+    from fastapi.testclient import TestClient
+    client = TestClient(server.app)
+    headers = {"x-admin-token": "s3cret"}
+    for interval in (-5, 0, 5000):
+        r = client.post(f"/admin/profile/sample?seconds=1&interval_ms={interval}", headers=headers)
+        assert r.status_code == 400
+    assert client.delete("/admin/profile", headers=headers).status_code == 404
+
+
+def test_profiler_recovers_and_stops(monkeypatch):
+    import sys
+    import time
+    prof = RuntimeProfiler()
+    for bad in (-0.001, 0, 5):
+        try:
+            prof.start_sampling(1, interval=bad)
+            assert False, f"Accepted interval {bad}"
+        except ValueError:
+            pass
+    assert not prof.running
+
+    # A sampler that dies still releases the profiler and leaves a report
+    def boom():
+        raise RuntimeError("no frames")
+    monkeypatch.setattr(sys, "_current_frames", boom)
+    prof.start_sampling(5)
+    report = prof.wait(timeout=2)
+    monkeypatch.undo()
+    assert not prof.running and "RuntimeError" in report["error"]
+
+    # Sampling ends early on stop()
+    start = time.perf_counter()
+    prof.start_sampling(30, interval=0.01)
+    assert prof.stop() and time.perf_counter() - start < 2 and not prof.running
+
+    # Deterministic mode armed for more requests than ever arrive
+    prof.start_deterministic(100)
+    assert prof.request_started()
+    assert prof.stop() and prof.running          # waits for the in-flight request
+    assert not prof.request_started()
+    prof.request_finished()
+    assert not prof.running and prof.last_report["requests"] == 1
+    assert not prof.stop()
@@ -0,0 +1,86 @@
+import os
+import functools
+import pytest
+from memgraph_core import MemGraphCore, MemoryTier
+from reindex import ReindexJob, hashed_embedding
+from storage import SQLiteBackend
+
+
+def test_reindex_resume_and_swap(tmp_path):
+    print("\n[Test] Online Re-embedding")
+    mg = MemGraphCore(dedup_threshold=None)
+    l3 = [mg.add_memory(text) for text in ["Alpha launch", "Bravo dinner", "Charlie flight", "Delta invoice"]]
+    mg.consolidate_memories(force=True)
+    l2 = [mg.add_memory(f"note {i} about topic {i * 7}") for i in range(40)]
+    mg._promote_to_l1(l3[0])
+    embed = functools.partial(hashed_embedding, dim=64)
+    checkpoint = str(tmp_path / "ckpt")
+
+    # First attempt is interrupted after two batches
+    calls = []
+    def interrupted(texts):
+        calls.append(len(texts))
+        if len(calls) == 2:
+            first.cancel()
+        return embed(texts)
+    first = ReindexJob(mg, interrupted, "hashed-64", dim=64, batch_size=8, workers=0, checkpoint_dir=checkpoint)
+    assert first.build() is False and first.progress()["done"] == 16
+
+    # Resume on a process pool; a memory written mid-build is embedded at swap time
+    job = ReindexJob(mg, embed, "hashed-64", dim=64, batch_size=8, workers=2, checkpoint_dir=checkpoint)
+    assert job.build() and job.resumed == 16 and job.done == len(job._items)
+    late = mg.add_memory("written during the rebuild")
+    assert len(late.embedding) == 128           # old embedder until the swap
+    job.swap()
+
+    for mem in l3[1:] + l2 + [late]:
+        assert mg.get_embedding(mem.internal_code) == pytest.approx(embed([mem.content])[0], abs=1e-6)
+    assert all(m.internal_code in mg.l3_vectors for m in l3[1:]) and mg.l3_vectors.dim == 64
+    assert l3[0].tier == MemoryTier.L1_FAST_REACTOR and len(mg.vector_index[l3[0].internal_code]) == 64
+    assert mg.vector_search(embed(["Charlie flight"])[0], top_k=1)[0][0] is l3[2]
+    assert len(mg.add_memory("after the swap").embedding) == 64
+    assert not os.listdir(checkpoint)
+    print(f"✅ {job.progress()}")
+
+
+def test_reindex_survives_restart(tmp_path):
+    print("\n[Test] Re-embedding Persists Across a Restart")
+    path = str(tmp_path / "reindex.db")
+    mg = MemGraphCore(backend=SQLiteBackend(path), dedup_threshold=None)
+    for i in range(12):
+        mg.add_memory(f"Fact {i}: topic {i % 3} detail {i * 7}")
+    mg.consolidate_memories(force=True)
+    for i in range(60):                          # the oldest of these are evicted from L2 but keep their rows
+        mg.add_memory(f"note {i} about subject {i * 11}")
+    mg.flush_writes()
+    assert mg.summary_tree.leaves and mg.backend.count() > len(mg.memory_lookup) + len(mg.summary_tree.leaves)
+
+    embed = functools.partial(hashed_embedding, dim=64)
+    job = ReindexJob(mg, embed, "hashed-64", dim=64, batch_size=16, workers=0, embedder="hashed")
+    assert job.build()
+    job.swap()
+    writer = job.persist(chunk_size=16)
+    next(writer)
+    assert job.state == "persisting"       # still busy: the server refuses a second job until "done"
+    for _ in writer:
+        pass
+    assert job.state == "done"
+    rows = [r for tier in MemoryTier for r in mg.backend.scan_tier(tier.value)]
+    assert len(rows) == mg.backend.count() and all(len(r["embedding"]) == 64 for r in rows)
+    mg.backend.close()
+
+    restored = MemGraphCore(backend=SQLiteBackend(path))
+    restored.restore_from_backend()
+    assert restored.embedding_model["dim"] == 64 and restored.l3_vectors.dim == 64
+    for mem in restored.l3_semantic:
+        assert restored.get_embedding(mem.internal_code) == pytest.approx(embed([mem.content])[0], abs=1e-6)
+    assert len(restored.add_memory("after the restart").embedding) == 64
+    restored.backend.close()
+
+    # Vectors from an embedder the engine cannot rebuild are refused, not read back truncated
+    backend = SQLiteBackend(path)
+    backend.put_setting("embedding_model", {"model_id": "custom-64", "embedder": None, "dim": 64})
+    with pytest.raises(ValueError):
+        MemGraphCore(backend=backend).restore_from_backend()
+    backend.close()
+    print(f"✅ {len(rows)} rows at 64 dims after restart")
@@ -0,0 +1,76 @@
+import os
+import json
+import pytest
+from memgraph_core import MemGraphCore, MemoryTier
+from snapshot import export_snapshot, import_snapshot
+from storage import SQLiteBackend
+
+
+def _populated():
+    mg = MemGraphCore()
+    for i in range(12):
+        mg.increment_turn()
+        mg.add_memory(f"Fact {i}: topic {i % 3} detail {i * 7}", entities=[f"Topic{i % 3}"])
+    mg.add_memory("My name is Priranshu.", entities=["Priranshu"])
+    mg.consolidate_memories(force=True)
+    mg.add_memory("I started learning Rust this week.", entities=["Rust"])
+    return mg
+
+
+def test_snapshot_round_trip(tmp_path):
+    print("\n[Test] Snapshot Export/Import")
+    src = _populated()
+    manifest = export_snapshot(src, str(tmp_path / "snap"), chunk_size=4)
+    assert manifest["rows"] == len(src.memory_lookup) + len(src.summary_tree.leaves) and src.summary_tree.leaves
+    assert os.path.getsize(tmp_path / "snap" / "vectors.f32") == manifest["vectors"] * manifest["dim"] * 4
+
+    backend = SQLiteBackend(str(tmp_path / "dst.db"))
+    dst = MemGraphCore(backend=backend)
+    assert import_snapshot(dst, str(tmp_path / "snap"), chunk_size=4) == manifest["rows"]
+
+    assert set(dst.memory_lookup) == set(src.memory_lookup)
+    # Archived constituents come back under the same goals, not as live memories
+    assert {c: m.metadata["parent_code"] for c, m in dst.summary_tree.leaves.items()} == \
+        {c: m.metadata["parent_code"] for c, m in src.summary_tree.leaves.items()}
+    assert all(dst.summary_tree.nodes[m.metadata["parent_code"]].children.count(c) == 1 for c, m in dst.summary_tree.leaves.items())
+    assert [m.internal_code for m in dst.l3_semantic] == [m.internal_code for m in src.l3_semantic]
+    assert [m.internal_code for m in dst.l2_episodic] == [m.internal_code for m in src.l2_episodic]
+    assert set(dst.l1_cache) == set(src.l1_cache)
+    assert dst.global_turn == src.global_turn
+    for code in src.memory_lookup:
+        assert dst.get_embedding(code) == pytest.approx(src.get_embedding(code), rel=1e-6)
+        assert dst.memory_lookup[code].tier == src.memory_lookup[code].tier
+    # Postings and derived indexes are rebuilt
+    assert dst.entity_index["Rust"] == src.entity_index["Rust"]
+    listed = dst.list_memories(tier=MemoryTier.L3_SEMANTIC.value, limit=100)[0]
+    assert {m.internal_code for m in listed} == {m.internal_code for m in src.l3_semantic if m.tier == MemoryTier.L3_SEMANTIC}
+    assert dst.add_memory("I started learning Rust this week!").internal_code in src.memory_lookup
+    # Bulk-written to the attached backend
+    assert backend.count() == manifest["rows"]
+    backend.close()
+    print(f"✅ Round-tripped {manifest['rows']} memories ({manifest['tiers']})")
+
+
+def test_snapshot_carries_reindexed_model(tmp_path):
+    import functools
+    from reindex import ReindexJob, hashed_embedding
+    src = _populated()
+    ReindexJob(src, functools.partial(hashed_embedding, dim=64), "hashed-64", dim=64, workers=0, embedder="hashed").run()
+    manifest = export_snapshot(src, str(tmp_path / "snap"))
+    assert manifest["embedding_model"]["dim"] == manifest["dim"] == 64
+
+    backend = SQLiteBackend(str(tmp_path / "dst.db"))
+    dst = MemGraphCore(backend=backend)
+    assert import_snapshot(dst, str(tmp_path / "snap")) == manifest["rows"]
+    assert dst.l3_vectors.dim == 64 and len(dst.add_memory("after the import").embedding) == 64
+    assert backend.get_setting("embedding_model") == src.embedding_model
+    backend.close()
+
+    # A snapshot whose vectors don't fit the engine is refused before anything is loaded
+    manifest_path = tmp_path / "snap" / "manifest.json"
+    manifest["embedding_model"] = None
+    manifest_path.write_text(json.dumps(manifest))
+    fresh = MemGraphCore()
+    with pytest.raises(ValueError):
+        import_snapshot(fresh, str(tmp_path / "snap"))
+    assert not fresh.memory_lookup
@@ -0,0 +1,99 @@
+import gc
+import tracemalloc
+from memgraph_core import MemGraphCore
+from spill_store import SegmentStore
+
+
+def test_segment_store(tmp_path):
+    store = SegmentStore(str(tmp_path), segment_bytes=64)
+    for i in range(10):
+        store.write(f"k{i}", {"content": f"value {i}" * 3})
+    assert store.read("k3") == {"content": "value 3" * 3}
+    assert len(list(tmp_path.iterdir())) > 1
+    for i in range(9):
+        store.discard(f"k{i}")
+    # Sealed segments with no live records are deleted; the newest one survives
+    assert len(store) == 1 and store.read("k9")["content"].startswith("value 9")
+    assert len(list(tmp_path.iterdir())) <= 2
+    store.close()
+
+
+def test_cold_spill_and_fault_in(echo_llm):
+    print("\n[Test] Cold Memory Spill")
+    budget = 200_000
+    tracemalloc.start()
+    mg = MemGraphCore(ram_budget_bytes=budget)
+    mg.consolidator.llm = mg.summary_tree.llm = echo_llm
+    topics = [("Python", "I write Python scripts"), ("Hackathon", "The hackathon deadline is close"), ("Memory", "The memory system needs scaling")]
+    for turn in range(600):
+        mg.increment_turn()
+        entity, text = topics[turn % len(topics)]
+        suffix = " in Zanzibar" if turn == 7 else ""
+        mg.add_memory(f"{text} turn {turn}{suffix}", entities=[entity])
+        mg.consolidate_memories()
+    mg.consolidate_memories(force=True)
+
+    spillable = mg.l3_semantic + list(mg.summary_tree.leaves.values())
+    expected = {m.internal_code: (m.content, m.metadata.get("entities")) for m in spillable}
+    gc.collect()
+    before = tracemalloc.get_traced_memory()[0]
+    mg.run_pruning_cycle()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    stats = mg.cold.stats()
+    assert stats["resident_bytes"] <= budget and stats["on_disk"] > len(spillable) // 2
+    assert before - after > 500_000            # leaf vectors and texts left the heap
+
+    # Retrieval faults the selected leaf back in, unchanged
+    leaf = next(m for m in mg.summary_tree.leaves.values() if m.internal_code in mg.cold.store
+                and expected[m.internal_code][0].endswith("Zanzibar"))
+    assert any(m is leaf for m in mg.retrieve("zanzibar", top_k=100))
+    assert leaf.content == expected[leaf.internal_code][0] and leaf.internal_code not in mg.cold.store
+    assert mg.cold.faults >= 1
+
+    # Nothing is lost: every spilled memory reads back exactly
+    assert {m.internal_code: (m.content, m.metadata.get("entities")) for m in spillable} == expected
+    assert len(mg.cold.store) == 0
+    mg.cold.close()
+    print(f"✅ {stats}, traced {before:,} -> {after:,} bytes")
+
+
+def test_pruning_spilled_memories_does_not_fault_them_in(echo_llm):
+    for cache_size in (0, 1024):
+        mg = MemGraphCore(ram_budget_bytes=2000, retrieval_cache_size=cache_size)
+        mg.consolidator.llm = mg.summary_tree.llm = echo_llm
+        for i in range(60):
+            mg.add_memory(f"Entry {i}: distinct subject {i * 13} with some padding text", entities=[f"E{i % 4}"])
+        mg.consolidate_memories(force=True)
+        mg.enforce_ram_budget()
+        spilled = [m for m in mg.l3_semantic if mg.cold.is_spilled(m)]
+        assert spilled
+
+        for mem in spilled:
+            mem.half_life_score = 0.01
+        faults = mg.cold.faults
+        mg.run_pruning_cycle()
+        assert mg.cold.faults == faults
+        assert not any(m in mg.l3_semantic for m in spilled)
+        assert all(m.internal_code not in mg.cold.store for m in spilled)
+        mg.cold.close()
+
+
+def test_retrieval_faults_in_only_results(echo_llm):
+    mg = MemGraphCore(ram_budget_bytes=4000)
+    mg.consolidator.llm = mg.summary_tree.llm = echo_llm
+    for i in range(120):
+        mg.add_memory(f"Entry {i}: shared subject with detail {i * 13}", entities=[f"E{i % 4}"])
+        mg.consolidate_memories()
+    mg.consolidate_memories(force=True)
+    mg.enforce_ram_budget()
+    assert len(mg.cold.store) > 20
+
+    for query in ("shared subject detail", "entry 39", "goal"):
+        faults = mg.cold.faults
+        results = mg.retrieve(query, top_k=3)
+        assert mg.cold.faults - faults <= 3
+        assert all(m.content for m in results)
+    mg.cold.close()
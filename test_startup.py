@@ -0,0 +1,43 @@
+import os
+import json
+import subprocess
+import sys
+
+# Cold `import memgraph_core` must stay under this budget (seconds).
+IMPORT_BUDGET_S = float(os.getenv("MEMGRAPH_IMPORT_BUDGET_S", "0.5"))
+
+HEAVY_MODULES = ["supabase", "openai", "google.generativeai", "requests"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import memgraph_core
+elapsed = time.perf_counter() - start
+print(json.dumps({"elapsed": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+
+def _measure_import():
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_import_memgraph_core_is_fast_and_side_effect_free():
+    print("\n[Test] Startup Benchmark")
+    # Best of 3 to smooth over a cold filesystem cache
+    runs = [_measure_import() for _ in range(3)]
+    best = min(r["elapsed"] for r in runs)
+
+    assert runs[0]["loaded"] == [], f"Heavy modules imported eagerly: {runs[0]['loaded']}"
+    assert best < IMPORT_BUDGET_S, f"import memgraph_core took {best:.3f}s (budget {IMPORT_BUDGET_S}s)"
+    print(f"✅ import memgraph_core: {best * 1000:.1f}ms (budget {IMPORT_BUDGET_S * 1000:.0f}ms)")
+
+
+def test_core_does_not_connect_on_construction():
+    from memgraph_core import MemGraphCore
+    mg = MemGraphCore()
+    assert mg.backend is None
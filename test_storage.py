@@ -0,0 +1,184 @@
+import random
+import pytest
+from memgraph_core import MemGraphCore, MemoryTier
+from storage import InMemoryBackend, SQLiteBackend, create_backend
+
+
+def _record(i, tier="L2_Episodic_Log"):
+    return {
+        "id": f"MEM_{i:04d}",
+        "content": f"memory {i}",
+        "role": "user",
+        "tier": tier,
+        "embedding": [random.random() for _ in range(128)],
+        "metadata": {"creation_turn": i},
+        "access_count": 1,
+        "half_life_score": 1.0,
+        "created_at": 1000.0 + i,
+    }
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        b = InMemoryBackend()
+    else:
+        b = SQLiteBackend(str(tmp_path / "mem.db"))
+    yield b
+    b.close()
+
+
+def test_backend_contract(backend):
+    print(f"\n[Test] Storage Backend: {backend.name}")
+    records = [_record(i, "L3_Vector_Store" if i % 2 else "L2_Episodic_Log") for i in range(20)]
+    backend.insert_batch(records)
+    assert backend.count() == 20
+
+    got = backend.get("MEM_0003")
+    assert got["content"] == "memory 3" and got["metadata"] == {"creation_turn": 3}
+    assert got["embedding"] == pytest.approx(records[3]["embedding"], rel=1e-6)
+
+    top = backend.vector_top_k(records[5]["embedding"], 3)
+    assert top[0][0]["id"] == "MEM_0005"
+    assert all(r["tier"] == "L2_Episodic_Log" for r, _ in backend.vector_top_k(records[5]["embedding"], 3, tier="L2_Episodic_Log"))
+
+    l3 = list(backend.scan_tier("L3_Vector_Store"))
+    assert [r["id"] for r in l3] == [f"MEM_{i:04d}" for i in range(1, 20, 2)]
+
+    # Upsert moves tiers
+    records[0]["tier"] = "L3_Vector_Store"
+    backend.insert_batch([records[0]])
+    assert backend.get("MEM_0000")["tier"] == "L3_Vector_Store"
+
+    backend.delete(["MEM_0000", "MEM_0001"])
+    assert backend.get("MEM_0000") is None and backend.count() == 18
+    print(f"✅ {backend.name} backend passed")
+
+
+def test_sqlite_uses_wal(tmp_path):
+    b = SQLiteBackend(str(tmp_path / "wal.db"))
+    mode = b._conn.execute("PRAGMA journal_mode").fetchone()[0]
+    b.close()
+    assert mode == "wal"
+
+
+def test_sqlite_failed_delete_rolls_back(tmp_path):
+    b = SQLiteBackend(str(tmp_path / "del.db"))
+    b.insert_batch([{"id": f"r{i}", "content": f"row {i}", "tier": "L2_Episodic_Log"} for i in range(3)])
+    with pytest.raises(Exception):
+        b.delete(["r0", object()])           # second id cannot be bound
+    assert b.get("r0") is not None           # first delete undone, not left in an open transaction
+    b.delete(["r1"])
+    assert b.count() == 2
+    b.close()
+
+
+def test_core_persists_and_restores_with_sqlite(tmp_path):
+    print("\n[Test] Durable Restore (SQLite)")
+    path = str(tmp_path / "core.db")
+    mg = MemGraphCore(backend=SQLiteBackend(path))
+    mg.increment_turn()
+    m1 = mg.add_memory("My name is Priranshu.", entities=["Priranshu"])
+    mg.add_memory("I like coding in Python.", entities=["Python"])
+    mg.consolidate_memories(force=True)
+    mg.flush_writes()
+    mg.backend.close()
+
+    restored = MemGraphCore(backend=create_backend(f"sqlite:///{path}"))
+    assert restored.restore_from_backend() == 2
+    mem = restored.memory_lookup[m1.internal_code]
+    assert mem.content == m1.content
+    assert mem in restored.l3_semantic or mem.tier == MemoryTier.L1_FAST_REACTOR
+    assert m1.internal_code in restored.entity_index["Priranshu"]
+    assert restored.global_turn == 1
+    restored.backend.close()
+    print("✅ Restored state from SQLite")
+
+
+def test_restore_reattaches_archived_constituents(tmp_path):
+    path = str(tmp_path / "tree.db")
+    mg = MemGraphCore(backend=SQLiteBackend(path))
+    for i in range(12):
+        mg.increment_turn()
+        mg.add_memory(f"Fact {i}: topic {i % 3} detail {i * 7}", entities=[f"Topic{i % 3}"])
+    mg.consolidate_memories(force=True)
+    mg.flush_writes()
+    leaves = {code: leaf.metadata["parent_code"] for code, leaf in mg.summary_tree.leaves.items()}
+    assert leaves and mg.backend.count() == len(mg.memory_lookup) + len(leaves)
+    mg.backend.close()
+
+    restored = MemGraphCore(backend=create_backend(f"sqlite:///{path}"))
+    assert restored.restore_from_backend() == len(mg.memory_lookup) + len(leaves)
+    assert {code: leaf.metadata["parent_code"] for code, leaf in restored.summary_tree.leaves.items()} == leaves
+    assert not restored.l2_episodic and not set(leaves) & set(restored.memory_lookup)
+    for goal in restored.l3_semantic:
+        assert set(restored.summary_tree.nodes[goal.internal_code].children) == {c for c, p in leaves.items() if p == goal.internal_code}
+    # Nothing to re-consolidate, so no duplicate goals
+    assert restored.consolidate_memories(force=True) == []
+
+    # Pruning a goal deletes its archived rows too
+    goal = restored.l3_semantic[0]
+    goal.half_life_score = 0.01
+    restored.run_pruning_cycle()
+    restored.flush_writes()
+    assert all(restored.backend.get(c) is None for c, p in leaves.items() if p == goal.internal_code)
+    restored.backend.close()
+
+
+def test_cached_result_never_resurrects_pruned_memory(tmp_path):
+    mg = MemGraphCore(backend=SQLiteBackend(str(tmp_path / "prune.db")))
+    mg.add_memory("I like coding in Python.")
+    ramen = mg.add_memory("My favourite food is ramen.")
+    mg.consolidate_memories(force=True)
+    assert ramen in mg.retrieve("python coding")
+    mg.flush_writes()
+
+    # Pruning shares no term with the cached query, but the entry must not be served again
+    ramen.half_life_score = 0.01
+    mg.run_pruning_cycle()
+    mg.flush_writes()
+    assert ramen.internal_code not in mg.memory_lookup
+    assert ramen not in mg.retrieve("python coding")
+    mg.flush_writes()
+    assert mg.backend.get(ramen.internal_code) is None
+    mg.backend.close()
+
+
+class RemoteStub(InMemoryBackend):
+    """Stands in for Supabase: the store, not local tiers, answers retrieve()."""
+    name = "remote-stub"
+    serves_retrieval = True
+
+    def vector_top_k(self, query_vec, k, tier=None):
+        # match_memories returns no embedding column
+        return [(dict(r, embedding=None), 0.8) for r in list(self._rows.values())[:k]]
+
+
+def test_remote_rows_hydrate_through_cache():
+    print("\n[Test] Remote Row Cache")
+    remote = RemoteStub()
+    remote.insert_batch([_record(i) for i in range(3)])
+
+    mg = MemGraphCore(backend=remote, retrieval_cache_size=0)   # exercise the row cache, not the result cache
+    first = mg.retrieve("memory", top_k=3)
+    second = mg.retrieve("memory", top_k=3)
+    assert {m.internal_code for m in first} == {"MEM_0000", "MEM_0001", "MEM_0002"}
+    # Same objects both times, no regenerated embeddings
+    assert {id(m) for m in first} == {id(m) for m in second}
+    assert all(m.embedding is None for m in first)
+    assert mg.row_cache.hits >= 3
+
+    # Access stats are written back in one batch, without clobbering stored vectors
+    mg.flush_writes()
+    row = remote.get("MEM_0000")
+    assert row["access_count"] == 3 and row["embedding"] is not None
+
+    # Writes update the cache; pruning invalidates it
+    new = mg.add_memory("fresh memory")
+    assert mg.row_cache.peek(new.internal_code) is new
+    cached = mg.row_cache.peek("MEM_0001")
+    cached.half_life_score = 0.0
+    mg.l3_semantic.append(cached)
+    mg.run_pruning_cycle()
+    assert "MEM_0001" not in mg.row_cache
+    print(f"✅ Row cache: {mg.row_cache.stats()}")
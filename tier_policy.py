@@ -0,0 +1,113 @@
+import hashlib
+from array import array
+
+
+class CountMinSketch:
+    """
+    Approximate per-key counters in fixed memory (width * depth cells).
+    Estimates never undercount; `decay()` halves every cell so old traffic fades out.
+    """
+
+    def __init__(self, width=1024, depth=4):
+        self.width = width
+        self.depth = depth
+        self._rows = [array("I", bytes(4 * width)) for _ in range(depth)]
+
+    def _cells(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=4 * self.depth).digest()
+        for d in range(self.depth):
+            yield d, int.from_bytes(digest[4 * d:4 * d + 4], "little") % self.width
+
+    def add(self, key, count=1):
+        """Conservative update: only the minimum cells are raised, which keeps collisions from inflating estimates."""
+        cells = list(self._cells(key))
+        target = min(self._rows[d][i] for d, i in cells) + count
+        for d, i in cells:
+            if self._rows[d][i] < target:
+                self._rows[d][i] = target
+        return target
+
+    def estimate(self, key):
+        return min(self._rows[d][i] for d, i in self._cells(key))
+
+    def decay(self):
+        for row in self._rows:
+            for i, v in enumerate(row):
+                if v:
+                    row[i] = v >> 1
+
+
+class TierMigrationPolicy:
+    """
+    Decides L1 membership from observed access frequency.
+
+    Accesses go into a decaying Count-Min sketch; every `batch_interval` retrievals the policy
+    returns one batch of promotions (keys accessed since the last batch whose estimate reaches
+    `promote_threshold`) and demotions (L1 members whose estimate fell below `demote_threshold`,
+    plus the coldest members when L1 is over `l1_capacity`). Counters halve every `decay_interval`
+    accesses so yesterday's hot memories cool down.
+    """
+
+    def __init__(self, l1_capacity=32, promote_threshold=3, demote_threshold=1, batch_interval=16,
+                 decay_interval=512, width=1024, depth=4):
+        self.sketch = CountMinSketch(width, depth)
+        self.l1_capacity = l1_capacity
+        self.promote_threshold = promote_threshold
+        self.demote_threshold = demote_threshold
+        self.batch_interval = batch_interval
+        self.decay_interval = decay_interval
+        self._touched = set()
+        self._accesses = 0
+        self._ticks = 0
+
+        # Metrics
+        self.batches = 0
+        self.promoted = 0
+        self.demoted = 0
+
+    def record_access(self, key):
+        self.sketch.add(key)
+        self._touched.add(key)
+        self._accesses += 1
+        if self._accesses % self.decay_interval == 0:
+            self.sketch.decay()
+
+    def seed(self, key):
+        """Credits a prefetched key with a promotion's worth of accesses so the next batch keeps it."""
+        self.sketch.add(key, self.promote_threshold)
+
+    def tick(self):
+        """Counts one retrieval; True when a migration batch is due."""
+        self._ticks += 1
+        return self._ticks % self.batch_interval == 0
+
+    def plan(self, l1_keys):
+        """Returns (promote, demote) key lists for the current L1 membership `l1_keys`."""
+        l1_keys = set(l1_keys)
+        estimate = self.sketch.estimate
+        promote = sorted((k for k in self._touched - l1_keys if estimate(k) >= self.promote_threshold),
+                         key=estimate, reverse=True)
+        self._touched.clear()
+
+        demote = [k for k in l1_keys if estimate(k) < self.demote_threshold]
+        kept = sorted(l1_keys - set(demote), key=estimate, reverse=True)
+        # Hot candidates displace colder residents when L1 is full
+        promote = promote[:self.l1_capacity]
+        ranked = sorted(kept + promote, key=estimate, reverse=True)
+        keep_set = set(ranked[:self.l1_capacity])
+        demote += [k for k in kept if k not in keep_set]
+        promote = [k for k in promote if k in keep_set]
+
+        self.batches += 1
+        self.promoted += len(promote)
+        self.demoted += len(demote)
+        return promote, demote
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "promoted": self.promoted,
+            "demoted": self.demoted,
+            "l1_capacity": self.l1_capacity,
+            "accesses": self._accesses,
+        }
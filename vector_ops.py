@@ -0,0 +1,22 @@
+import math
+
+
+def dot(a, b):
+    return sum(x * y for x, y in zip(a, b))
+
+
+def norm(a):
+    return math.sqrt(dot(a, a))
+
+
+def cosine_similarity(a, b):
+    na, nb = norm(a), norm(b)
+    if na == 0 or nb == 0:
+        return 0.0
+    return dot(a, b) / (na * nb)
+
+
+def centroid(vectors):
+    """Element-wise mean of a non-empty list of equal-length vectors."""
+    n = len(vectors)
+    return [sum(col) / n for col in zip(*vectors)]
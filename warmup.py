@@ -0,0 +1,142 @@
+import re
+import time
+import heapq
+import asyncio
+
+# Statements about the user themselves; these are what a new session most often needs first
+IDENTITY_RE = re.compile(
+    r"\b(my name is|call me|i am|i'm|i live|i work|my (?:favou?rite|birthday|job|home)"
+    r"|i (?:like|love|prefer|hate|enjoy|always|never))\b", re.IGNORECASE)
+IDENTITY_MARKERS = ("my", "i", "i'm", "call")   # keyword_index entries that can start such a statement
+
+
+def is_identity(mem, content=None):
+    return mem.role == "user" and IDENTITY_RE.search(content if content is not None else mem.content) is not None
+
+
+class SessionWarmup:
+    """
+    Prefetches the working set a new session is likely to touch into L1 before its first turn.
+
+    Candidates come in three bands: identity/preference statements, the most frequently accessed
+    memories (access_count shortlist, reranked by the decaying access sketch), then the
+    neighbourhoods of the top entities among those. Promotion also pulls each memory's
+    full-precision vector into RAM. A run stops at `limit` memories (default: free L1 capacity)
+    or after `time_budget` seconds of its own work, whichever comes first.
+    """
+
+    def __init__(self, limit=None, time_budget=0.1, top_entities=3, batch_size=8):
+        self.limit = limit
+        self.time_budget = time_budget
+        self.top_entities = top_entities
+        self.batch_size = batch_size
+
+        # Metrics
+        self.runs = 0
+        self.prefetched = 0
+        self.budget_stops = 0
+        self.last_seconds = 0.0
+
+    def _limit(self, mg, limit):
+        free = max(0, mg.tier_policy.l1_capacity - len(mg.l1_cache))
+        return min(free, limit if limit is not None else self.limit if self.limit is not None else free)
+
+    def select(self, mg, limit=None):
+        """Ranked list of live, non-L1 memories to prefetch."""
+        limit = self._limit(mg, limit)
+        if not limit:
+            return []
+        lookup = mg.memory_lookup
+        resident = {m.internal_code for m in mg.l1_cache.values()}
+        chosen, seen = [], set(resident)
+
+        def take(mems):
+            for mem in mems:
+                if len(chosen) >= limit:
+                    return
+                if mem.internal_code not in seen:
+                    seen.add(mem.internal_code)
+                    chosen.append(mem)
+
+        # 1. Identity / preferences, newest first (only memories containing a marker word are checked)
+        codes = set().union(*(mg.keyword_index.get(w, ()) for w in IDENTITY_MARKERS))
+        identity = [lookup[c] for c in codes if c in lookup and is_identity(lookup[c], mg.peek_content(lookup[c]))]
+        take(sorted(identity, key=lambda m: m.last_access_timestamp, reverse=True))
+
+        # 2. Most accessed: cheap shortlist by lifetime count, ordered by recent (decayed) traffic
+        estimate = mg.tier_policy.sketch.estimate
+        shortlist = heapq.nlargest(4 * limit, lookup.values(), key=lambda m: m.access_count)
+        ranked = [(estimate(m.internal_code), m.access_count, m) for m in shortlist]
+        ranked = [r for r in ranked if r[0] or r[1] > 1]   # never-read memories are not "frequent"
+        ranked.sort(key=lambda r: (r[0], r[1]), reverse=True)
+        take(m for _, _, m in ranked)
+
+        # 3. Neighbourhoods of the entities the seeds mention most
+        counts = {}
+        for mem in chosen:
+            for entity in mem.metadata.get("entities", ()):
+                counts[entity] = counts.get(entity, 0) + 1
+        for entity in sorted(counts, key=counts.get, reverse=True)[:self.top_entities]:
+            neighbours = [lookup[c] for c in mg.entity_index.get(entity, ()) if c in lookup]
+            take(sorted(neighbours, key=lambda m: m.last_access_timestamp, reverse=True))
+        return chosen
+
+    def _prefetch(self, mg, batch):
+        for mem in batch:
+            mg._promote_to_l1(mem)
+            mg.tier_policy.seed(mem.internal_code)
+        self.prefetched += len(batch)
+
+    def _finish(self, done, total, spent):
+        self.runs += 1
+        self.last_seconds = spent
+        if done < total:
+            self.budget_stops += 1
+        print(f"[WARMUP] Prefetched {done}/{total} memories into L1 in {spent * 1000:.1f}ms")
+        return done
+
+    def run(self, mg, limit=None):
+        """Synchronous warm-up. Returns the number of memories prefetched."""
+        start = time.perf_counter()
+        selected = self.select(mg, limit)
+        done = 0
+        for i in range(0, len(selected), self.batch_size):
+            if time.perf_counter() - start > self.time_budget:
+                break
+            batch = selected[i:i + self.batch_size]
+            self._prefetch(mg, batch)
+            done += len(batch)
+        mg.prefetch_rows()
+        return self._finish(done, len(selected), time.perf_counter() - start)
+
+    async def run_async(self, mg, limit=None):
+        """
+        Same as run(), but yields to the event loop between batches so concurrent requests are
+        served in between. Only time spent here counts against the budget.
+        """
+        spent = 0.0
+        start = time.perf_counter()
+        selected = self.select(mg, limit)
+        spent += time.perf_counter() - start
+        done = 0
+        for i in range(0, len(selected), self.batch_size):
+            if spent > self.time_budget:
+                break
+            await asyncio.sleep(0)
+            start = time.perf_counter()
+            batch = [m for m in selected[i:i + self.batch_size] if m.internal_code in mg.memory_lookup]
+            self._prefetch(mg, batch)
+            done += len(batch)
+            spent += time.perf_counter() - start
+        start = time.perf_counter()
+        mg.prefetch_rows()
+        spent += time.perf_counter() - start
+        return self._finish(done, len(selected), spent)
+
+    def stats(self):
+        return {
+            "runs": self.runs,
+            "prefetched": self.prefetched,
+            "budget_stops": self.budget_stops,
+            "last_ms": round(self.last_seconds * 1000, 3),
+        }